@@ -51,6 +51,18 @@ class Settings(BaseSettings):
     MAX_MESSAGES_PER_MINUTE: int = Field(default=30, description="Global rate limit")
     MAX_MESSAGES_PER_CHAT_PER_MINUTE: int = Field(default=1, description="Per-chat rate limit")
     
+    # Outbound pacing (Telegram flood control)
+    OUTBOUND_MESSAGES_PER_SECOND: float = Field(default=30.0, description="Global outbound message rate")
+    OUTBOUND_CHAT_MESSAGES_PER_SECOND: float = Field(default=1.0, description="Outbound rate per private chat")
+    OUTBOUND_GROUP_MESSAGES_PER_MINUTE: float = Field(default=20.0, description="Outbound rate per group chat")
+    
+    # SQLite tuning (see src/database/sqlite_tuning.py)
+    SQLITE_PROFILE: str = Field(default="balanced", description="durable, balanced or throughput")
+    
+    # Statistics write-behind
+    STATS_FLUSH_SECONDS: float = Field(default=5.0, description="Seconds between user activity counter writes")
+    STATS_FLUSH_MAX_PENDING: int = Field(default=1000, description="Pending activity updates that force an early write")
+    
     # Logging
     LOG_LEVEL: str = Field(default="INFO", description="Logging level")
     LOG_FILE: Optional[str] = Field(default="bot.log", description="Log file path")
@@ -87,7 +99,19 @@ class Settings(BaseSettings):
             raise ValueError(f"ENVIRONMENT must be one of: {valid_envs}")
         return v.lower()
     
-    @validator('MAX_MESSAGES_PER_MINUTE', 'MAX_MESSAGES_PER_CHAT_PER_MINUTE')
+    @validator('SQLITE_PROFILE')
+    def validate_sqlite_profile(cls, v):
+        """Validate SQLite tuning profile."""
+        valid_profiles = ['durable', 'balanced', 'throughput']
+        if v.lower() not in valid_profiles:
+            raise ValueError(f"SQLITE_PROFILE must be one of: {valid_profiles}")
+        return v.lower()
+    
+    @validator(
+        'MAX_MESSAGES_PER_MINUTE', 'MAX_MESSAGES_PER_CHAT_PER_MINUTE',
+        'OUTBOUND_MESSAGES_PER_SECOND', 'OUTBOUND_CHAT_MESSAGES_PER_SECOND',
+        'OUTBOUND_GROUP_MESSAGES_PER_MINUTE'
+    )
     def validate_rate_limits(cls, v):
         """Validate rate limit values."""
         if v <= 0:
@@ -6,6 +6,7 @@ Creates and configures the Bot instance with all necessary settings:
 - Session configuration
 - Error handling setup
 - Production optimizations
+- Outbound rate limiting
 """
 
 import logging
@@ -13,6 +14,7 @@ from aiogram import Bot
 from aiogram.client.default import DefaultBotProperties
 from aiogram.enums import ParseMode
 from app.config import settings
+from src.bot.send_governor import get_send_governor
 
 
 logger = logging.getLogger(__name__)
@@ -49,6 +51,13 @@ def create_bot() -> Bot:
         session=None,  # Will use default aiohttp session
     )
     
+    # Pace outgoing requests under Telegram flood limits
+    bot.session.middleware(get_send_governor(
+        global_rate=settings.OUTBOUND_MESSAGES_PER_SECOND,
+        chat_rate=settings.OUTBOUND_CHAT_MESSAGES_PER_SECOND,
+        group_rate=settings.OUTBOUND_GROUP_MESSAGES_PER_MINUTE / 60,
+    ))
+    
     logger.info(f"Bot instance created successfully")
     return bot
 
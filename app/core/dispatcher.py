@@ -17,7 +17,7 @@ from app.config import settings
 from app.middlewares.rate_limit import RateLimitMiddleware
 from app.middlewares.error_handler import ErrorHandlerMiddleware
 from app.middlewares.logging import LoggingMiddleware
-from app.middlewares.user_context import UserContextMiddleware
+from app.middlewares.user_context import UserContextMiddleware, flush_user_activity
 from app.handlers import register_all_handlers
 
 
@@ -77,6 +77,9 @@ def create_dispatcher() -> Dispatcher:
     dp.callback_query.middleware(ErrorHandlerMiddleware())
     dp.inline_query.middleware(ErrorHandlerMiddleware())
     
+    # Write buffered user activity before the process exits
+    dp.shutdown.register(flush_user_activity)
+    
     logger.info("✅ Middlewares registered")
     
     # Register all handlers
@@ -18,10 +18,11 @@ from sqlalchemy.ext.asyncio import (
     AsyncSession,
     AsyncEngine
 )
-from sqlalchemy.pool import StaticPool
+from sqlalchemy.pool import AsyncAdaptedQueuePool, StaticPool
 
 from app.config import settings
 from app.database.models import Base
+from src.database.sqlite_tuning import apply_sqlite_profile
 
 
 logger = logging.getLogger(__name__)
@@ -49,12 +50,19 @@ def create_engine() -> AsyncEngine:
     
     # Special configuration for SQLite
     if "sqlite" in settings.DATABASE_URL:
-        engine_kwargs.update({
-            "poolclass": StaticPool,
-            "connect_args": {
-                "check_same_thread": False,  # Allow SQLite usage across threads
-            }
-        })
+        engine_kwargs["connect_args"] = {
+            "check_same_thread": False,  # Allow SQLite usage across threads
+        }
+        if ":memory:" in settings.DATABASE_URL:
+            # Every connection would get its own empty in-memory database
+            engine_kwargs["poolclass"] = StaticPool
+        else:
+            # Bounded, so the profile's page cache budget is split over at most 10
+            engine_kwargs.update({
+                "poolclass": AsyncAdaptedQueuePool,
+                "pool_size": 5,
+                "max_overflow": 5,
+            })
     else:
         # For PostgreSQL and other databases
         engine_kwargs.update({
@@ -63,10 +71,16 @@ def create_engine() -> AsyncEngine:
             "pool_recycle": 3600,    # Recycle connections every hour
         })
     
-    return create_async_engine(
+    engine = create_async_engine(
         settings.DATABASE_URL,
         **engine_kwargs
     )
+    
+    if "sqlite" in settings.DATABASE_URL:
+        # WAL lets the pooled connections read while one of them writes
+        apply_sqlite_profile(engine, settings.SQLITE_PROFILE, max_connections=10)
+    
+    return engine
 
 
 def create_session_factory(engine: AsyncEngine) -> async_sessionmaker[AsyncSession]:
@@ -17,12 +17,38 @@ from aiogram.types import TelegramObject, Message, CallbackQuery, User as TgUser
 from sqlalchemy import select
 from datetime import datetime, timezone
 
+from app.config import settings
 from app.database.connection import get_session
 from app.database.models import User, UserStats
+from src.database.aggregator import CounterAggregator
 
 
 logger = logging.getLogger(__name__)
 
+# Activity is written behind, so a busy user costs one UPDATE per flush, not per message
+activity_aggregator = CounterAggregator(
+    UserStats.__table__,
+    get_session,
+    counters=('total_messages_sent',),
+    timestamps=('last_interaction',),
+    flush_interval=settings.STATS_FLUSH_SECONDS,
+    max_pending=settings.STATS_FLUSH_MAX_PENDING,
+)
+last_activity_aggregator = CounterAggregator(
+    User.__table__,
+    get_session,
+    timestamps=('last_activity',),
+    key='id',
+    flush_interval=settings.STATS_FLUSH_SECONDS,
+    max_pending=settings.STATS_FLUSH_MAX_PENDING,
+)
+
+
+async def flush_user_activity() -> None:
+    """Write pending activity updates (call on shutdown)."""
+    await activity_aggregator.stop()
+    await last_activity_aggregator.stop()
+
 
 class UserContextMiddleware(BaseMiddleware):
     """Middleware for loading user context from database."""
@@ -144,19 +170,14 @@ class UserContextMiddleware(BaseMiddleware):
                 return user
     
     async def _update_user_activity(self, user: User, tg_user: TgUser):
-        """Update user's last activity timestamp."""
+        """Record user activity for the next write-behind flush."""
         try:
-            async with get_session() as session:
-                # Update user activity
-                user.last_activity = datetime.now(timezone.utc)
-                
-                # Update stats
-                if user.stats:
-                    user.stats.last_interaction = datetime.now(timezone.utc)
-                    user.stats.total_messages_sent += 1
-                
-                session.add(user)
-                await session.commit()
-                
+            now = datetime.now(timezone.utc)
+            
+            # Handlers see the new time at once; the database catches up on flush
+            user.last_activity = now
+            last_activity_aggregator.add(user.id, last_activity=now)
+            activity_aggregator.add(user.id, total_messages_sent=1, last_interaction=now)
+            
         except Exception as e:
             logger.error(f"Failed to update user activity for {user.telegram_id}: {e}")
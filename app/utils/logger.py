@@ -14,7 +14,7 @@ import logging
 import logging.handlers
 import sys
 from pathlib import Path
-from typing import Optional
+from typing import Dict, Optional
 
 from app.config import settings
 
@@ -174,6 +174,11 @@ class PerformanceLogger:
         """Log count metric."""
         extra_info = " | ".join(f"{k}={v}" for k, v in kwargs.items())
         self.logger.info(f"{metric}: {count} | {extra_info}")
+    
+    def log_histogram(self, metric: str, summary: Dict[str, float], **kwargs):
+        """Log histogram summary (count, percentiles, max)."""
+        extra_info = " | ".join(f"{k}={v}" for k, v in {**summary, **kwargs}.items())
+        self.logger.info(f"{metric}: {extra_info}")
 
 
 # Create performance loggers for different components
@@ -0,0 +1,472 @@
+"""
+Telegram Reminder Bot - Scheduler Benchmark
+
+Seeds a scratch database with reminders, drives the real scheduler
+against a stub Bot and prints machine-readable results. With --storage
+it instead measures raw insert/select throughput of each SQLite profile,
+and concurrent writes through shared sessions versus the single writer.
+
+The scheduler runs on a virtual clock advanced in --step increments, so
+a long window takes as long as the work it causes rather than the time
+it spans. Stub send latency is simulated time too. Each step waits for
+database work to finish, so throughput and lateness are measured
+against simulated time, with a resolution of one step. Database time is
+reported in real seconds.
+
+Usage:
+    python benchmark.py --reminders 20000 --users 2000 --distribution clustered
+    python benchmark.py --latency-ms 80 --error-rate 0.02 --output results.json
+    python benchmark.py --storage --reminders 50000 --selects 20000
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List
+
+DISTRIBUTIONS = ('uniform', 'clustered', 'heavy')
+PRIORITIES = (('high', 0.1), ('normal', 0.7), ('low', 0.2))
+
+
+class StubBot:
+    """Stand-in for ``aiogram.Bot`` with configurable latency and failures."""
+
+    def __init__(self, latency: float, jitter: float, error_rate: float, rng: random.Random, clock):
+        """Initialize stub bot (latency and jitter in seconds of ``clock`` time)."""
+        self.clock = clock
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rng = rng
+        self.calls = 0
+        self.errors = 0
+        self.first_call: float = 0.0
+        self.last_call: float = 0.0
+
+    async def send_message(self, chat_id: int, text: str, **kwargs: Any) -> None:
+        """Pretend to send a message."""
+        now = self.clock.time()
+        if not self.calls:
+            self.first_call = now
+        self.calls += 1
+
+        delay = self.rng.gauss(self.latency, self.jitter) if self.jitter else self.latency
+        await self.clock.sleep(max(delay, 0.0))
+        self.last_call = self.clock.time()
+
+        if self.rng.random() < self.error_rate:
+            self.errors += 1
+            raise RuntimeError("Simulated Telegram error")
+
+
+def due_times(args: argparse.Namespace, start: datetime, rng: random.Random) -> List[datetime]:
+    """Draw due times: uniform over the window, or snapped to the next round minute."""
+    times = []
+    for _ in range(args.reminders):
+        due = start + timedelta(seconds=rng.uniform(0, args.window))
+        if args.distribution == 'clustered':
+            due = due.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        times.append(due)
+    return times
+
+
+def owners(args: argparse.Namespace, rng: random.Random) -> List[int]:
+    """Draw the owning user index of each reminder (Zipf-like for ``heavy``)."""
+    if args.distribution != 'heavy':
+        return [rng.randrange(args.users) for _ in range(args.reminders)]
+
+    weights = [1.0 / (rank + 1) ** 1.2 for rank in range(args.users)]
+    return rng.choices(range(args.users), weights=weights, k=args.reminders)
+
+
+async def seed(args: argparse.Namespace, rng: random.Random, now: datetime) -> Dict[str, Any]:
+    """Create users and reminders with bulk inserts."""
+    from sqlalchemy import insert, select
+
+    from src.database.models import Reminder, User
+    from src.database.operations import init_database, run_write
+
+    await init_database()
+
+    start = now + timedelta(seconds=args.lead)
+    times = due_times(args, start, rng)
+    user_index = owners(args, rng)
+    priorities, weights = zip(*PRIORITIES)
+
+    async def insert_rows(session) -> None:
+        await session.execute(insert(User), [
+            {'telegram_id': 10_000_000 + i, 'first_name': f"bench{i}"}
+            for i in range(args.users)
+        ])
+        rows = await session.execute(select(User.telegram_id, User.id))
+        user_ids = {telegram_id - 10_000_000: user_id for telegram_id, user_id in rows}
+
+        for offset in range(0, args.reminders, 5000):
+            await session.execute(insert(Reminder), [
+                {
+                    'user_id': user_ids[user_index[i]],
+                    'title': f"Benchmark reminder {i}",
+                    'scheduled_time': times[i],
+                    'priority': rng.choices(priorities, weights)[0],
+                }
+                for i in range(offset, min(offset + 5000, args.reminders))
+            ])
+        await session.commit()
+
+    await run_write(insert_rows)
+
+    return {'first_due': min(times), 'last_due': max(times)}
+
+
+async def wait_for_database(engines: List[Any]) -> None:
+    """Wait in real time until no connection of ``engines`` is in use."""
+    while True:
+        # Let woken tasks run up to their next wait
+        for _ in range(20):
+            await asyncio.sleep(0)
+        if not any(engine.sync_engine.pool.checkedout() for engine in engines):
+            return
+        await asyncio.sleep(0.0005)
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    """Seed, deliver on a virtual clock and collect results."""
+    from src.utils.clock import VirtualClock, set_clock
+
+    # Services pick the process-wide clock up when they are built,
+    # some of them at import, so it has to be in place first
+    clock = VirtualClock(datetime.utcnow())
+    set_clock(clock)
+
+    from sqlalchemy import func, select
+
+    from src.config import config
+    from src.database import operations
+    from src.database.models import Reminder
+    from src.database.operations import get_session
+    from src.services.dispatcher import to_epoch
+    from src.services.scheduler_service import SchedulerService
+
+    rng = random.Random(args.seed)
+    engines = [operations.engine]
+    if operations.writer_engine is not operations.engine:
+        engines.append(operations.writer_engine)
+
+    seeded = time.perf_counter()
+    window = await seed(args, rng, clock.utcnow())
+    seed_seconds = time.perf_counter() - seeded
+
+    bot = StubBot(args.latency_ms / 1000, args.jitter_ms / 1000, args.error_rate, rng, clock)
+    scheduler = SchedulerService(bot, clock=clock)
+    await scheduler.start()
+
+    loaded = time.perf_counter()
+    await scheduler.load_pending_reminders()
+    load_seconds = time.perf_counter() - loaded
+
+    # Run until everything due has gone through, then drain
+    settle = config.SCHEDULER_LATENESS_BUDGET_SECONDS if config.SCHEDULER_SMOOTHING else 0.0
+    if config.DELIVERY_COALESCE:
+        settle += config.DELIVERY_COALESCE_WINDOW_SECONDS
+    deadline = time.time() + args.timeout
+    last_due = to_epoch(window['last_due'])
+    simulated_from = clock.time()
+    steps = 0
+
+    while time.time() < deadline:
+        await clock.advance(args.step)
+        await wait_for_database(engines)
+        steps += 1
+        stats = scheduler.delivery.get_stats()
+        busy = (
+            stats['held'] or stats['queue_size'] or stats['active_batches']
+            or scheduler.dispatcher.get_stats()['inflight']
+        )
+        if clock.time() > last_due + settle + 1 and not busy:
+            break
+    timed_out = time.time() >= deadline
+    simulated_seconds = clock.time() - simulated_from
+
+    # Shutdown waits on the clock as well
+    stopping = asyncio.create_task(scheduler.stop())
+    while not stopping.done():
+        await clock.advance(args.step)
+        await wait_for_database(engines)
+    await stopping
+
+    async with get_session() as session:
+        sent = await session.scalar(select(func.count()).where(Reminder.is_sent == True))
+        dead = await session.scalar(select(func.count()).where(Reminder.is_failed == True))
+        retrying = await session.scalar(select(func.count()).where(
+            Reminder.is_sent == False, Reminder.is_failed == False, Reminder.next_attempt_at.isnot(None)
+        ))
+
+    delivery = scheduler.delivery.get_stats()
+    span = (bot.last_call - bot.first_call) if bot.calls else 0.0
+    metrics = scheduler.metrics.get_stats()
+
+    return {
+        'timed_out': timed_out,
+        'seed_seconds': round(seed_seconds, 3),
+        'load_seconds': round(load_seconds, 3),
+        'simulated_seconds': round(simulated_seconds, 3),
+        'steps': steps,
+        'sent': sent,
+        'dead_lettered': dead,
+        'retrying': retrying,
+        'bot_calls': bot.calls,
+        'bot_errors': bot.errors,
+        'send_span_seconds': round(span, 3),  # Simulated
+        'throughput_per_second': round(bot.calls / span, 1) if span else None,
+        'lateness_seconds': metrics['lateness'],
+        'send_seconds': metrics['send'],
+        'db_seconds': {
+            **metrics['db'],
+            'fetch_total': round(delivery['fetch_seconds'], 3),
+            'write_total': round(delivery['write_seconds'], 3),
+        },
+        'batches': delivery['batches'],
+        'digests': delivery['digests'],
+        'peak_rss_mb': round(peak_rss_mb(), 1),
+    }
+
+
+async def run_storage(args: argparse.Namespace, directory: str) -> Dict[str, Any]:
+    """Time inserts and selects on a fresh database per SQLite profile."""
+    from sqlalchemy import insert, select
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+    from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+    from src.database.models import Base, Reminder, User
+    from src.database.sqlite_tuning import (
+        PROFILES, WalCheckpointer, apply_immediate_transactions, apply_sqlite_profile
+    )
+    from src.database.writer import GroupCommitSession, SQLiteWriter
+
+    results = {}
+    for profile in PROFILES:
+        path = os.path.join(directory, f"{profile}.db")
+        url = f"sqlite+aiosqlite:///{path}"
+        engine = create_async_engine(url, poolclass=AsyncAdaptedQueuePool, pool_size=5, max_overflow=5)
+        apply_sqlite_profile(engine, profile, max_connections=11)  # Pool plus the writer below
+        sessions = async_sessionmaker(engine, expire_on_commit=False)
+        rng = random.Random(args.seed)
+        start = datetime.utcnow()
+
+        def rows(count: int) -> List[Dict[str, Any]]:
+            return [
+                {
+                    'user_id': rng.randrange(args.users) + 1,
+                    'title': "Benchmark reminder",
+                    'scheduled_time': start + timedelta(seconds=rng.uniform(0, 86400)),
+                }
+                for _ in range(count)
+            ]
+
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        async with sessions() as session:
+            await session.execute(insert(User), [
+                {'telegram_id': 10_000_000 + i, 'first_name': f"bench{i}"}
+                for i in range(args.users)
+            ])
+            await session.commit()
+
+        # One transaction per reminder, like a user creating one
+        started = time.perf_counter()
+        async with sessions() as session:
+            for _ in range(args.commits):
+                await session.execute(insert(Reminder), rows(1))
+                await session.commit()
+        single_seconds = time.perf_counter() - started
+
+        async def insert_one(session) -> None:
+            await session.execute(insert(Reminder), rows(1))
+            await session.commit()
+
+        # The same writes from concurrent tasks: a session each (shared
+        # mode) or queued for the one writer that commits them in groups
+        per_writer = max(args.commits // args.writers, 1)
+
+        async def shared_writer() -> None:
+            async with sessions() as session:
+                for _ in range(per_writer):
+                    await insert_one(session)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(shared_writer() for _ in range(args.writers)))
+        shared_seconds = time.perf_counter() - started
+
+        writer_engine = create_async_engine(url, poolclass=AsyncAdaptedQueuePool, pool_size=1, max_overflow=0)
+        apply_sqlite_profile(writer_engine, profile, max_connections=11)
+        apply_immediate_transactions(writer_engine)
+        writer = SQLiteWriter(async_sessionmaker(writer_engine, class_=GroupCommitSession, expire_on_commit=False))
+
+        async def split_writer() -> None:
+            for _ in range(per_writer):
+                await writer.submit(insert_one)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(split_writer() for _ in range(args.writers)))
+        split_seconds = time.perf_counter() - started
+        await writer.stop()
+        await writer_engine.dispose()
+
+        # Bulk load, 5000 rows per transaction
+        started = time.perf_counter()
+        async with sessions() as session:
+            for offset in range(0, args.reminders, 5000):
+                await session.execute(insert(Reminder), rows(min(5000, args.reminders - offset)))
+                await session.commit()
+            bulk_seconds = time.perf_counter() - started
+            # Closing the last connection checkpoints the WAL away
+            wal_bytes = WalCheckpointer(engine, path).wal_size()
+
+        # A user's next reminders, from concurrent readers
+        async def reader(count: int) -> None:
+            async with sessions() as session:
+                for _ in range(count):
+                    await session.execute(
+                        select(Reminder.id, Reminder.scheduled_time)
+                        .where(Reminder.user_id == rng.randrange(args.users) + 1)
+                        .order_by(Reminder.scheduled_time)
+                        .limit(10)
+                    )
+
+        per_reader = max(args.selects // args.readers, 1)
+        started = time.perf_counter()
+        await asyncio.gather(*(reader(per_reader) for _ in range(args.readers)))
+        select_seconds = time.perf_counter() - started
+
+        await engine.dispose()
+
+        results[profile] = {
+            'pragmas': PROFILES[profile],
+            'single_commits_per_second': round(args.commits / single_seconds, 1),
+            'concurrent_writes_per_second': {
+                'shared': round(per_writer * args.writers / shared_seconds, 1),
+                'split': round(per_writer * args.writers / split_seconds, 1),
+            },
+            'average_group_commit': writer.get_stats()['average_group'],
+            'bulk_rows_per_second': round(args.reminders / bulk_seconds, 1) if args.reminders else None,
+            'selects_per_second': round(per_reader * args.readers / select_seconds, 1),
+            'wal_bytes': wal_bytes,
+            'db_bytes': os.path.getsize(path),
+        }
+
+    return results
+
+
+def peak_rss_mb() -> float:
+    """Get the process's peak resident set size in MiB."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def git_revision() -> str:
+    """Get the current commit, if this is a git checkout."""
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def parse_args() -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Benchmark reminder delivery against a stub Bot")
+    parser.add_argument('--reminders', type=int, default=10000, help="reminders to seed")
+    parser.add_argument('--users', type=int, default=1000, help="users owning them")
+    parser.add_argument('--distribution', choices=DISTRIBUTIONS, default='uniform',
+                        help="uniform times, clustered on round minutes, or heavy (Zipf) users")
+    parser.add_argument('--window', type=float, default=60.0, help="seconds over which reminders come due")
+    parser.add_argument('--lead', type=float, default=5.0, help="seconds before the first can be due")
+    parser.add_argument('--latency-ms', type=float, default=50.0, help="mean stub send latency")
+    parser.add_argument('--jitter-ms', type=float, default=10.0, help="standard deviation of the latency")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="share of sends that fail")
+    parser.add_argument('--seed', type=int, default=1, help="random seed")
+    parser.add_argument('--step', type=float, default=0.05, help="simulated seconds per clock advance")
+    parser.add_argument('--timeout', type=float, default=600.0, help="give up after this many real seconds")
+    parser.add_argument('--storage', action='store_true',
+                        help="benchmark SQLite profiles instead of the scheduler")
+    parser.add_argument('--commits', type=int, default=2000, help="single-row transactions (--storage)")
+    parser.add_argument('--selects', type=int, default=20000, help="per-user selects (--storage)")
+    parser.add_argument('--readers', type=int, default=8, help="concurrent readers (--storage)")
+    parser.add_argument('--writers', type=int, default=32, help="concurrent writers (--storage)")
+    parser.add_argument('--database', help="database file (default: a temporary one)")
+    parser.add_argument('--output', help="write JSON here instead of stdout")
+    return parser.parse_args()
+
+
+def main() -> None:
+    """Benchmark entry point."""
+    args = parse_args()
+
+    scratch = None
+    if args.storage or not args.database:
+        # --storage always works on scratch databases, one per profile
+        scratch = tempfile.mkdtemp(prefix="reminder-bench-")
+        args.database = os.path.join(scratch, "bench.db")
+    elif os.path.exists(args.database):
+        sys.exit(f"Refusing to seed existing database {args.database}")
+
+    # Configuration is read at import time, so set it before importing src
+    os.environ['DATABASE_PATH'] = args.database
+    os.environ.setdefault('BOT_TOKEN', '0:benchmark')
+    os.environ['LOG_FILE'] = ''
+    os.environ['SCHEDULER_SNAPSHOT_PATH'] = ''
+    logging.basicConfig(level=logging.WARNING)
+
+    started = time.perf_counter()
+    if args.storage:
+        results = asyncio.run(run_storage(args, scratch))
+    else:
+        results = asyncio.run(run(args))
+
+    from src.config import config
+
+    report = {
+        'revision': git_revision(),
+        'timestamp': datetime.utcnow().isoformat(timespec='seconds'),
+        'params': {key: value for key, value in vars(args).items() if key != 'output'},
+        'config': {
+            'delivery_mode': config.DELIVERY_MODE,
+            'delivery_concurrency': config.DELIVERY_CONCURRENCY,
+            'delivery_batch_size': config.DELIVERY_BATCH_SIZE,
+            'scheduler_tick_seconds': config.SCHEDULER_TICK_SECONDS,
+            'scheduler_smoothing': config.SCHEDULER_SMOOTHING,
+            'delivery_prerender': config.DELIVERY_PRERENDER,
+            'delivery_coalesce': config.DELIVERY_COALESCE,
+            'sqlite_profile': config.SQLITE_PROFILE,
+            'sqlite_engine_mode': config.SQLITE_ENGINE_MODE,
+        },
+        'results': results,
+        'wall_seconds': round(time.perf_counter() - started, 3),
+    }
+
+    output = json.dumps(report, indent=2, default=str)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+    if scratch:
+        for name in os.listdir(scratch):
+            os.remove(os.path.join(scratch, name))
+        os.rmdir(scratch)
+
+
+if __name__ == "__main__":
+    main()
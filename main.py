@@ -23,7 +23,7 @@ from aiogram.fsm.storage.memory import MemoryStorage
 
 from src.bot.bot_init import create_bot
 from src.config import config
-from src.database.operations import init_database
+from src.database.operations import init_database, stats_aggregator, db_writer
 from src.handlers.start import router as start_router
 from src.handlers.reminders import router as reminders_router
 from src.services.scheduler_service import SchedulerService
@@ -71,6 +71,7 @@ class TelegramReminderBot:
             logger.info("⏰ Starting scheduler service...")
             self.scheduler = SchedulerService(self.bot)
             await self.scheduler.start()
+            self.dp["scheduler"] = self.scheduler  # Passed to handlers as ``scheduler``
 
             # Load pending reminders
             logger.info("📥 Loading pending reminders...")
@@ -94,6 +95,13 @@ class TelegramReminderBot:
                 logger.info("⏰ Stopping scheduler...")
                 await self.scheduler.stop()
 
+            # Write statistics still held in memory
+            await stats_aggregator.stop()
+
+            # Commit the writes still queued (split engine mode)
+            if db_writer:
+                await db_writer.stop()
+
             # Close bot session
             if self.bot:
                 logger.info("🤖 Closing bot session...")
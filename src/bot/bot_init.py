@@ -9,6 +9,7 @@ from aiogram import Bot
 from aiogram.client.default import DefaultBotProperties
 from aiogram.enums import ParseMode
 
+from src.bot.send_governor import get_send_governor
 from src.config import config
 
 logger = logging.getLogger(__name__)
@@ -38,6 +39,13 @@ def create_bot(token: str) -> Bot:
             default=default_properties
         )
         
+        # Pace every outgoing request through the shared governor
+        bot.session.middleware(get_send_governor(
+            global_rate=config.OUTBOUND_MESSAGES_PER_SECOND,
+            chat_rate=config.OUTBOUND_CHAT_MESSAGES_PER_SECOND,
+            group_rate=config.OUTBOUND_GROUP_MESSAGES_PER_MINUTE / 60
+        ))
+        
         logger.info("✅ Bot instance created successfully")
         return bot
         
@@ -0,0 +1,220 @@
+"""
+Outbound Send Governor
+
+Paces outgoing Telegram requests with a global token bucket,
+per-chat buckets and stricter buckets for group chats. Installed
+as a request middleware on the bot session, so handlers and the
+scheduler share the same limits.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Dict, Optional, Union
+
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware, NextRequestMiddlewareType
+from aiogram.exceptions import TelegramRetryAfter
+from aiogram.methods import Response, TelegramMethod
+from aiogram.methods.base import TelegramType
+
+logger = logging.getLogger(__name__)
+
+# Methods that post a new message into a chat; the per-chat and global
+# message limits apply to these only, not to edits or callback answers
+PACED_METHODS = frozenset({
+    'sendMessage', 'sendPhoto', 'sendAudio', 'sendDocument', 'sendVideo', 'sendAnimation',
+    'sendVoice', 'sendVideoNote', 'sendMediaGroup', 'sendPaidMedia', 'sendSticker',
+    'sendLocation', 'sendVenue', 'sendContact', 'sendPoll', 'sendDice', 'sendGame',
+    'sendInvoice', 'copyMessage', 'copyMessages', 'forwardMessage', 'forwardMessages',
+})
+
+
+class TokenBucket:
+    """Token bucket that hands out reservations instead of rejecting."""
+
+    __slots__ = ('rate', 'capacity', 'tokens', 'updated')
+
+    def __init__(self, rate: float, capacity: float, now: float):
+        """Initialize bucket (full)."""
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = now
+
+    def reserve(self, now: float) -> float:
+        """Take one token and return how long to wait before using it."""
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        self.tokens -= 1
+        if self.tokens >= 0:
+            return 0.0
+        return -self.tokens / self.rate
+
+    def is_idle(self, now: float) -> bool:
+        """Check whether the bucket has refilled completely."""
+        return self.tokens + (now - self.updated) * self.rate >= self.capacity
+
+
+class SendGovernor(BaseRequestMiddleware):
+    """
+    Request middleware that keeps the bot under Telegram's flood limits.
+
+    Only methods that post a message (``PACED_METHODS``) are paced;
+    edits, callback answers and everything else pass straight through,
+    so interactive menus never queue behind reminder traffic. A paced
+    request waits for its chat bucket, then for the global bucket. A
+    ``TelegramRetryAfter`` pauses the whole queue for ``retry_after``
+    seconds and the request is retried on the tokens it already holds.
+    """
+
+    CLEANUP_INTERVAL = 60.0
+
+    def __init__(
+        self,
+        global_rate: float = 30.0,
+        chat_rate: float = 1.0,
+        group_rate: float = 20.0 / 60.0,
+        chat_burst: float = 1.0,
+        max_retries: int = 3,
+    ):
+        """Initialize governor."""
+        now = time.monotonic()
+        self.global_rate = global_rate
+        self.chat_rate = chat_rate
+        self.group_rate = group_rate
+        self.chat_burst = chat_burst
+        self.max_retries = max_retries
+
+        self._global = TokenBucket(global_rate, global_rate, now)
+        self._chats: Dict[Union[int, str], TokenBucket] = {}
+        self._paused_until = 0.0
+        self._last_cleanup = now
+
+        self._waiting = 0
+        self._stats = {
+            'requests': 0,
+            'throttled': 0,
+            'retry_after_hits': 0,
+            'pauses_seconds': 0.0,
+            'wait_seconds_total': 0.0,
+            'wait_seconds_max': 0.0,
+        }
+
+    @staticmethod
+    def _is_group(chat_id: Union[int, str]) -> bool:
+        """Groups, supergroups and channels have negative IDs or @usernames."""
+        if isinstance(chat_id, str):
+            return not chat_id.lstrip('-').isdigit() or chat_id.startswith('-')
+        return chat_id < 0
+
+    def _chat_bucket(self, chat_id: Union[int, str], now: float) -> TokenBucket:
+        """Get or create the bucket for a chat."""
+        bucket = self._chats.get(chat_id)
+        if bucket is None:
+            if self._is_group(chat_id):
+                bucket = TokenBucket(self.group_rate, 1.0, now)
+            else:
+                bucket = TokenBucket(self.chat_rate, self.chat_burst, now)
+            self._chats[chat_id] = bucket
+        return bucket
+
+    def _cleanup(self, now: float) -> None:
+        """Forget buckets of chats that have been quiet long enough to refill."""
+        if now - self._last_cleanup < self.CLEANUP_INTERVAL:
+            return
+
+        for chat_id in [c for c, b in self._chats.items() if b.is_idle(now)]:
+            del self._chats[chat_id]
+        self._last_cleanup = now
+
+    async def acquire(self, chat_id: Union[int, str]) -> float:
+        """Wait for permission to send to ``chat_id`` and return time waited."""
+        started = time.monotonic()
+        self._waiting += 1
+        try:
+            self._cleanup(started)
+
+            delay = self._chat_bucket(chat_id, started).reserve(started)
+            if delay:
+                await asyncio.sleep(delay)
+
+            await self.wait_for_pause()
+            delay = self._global.reserve(time.monotonic())
+            if delay:
+                await asyncio.sleep(delay)
+            # A pause that began while waiting holds this reservation too
+            await self.wait_for_pause()
+        finally:
+            self._waiting -= 1
+
+        waited = time.monotonic() - started
+        if waited > 0.001:
+            self._stats['throttled'] += 1
+        self._stats['wait_seconds_total'] += waited
+        self._stats['wait_seconds_max'] = max(self._stats['wait_seconds_max'], waited)
+        return waited
+
+    async def wait_for_pause(self) -> None:
+        """Wait until no flood-control pause is in effect."""
+        while True:
+            now = time.monotonic()
+            if now >= self._paused_until:
+                return
+            await asyncio.sleep(self._paused_until - now)
+
+    def pause(self, seconds: float) -> None:
+        """Hold every outgoing request for ``seconds``."""
+        until = time.monotonic() + seconds
+        if until > self._paused_until:
+            self._paused_until = until
+            self._stats['pauses_seconds'] += seconds
+            logger.warning(f"⏸️ Outbound queue paused for {seconds}s (flood control)")
+
+    async def __call__(
+        self,
+        make_request: NextRequestMiddlewareType[TelegramType],
+        bot: Any,
+        method: TelegramMethod[TelegramType],
+    ) -> Response[TelegramType]:
+        """Pace the request and retry it after flood-control pauses."""
+        chat_id: Optional[Union[int, str]] = getattr(method, 'chat_id', None)
+        if chat_id is None or method.__api_method__ not in PACED_METHODS:
+            return await make_request(bot, method)
+
+        self._stats['requests'] += 1
+        await self.acquire(chat_id)
+        attempt = 0
+        while True:
+            try:
+                return await make_request(bot, method)
+            except TelegramRetryAfter as e:
+                self._stats['retry_after_hits'] += 1
+                self.pause(e.retry_after)
+                attempt += 1
+                if attempt > self.max_retries:
+                    raise
+            # The rejected attempt's reservation carries over to the retry
+            await self.wait_for_pause()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get governor statistics."""
+        requests = self._stats['requests']
+        return {
+            **self._stats,
+            'queue_depth': self._waiting,
+            'tracked_chats': len(self._chats),
+            'paused_for': max(self._paused_until - time.monotonic(), 0.0),
+            'wait_seconds_avg': self._stats['wait_seconds_total'] / requests if requests else 0.0,
+        }
+
+
+# Global governor instance
+send_governor: Optional[SendGovernor] = None
+
+
+def get_send_governor(**kwargs: Any) -> SendGovernor:
+    """Get or create the shared send governor."""
+    global send_governor
+    if send_governor is None:
+        send_governor = SendGovernor(**kwargs)
+    return send_governor
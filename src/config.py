@@ -6,8 +6,9 @@ validation, and type safety.
 """
 
 import os
+import socket
 from pathlib import Path
-from typing import Optional
+from typing import Dict, Optional
 
 from dotenv import load_dotenv
 
@@ -24,19 +25,70 @@ class Config:
     # Database Configuration
     DATABASE_PATH: str = os.getenv('DATABASE_PATH', 'reminders.db')
     DATABASE_URL: str = f"sqlite+aiosqlite:///{DATABASE_PATH}"
+    DATABASE_POOL_SIZE: int = int(os.getenv('DATABASE_POOL_SIZE', '5'))  # Connections kept open
+    DATABASE_MAX_OVERFLOW: int = int(os.getenv('DATABASE_MAX_OVERFLOW', os.getenv('DATABASE_POOL_SIZE', '5')))  # Extra ones in bursts
+    SQLITE_PROFILE: str = os.getenv('SQLITE_PROFILE', 'balanced')  # durable, balanced, throughput
+    SQLITE_CHECKPOINT_SECONDS: float = float(os.getenv('SQLITE_CHECKPOINT_SECONDS', '60'))  # 0 = automatic only
+    SQLITE_WAL_TRUNCATE_MB: int = int(os.getenv('SQLITE_WAL_TRUNCATE_MB', '64'))
+    SQLITE_ENGINE_MODE: str = os.getenv('SQLITE_ENGINE_MODE', 'shared')  # shared, split (read pool + one writer)
+    SQLITE_WRITER_QUEUE_SIZE: int = int(os.getenv('SQLITE_WRITER_QUEUE_SIZE', '10000'))
+    SQLITE_GROUP_COMMIT_MAX: int = int(os.getenv('SQLITE_GROUP_COMMIT_MAX', '500'))  # Writes per commit
+    SQLITE_GROUP_COMMIT_WAIT_MS: float = float(os.getenv('SQLITE_GROUP_COMMIT_WAIT_MS', '0'))  # Wait for more writes
     
     # Logging Configuration
     LOG_LEVEL: str = os.getenv('LOG_LEVEL', 'INFO')
     LOG_FILE: Optional[str] = os.getenv('LOG_FILE', 'bot.log')
     LOG_MAX_BYTES: int = int(os.getenv('LOG_MAX_BYTES', '10485760'))  # 10MB
     LOG_BACKUP_COUNT: int = int(os.getenv('LOG_BACKUP_COUNT', '5'))
+    LOG_SINK_CAPACITY: int = int(os.getenv('LOG_SINK_CAPACITY', '10000'))  # SystemLog rows buffered
+    LOG_SINK_BATCH_SIZE: int = int(os.getenv('LOG_SINK_BATCH_SIZE', '500'))
+    LOG_SINK_FLUSH_SECONDS: float = float(os.getenv('LOG_SINK_FLUSH_SECONDS', '2'))
+    LOG_SINK_OVERFLOW: str = os.getenv('LOG_SINK_OVERFLOW', 'drop_oldest')  # drop_oldest, drop_newest
     
     # Scheduler Configuration
     SCHEDULER_TIMEZONE: str = os.getenv('SCHEDULER_TIMEZONE', 'UTC')
+    SCHEDULER_TICK_SECONDS: float = float(os.getenv('SCHEDULER_TICK_SECONDS', '1.0'))
+    SCHEDULER_HORIZON_MINUTES: int = int(os.getenv('SCHEDULER_HORIZON_MINUTES', '0'))  # 0 = load everything
+    SCHEDULER_REFILL_INTERVAL_MINUTES: int = int(os.getenv('SCHEDULER_REFILL_INTERVAL_MINUTES', '5'))
+    SCHEDULER_LOAD_BATCH_SIZE: int = int(os.getenv('SCHEDULER_LOAD_BATCH_SIZE', '1000'))
+    CATCHUP_GRACE_MINUTES: int = int(os.getenv('CATCHUP_GRACE_MINUTES', '15'))  # 0 = mark all overdue missed
+    CATCHUP_RAMP_PER_SECOND: float = float(os.getenv('CATCHUP_RAMP_PER_SECOND', '20'))
+    SCHEDULER_SMOOTHING: bool = os.getenv('SCHEDULER_SMOOTHING', 'false').lower() == 'true'
+    SCHEDULER_LATENESS_BUDGET_SECONDS: float = float(os.getenv('SCHEDULER_LATENESS_BUDGET_SECONDS', '20'))
+    SCHEDULER_PREFETCH_SECONDS: float = float(os.getenv('SCHEDULER_PREFETCH_SECONDS', '2'))
+    SCHEDULER_SHARDS: int = int(os.getenv('SCHEDULER_SHARDS', '0'))  # 0 = single replica, no leases
+    SCHEDULER_REPLICA_ID: str = os.getenv('SCHEDULER_REPLICA_ID', f"{socket.gethostname()}-{os.getpid()}")
+    SCHEDULER_LEASE_TTL_SECONDS: float = float(os.getenv('SCHEDULER_LEASE_TTL_SECONDS', '10'))
+    SCHEDULER_LEASE_RENEW_SECONDS: float = float(os.getenv('SCHEDULER_LEASE_RENEW_SECONDS', '3'))
+    SCHEDULER_SNAPSHOT_PATH: str = os.getenv('SCHEDULER_SNAPSHOT_PATH', '')  # Empty = no snapshot
+    SCHEDULER_SNAPSHOT_INTERVAL_MINUTES: int = int(os.getenv('SCHEDULER_SNAPSHOT_INTERVAL_MINUTES', '5'))  # 0 = on stop only
+    SCHEDULER_DRAIN_SECONDS: float = float(os.getenv('SCHEDULER_DRAIN_SECONDS', '10'))  # Shutdown deadline
+    SCHEDULER_METRICS_FLUSH_MINUTES: int = int(os.getenv('SCHEDULER_METRICS_FLUSH_MINUTES', '5'))
+    
+    # Delivery Configuration
+    DELIVERY_MODE: str = os.getenv('DELIVERY_MODE', 'batch')  # batch, single
+    DELIVERY_CONCURRENCY: int = int(os.getenv('DELIVERY_CONCURRENCY', '20'))
+    DELIVERY_BATCH_SIZE: int = int(os.getenv('DELIVERY_BATCH_SIZE', '500'))
+    DELIVERY_MAX_RETRIES: int = int(os.getenv('DELIVERY_MAX_RETRIES', '5'))
+    DELIVERY_RETRY_BASE_SECONDS: float = float(os.getenv('DELIVERY_RETRY_BASE_SECONDS', '30'))
+    DELIVERY_RETRY_MAX_SECONDS: float = float(os.getenv('DELIVERY_RETRY_MAX_SECONDS', '3600'))
+    DELIVERY_PRERENDER: bool = os.getenv('DELIVERY_PRERENDER', 'false').lower() == 'true'
+    DELIVERY_COALESCE: bool = os.getenv('DELIVERY_COALESCE', 'false').lower() == 'true'
+    DELIVERY_COALESCE_WINDOW_SECONDS: float = float(os.getenv('DELIVERY_COALESCE_WINDOW_SECONDS', '30'))
+    DELIVERY_LANE_WEIGHTS: str = os.getenv('DELIVERY_LANE_WEIGHTS', 'high:6,normal:3,low:1')
+    
+    # Outbound Rate Limits (Telegram flood control)
+    OUTBOUND_MESSAGES_PER_SECOND: float = float(os.getenv('OUTBOUND_MESSAGES_PER_SECOND', '30'))
+    OUTBOUND_CHAT_MESSAGES_PER_SECOND: float = float(os.getenv('OUTBOUND_CHAT_MESSAGES_PER_SECOND', '1'))
+    OUTBOUND_GROUP_MESSAGES_PER_MINUTE: float = float(os.getenv('OUTBOUND_GROUP_MESSAGES_PER_MINUTE', '20'))
     
     # Performance Configuration
     MAX_REMINDERS_PER_USER: int = int(os.getenv('MAX_REMINDERS_PER_USER', '100'))
     CLEANUP_INTERVAL_HOURS: int = int(os.getenv('CLEANUP_INTERVAL_HOURS', '24'))
+    STATS_WRITE_BEHIND: bool = os.getenv('STATS_WRITE_BEHIND', 'false').lower() == 'true'
+    STATS_FLUSH_SECONDS: float = float(os.getenv('STATS_FLUSH_SECONDS', '5'))
+    STATS_FLUSH_MAX_PENDING: int = int(os.getenv('STATS_FLUSH_MAX_PENDING', '1000'))  # Deltas before an early flush
+    STATS_CACHE_SIZE: int = int(os.getenv('STATS_CACHE_SIZE', '10000'))  # Users whose stats screens are cached
     
     # Feature Flags
     ENABLE_STATS: bool = os.getenv('ENABLE_STATS', 'true').lower() == 'true'
@@ -60,6 +112,97 @@ class Config:
         if cls.MAX_REMINDERS_PER_USER <= 0:
             errors.append("MAX_REMINDERS_PER_USER must be positive")
         
+        if cls.SCHEDULER_TICK_SECONDS <= 0:
+            errors.append("SCHEDULER_TICK_SECONDS must be positive")
+        
+        if min(cls.OUTBOUND_MESSAGES_PER_SECOND, cls.OUTBOUND_CHAT_MESSAGES_PER_SECOND,
+               cls.OUTBOUND_GROUP_MESSAGES_PER_MINUTE) <= 0:
+            errors.append("OUTBOUND_* rate limits must be positive")
+        
+        if cls.DELIVERY_MODE not in ['batch', 'single']:
+            errors.append(f"Invalid DELIVERY_MODE: {cls.DELIVERY_MODE}")
+        
+        if cls.DELIVERY_CONCURRENCY <= 0 or cls.DELIVERY_BATCH_SIZE <= 0:
+            errors.append("DELIVERY_CONCURRENCY and DELIVERY_BATCH_SIZE must be positive")
+        
+        try:
+            weights = cls.get_lane_weights()
+            if 'normal' not in weights or min(weights.values()) <= 0:
+                errors.append("DELIVERY_LANE_WEIGHTS needs a 'normal' lane and positive weights")
+        except ValueError:
+            errors.append(f"Invalid DELIVERY_LANE_WEIGHTS: {cls.DELIVERY_LANE_WEIGHTS}")
+        
+        if cls.CATCHUP_GRACE_MINUTES < 0 or cls.CATCHUP_RAMP_PER_SECOND <= 0:
+            errors.append("CATCHUP_GRACE_MINUTES must not be negative and CATCHUP_RAMP_PER_SECOND must be positive")
+        
+        if cls.SCHEDULER_LATENESS_BUDGET_SECONDS < 0 or cls.SCHEDULER_PREFETCH_SECONDS < 0:
+            errors.append("SCHEDULER_LATENESS_BUDGET_SECONDS and SCHEDULER_PREFETCH_SECONDS must not be negative")
+        
+        if cls.SCHEDULER_SHARDS < 0:
+            errors.append("SCHEDULER_SHARDS must not be negative")
+        
+        if cls.SCHEDULER_SHARDS and not 0 < cls.SCHEDULER_LEASE_RENEW_SECONDS < cls.SCHEDULER_LEASE_TTL_SECONDS:
+            errors.append("SCHEDULER_LEASE_RENEW_SECONDS must be positive and shorter than the lease TTL")
+        
+        if cls.SCHEDULER_SNAPSHOT_INTERVAL_MINUTES < 0:
+            errors.append("SCHEDULER_SNAPSHOT_INTERVAL_MINUTES must not be negative")
+        
+        if cls.SCHEDULER_DRAIN_SECONDS < 0:
+            errors.append("SCHEDULER_DRAIN_SECONDS must not be negative")
+        
+        if cls.LOG_SINK_CAPACITY <= 0 or cls.LOG_SINK_BATCH_SIZE <= 0 or cls.LOG_SINK_FLUSH_SECONDS <= 0:
+            errors.append("LOG_SINK_CAPACITY, LOG_SINK_BATCH_SIZE and LOG_SINK_FLUSH_SECONDS must be positive")
+        
+        if cls.LOG_SINK_OVERFLOW not in ['drop_oldest', 'drop_newest']:
+            errors.append(f"Invalid LOG_SINK_OVERFLOW: {cls.LOG_SINK_OVERFLOW}")
+        
+        if cls.DATABASE_POOL_SIZE <= 0 or cls.DATABASE_MAX_OVERFLOW < 0:
+            errors.append("DATABASE_POOL_SIZE must be positive and DATABASE_MAX_OVERFLOW must not be negative")
+        
+        if cls.SQLITE_PROFILE not in ['durable', 'balanced', 'throughput']:
+            errors.append(f"Invalid SQLITE_PROFILE: {cls.SQLITE_PROFILE}")
+        
+        if cls.SQLITE_CHECKPOINT_SECONDS < 0 or cls.SQLITE_WAL_TRUNCATE_MB <= 0:
+            errors.append("SQLITE_CHECKPOINT_SECONDS must not be negative and SQLITE_WAL_TRUNCATE_MB must be positive")
+        
+        if cls.SQLITE_ENGINE_MODE not in ['shared', 'split']:
+            errors.append(f"Invalid SQLITE_ENGINE_MODE: {cls.SQLITE_ENGINE_MODE}")
+        
+        if cls.SQLITE_ENGINE_MODE == 'split' and cls.DATABASE_PATH == ':memory:':
+            errors.append("SQLITE_ENGINE_MODE=split needs a database file")
+        
+        if cls.SQLITE_WRITER_QUEUE_SIZE <= 0 or cls.SQLITE_GROUP_COMMIT_MAX <= 0 or cls.SQLITE_GROUP_COMMIT_WAIT_MS < 0:
+            errors.append(
+                "SQLITE_WRITER_QUEUE_SIZE and SQLITE_GROUP_COMMIT_MAX must be positive, "
+                "SQLITE_GROUP_COMMIT_WAIT_MS must not be negative"
+            )
+        
+        if cls.STATS_FLUSH_SECONDS <= 0 or cls.STATS_FLUSH_MAX_PENDING <= 0:
+            errors.append("STATS_FLUSH_SECONDS and STATS_FLUSH_MAX_PENDING must be positive")
+        
+        if cls.STATS_CACHE_SIZE <= 0:
+            errors.append("STATS_CACHE_SIZE must be positive")
+        
+        if cls.SCHEDULER_METRICS_FLUSH_MINUTES <= 0:
+            errors.append("SCHEDULER_METRICS_FLUSH_MINUTES must be positive")
+        
+        if cls.SCHEDULER_SMOOTHING and cls.DELIVERY_MODE != 'batch':
+            errors.append("SCHEDULER_SMOOTHING requires DELIVERY_MODE=batch")
+        
+        if cls.DELIVERY_COALESCE and cls.DELIVERY_MODE != 'batch':
+            errors.append("DELIVERY_COALESCE requires DELIVERY_MODE=batch")
+        
+        if cls.DELIVERY_COALESCE_WINDOW_SECONDS < 0:
+            errors.append("DELIVERY_COALESCE_WINDOW_SECONDS must not be negative")
+        
+        if cls.SCHEDULER_HORIZON_MINUTES < 0:
+            errors.append("SCHEDULER_HORIZON_MINUTES must not be negative")
+        
+        if cls.SCHEDULER_HORIZON_MINUTES and not (
+            0 < cls.SCHEDULER_REFILL_INTERVAL_MINUTES < cls.SCHEDULER_HORIZON_MINUTES
+        ):
+            errors.append("SCHEDULER_REFILL_INTERVAL_MINUTES must be positive and shorter than the horizon")
+        
         if errors:
             raise ValueError(f"Configuration errors: {', '.join(errors)}")
     
@@ -68,6 +211,15 @@ class Config:
         """Get database file path."""
         return Path(cls.DATABASE_PATH)
     
+    @classmethod
+    def get_lane_weights(cls) -> Dict[str, int]:
+        """Get delivery lane weights, e.g. ``high:6,normal:3,low:1``."""
+        weights = {}
+        for entry in cls.DELIVERY_LANE_WEIGHTS.split(','):
+            lane, weight = entry.split(':')
+            weights[lane.strip()] = int(weight)
+        return weights
+    
     @classmethod
     def get_log_path(cls) -> Optional[Path]:
         """Get log file path."""
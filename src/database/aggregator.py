@@ -0,0 +1,230 @@
+"""
+Counter Aggregator
+
+Write-behind buffer for per-user statistics: increments are summed in
+memory and written as one grouped UPDATE every few seconds.
+"""
+
+import asyncio
+import logging
+from datetime import datetime
+from typing import Any, AsyncContextManager, Awaitable, Callable, Dict, Optional, Sequence
+
+from sqlalchemy import Table, bindparam, func, update
+
+from src.utils.clock import Clock, get_clock
+
+logger = logging.getLogger(__name__)
+
+
+class CounterAggregator:
+    """
+    Accumulates counter deltas and latest timestamps per row of one table.
+
+    ``add`` only touches memory. Pending values are written with a single
+    executemany UPDATE (``counter = counter + :delta`` and
+    ``timestamp = coalesce(:value, timestamp)``) in one commit, once
+    ``max_pending`` additions are waiting or ``flush_interval`` seconds
+    after the first one. A failed write puts its deltas back to be
+    retried with the next flush.
+
+    The database lags by up to ``flush_interval`` seconds, so readers
+    should ``overlay`` what is still pending; ``stop`` writes the rest
+    on shutdown. Rows that do not exist yet are not created.
+
+    With ``run_write`` (called as ``run_write(operation, params)``) the
+    UPDATE is handed to it, e.g. to go through the single writer,
+    instead of running in a session of ``session_factory``.
+    """
+
+    def __init__(
+        self,
+        table: Table,
+        session_factory: Callable[[], AsyncContextManager[Any]],
+        counters: Sequence[str] = (),
+        timestamps: Sequence[str] = (),
+        key: str = 'user_id',
+        flush_interval: float = 5.0,
+        max_pending: int = 1000,
+        clock: Optional[Clock] = None,
+        run_write: Optional[Callable[..., Awaitable[Any]]] = None,
+    ):
+        """Initialize aggregator for ``counters`` and ``timestamps`` columns of ``table``."""
+        if flush_interval <= 0 or max_pending <= 0:
+            raise ValueError("flush_interval and max_pending must be positive")
+
+        self.table = table
+        self.session_factory = session_factory
+        self.counters = tuple(counters)
+        self.timestamps = tuple(timestamps)
+        self.key = key
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.clock = clock or get_clock()
+        self.run_write = run_write
+
+        columns = table.c
+        self._statement = (
+            update(table)
+            .where(columns[key] == bindparam('_key'))
+            .values({
+                **{name: columns[name] + bindparam(f'_add_{name}') for name in self.counters},
+                **{
+                    name: func.coalesce(bindparam(f'_set_{name}', type_=columns[name].type), columns[name])
+                    for name in self.timestamps
+                },
+            })
+        )
+
+        self._pending: Dict[Any, Dict[str, Any]] = {}
+        self._flushing: Dict[Any, Dict[str, Any]] = {}  # Being written right now
+        self._additions = 0
+        self._wake = asyncio.Event()
+        self._timer: Optional[Any] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+        self._stats = {
+            'added': 0,
+            'flushes': 0,
+            'rows_written': 0,
+            'errors': 0,
+        }
+
+    def add(self, key: Any, **values: Any) -> None:
+        """Add counter deltas and set timestamps (latest wins) for one row."""
+        entry = self._pending.setdefault(key, {})
+        self._merge(entry, values)
+        self._additions += 1
+        self._stats['added'] += 1
+
+        if self._task is None:
+            self._stopping = False
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+        if self._additions >= self.max_pending:
+            self._wake.set()
+        elif self._timer is None:
+            self._timer = self.clock.call_later(self.flush_interval, self._wake.set)
+
+    def _merge(self, entry: Dict[str, Any], values: Dict[str, Any]) -> None:
+        """Fold ``values`` into a pending entry."""
+        for name, value in values.items():
+            if name in self.counters:
+                entry[name] = entry.get(name, 0) + value
+            elif name in self.timestamps:
+                current = entry.get(name)
+                if value is not None and (current is None or _comparable(value) > _comparable(current)):
+                    entry[name] = value
+            else:
+                raise KeyError(f"{name!r} is not an aggregated column")
+
+    def pending(self, key: Any) -> Dict[str, Any]:
+        """Get the unwritten deltas and timestamps of one row."""
+        entry: Dict[str, Any] = {}
+        for source in (self._flushing, self._pending):
+            if key in source:
+                self._merge(entry, source[key])
+        return entry
+
+    def overlay(self, row: Any) -> Any:
+        """
+        Apply unwritten values to a row object read from the database.
+
+        Detach ORM instances first, or the session would write the
+        overlaid values back.
+        """
+        for name, value in self.pending(getattr(row, self.key)).items():
+            current = getattr(row, name)
+            if name in self.counters:
+                setattr(row, name, (current or 0) + value)
+            elif current is None or _comparable(value) > _comparable(current):
+                setattr(row, name, value)
+        return row
+
+    async def _run(self) -> None:
+        """Flush whenever a trigger fires."""
+        while True:
+            await self._wake.wait()
+            self._wake.clear()
+            await self.flush()
+            if self._stopping:
+                return
+
+    async def flush(self) -> int:
+        """
+        Write everything pending in one transaction.
+
+        Returns:
+            Number of rows updated
+        """
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        if not self._pending:
+            return 0
+
+        self._flushing, self._pending = self._pending, {}
+        self._additions = 0
+        params = [
+            {
+                '_key': key,
+                **{f'_add_{name}': entry.get(name, 0) for name in self.counters},
+                **{f'_set_{name}': entry.get(name) for name in self.timestamps},
+            }
+            for key, entry in self._flushing.items()
+        ]
+
+        try:
+            if self.run_write is not None:
+                await self.run_write(self._write, params)
+            else:
+                async with self.session_factory() as session:
+                    await self._write(session, params)
+        except Exception as e:
+            # Keep the deltas for the next attempt
+            self._stats['errors'] += 1
+            logger.error(f"❌ Failed to write {len(params)} {self.table.name} counter rows: {e}")
+            for key, entry in self._flushing.items():
+                self._merge(self._pending.setdefault(key, {}), entry)
+                self._additions += 1
+            if self._timer is None:
+                self._timer = self.clock.call_later(self.flush_interval, self._wake.set)
+            return 0
+        finally:
+            self._flushing = {}
+
+        self._stats['flushes'] += 1
+        self._stats['rows_written'] += len(params)
+        return len(params)
+
+    async def _write(self, session: Any, params: Sequence[Dict[str, Any]]) -> None:
+        """Run the grouped UPDATE and commit."""
+        await session.execute(self._statement, params)
+        await session.commit()
+
+    async def stop(self) -> None:
+        """Write what is pending and stop the background task."""
+        if self._task:
+            # Let a write in progress finish rather than cancel it
+            self._stopping = True
+            self._wake.set()
+            await self._task
+            self._task = None
+
+        await self.flush()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get aggregator statistics."""
+        return {
+            'pending_rows': len(self._pending),
+            'pending_additions': self._additions,
+            **self._stats,
+        }
+
+
+def _comparable(value: Any) -> Any:
+    """Drop the zone of aware datetimes so database values compare with local ones."""
+    if isinstance(value, datetime) and value.tzinfo is not None:
+        return value.replace(tzinfo=None)
+    return value
@@ -9,12 +9,14 @@ from datetime import datetime, timedelta
 from typing import List, Optional
 
 from sqlalchemy import (
-    Boolean, DateTime, ForeignKey, Integer, String, Text,
+    Boolean, DateTime, Float, ForeignKey, Integer, String, Text,
     UniqueConstraint, Index, func
 )
 from sqlalchemy.ext.asyncio import AsyncAttrs
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
 
+from src.utils.clock import get_clock, utcnow
+
 
 class Base(AsyncAttrs, DeclarativeBase):
     """Base class for all database models."""
@@ -39,6 +41,7 @@ class User(Base):
     # User preferences
     timezone: Mapped[str] = mapped_column(String(50), default="UTC", nullable=False)
     notification_enabled: Mapped[bool] = mapped_column(Boolean, default=True, nullable=False)
+    lateness_budget: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)  # Seconds, NULL = default
     
     # Tracking info
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=func.now(), nullable=False)
@@ -71,15 +74,25 @@ class Reminder(Base):
     # Scheduling info
     scheduled_time: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, index=True)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=func.now(), nullable=False)
+    updated_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True), default=utcnow, onupdate=utcnow, nullable=True, index=True
+    )  # Schedule snapshots reconcile rows changed after this
     
     # Status tracking
     is_sent: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False)
     sent_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
     
+    # Delivery retries
+    retry_count: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+    next_attempt_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True, index=True)
+    failure_reason: Mapped[Optional[str]] = mapped_column(String(1000), nullable=True)
+    is_failed: Mapped[bool] = mapped_column(Boolean, default=False, server_default="0", nullable=False)  # Dead-lettered
+    
     # Recurring reminders
     is_recurring: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False)
     recurrence_pattern: Mapped[Optional[str]] = mapped_column(String(100), nullable=True)  # "daily", "weekly", etc.
     recurrence_end_date: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+    recurrence_start: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)  # First occurrence
     
     # Category and priority
     category: Mapped[Optional[str]] = mapped_column(String(50), nullable=True, index=True)
@@ -87,6 +100,7 @@ class Reminder(Base):
     
     # Additional metadata
     original_text: Mapped[Optional[str]] = mapped_column(Text, nullable=True)  # Original user input
+    rendered_payload: Mapped[Optional[str]] = mapped_column(Text, nullable=True)  # Pre-rendered send_message JSON
     
     # Relationships
     user: Mapped["User"] = relationship("User", back_populates="reminders")
@@ -104,7 +118,7 @@ class Reminder(Base):
     @property
     def is_overdue(self) -> bool:
         """Check if reminder is overdue."""
-        return not self.is_sent and self.scheduled_time < datetime.utcnow()
+        return not self.is_sent and self.scheduled_time < get_clock().utcnow()
     
     @property
     def time_until_due(self) -> Optional[timedelta]:
@@ -112,7 +126,7 @@ class Reminder(Base):
         if self.is_sent:
             return None
         
-        now = datetime.utcnow()
+        now = get_clock().utcnow()
         if self.scheduled_time > now:
             return self.scheduled_time - now
         return None
@@ -227,3 +241,68 @@ class SystemLog(Base):
     
     def __repr__(self) -> str:
         return f"<SystemLog(id={self.id}, level='{self.level}', message='{self.message[:50]}...')>"
+
+
+class DeliveryStatsHourly(Base):
+    """Per-hour aggregates of delivery lateness, DB time and send time."""
+    
+    __tablename__ = "delivery_stats_hourly"
+    
+    # Primary key
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    
+    # Start of the hour (UTC) and metric name: lateness, db, send
+    hour: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, index=True)
+    metric: Mapped[str] = mapped_column(String(20), nullable=False)
+    
+    # Summary, all in seconds
+    count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    total_seconds: Mapped[float] = mapped_column(Float, default=0.0, nullable=False)
+    max_seconds: Mapped[float] = mapped_column(Float, default=0.0, nullable=False)
+    p50_seconds: Mapped[float] = mapped_column(Float, default=0.0, nullable=False)
+    p95_seconds: Mapped[float] = mapped_column(Float, default=0.0, nullable=False)
+    p99_seconds: Mapped[float] = mapped_column(Float, default=0.0, nullable=False)
+    
+    # Bucket counts (JSON list) so later flushes can be merged in
+    buckets: Mapped[str] = mapped_column(Text, nullable=False)
+    
+    # Constraints
+    __table_args__ = (
+        UniqueConstraint("hour", "metric", name="uq_delivery_stats_hour_metric"),
+    )
+    
+    def __repr__(self) -> str:
+        return f"<DeliveryStatsHourly(hour={self.hour}, metric='{self.metric}', count={self.count})>"
+
+
+class SchedulerLease(Base):
+    """Ownership lease of one scheduler shard by one replica."""
+    
+    __tablename__ = "scheduler_leases"
+    
+    # Shard number (user_id % shard count)
+    shard: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False)
+    
+    # Current owner; free when NULL or expired
+    owner: Mapped[Optional[str]] = mapped_column(String(100), nullable=True)
+    expires_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+    acquired_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+    
+    def __repr__(self) -> str:
+        return f"<SchedulerLease(shard={self.shard}, owner='{self.owner}', expires_at={self.expires_at})>"
+
+
+class SchedulerReplica(Base):
+    """Heartbeat of a running scheduler replica, used to balance shards."""
+    
+    __tablename__ = "scheduler_replicas"
+    
+    # Primary key
+    replica_id: Mapped[str] = mapped_column(String(100), primary_key=True)
+    
+    # Liveness
+    heartbeat_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, index=True)
+    started_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=func.now(), nullable=False)
+    
+    def __repr__(self) -> str:
+        return f"<SchedulerReplica(replica_id='{self.replica_id}', heartbeat_at={self.heartbeat_at})>"
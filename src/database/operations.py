@@ -6,27 +6,52 @@ error handling and transaction management.
 """
 
 import logging
+from collections import Counter, OrderedDict
 from datetime import datetime, timedelta
-from typing import List, Optional, Sequence, Dict, Any
+from typing import List, Optional, Sequence, Dict, Any, AsyncIterator, Awaitable, Callable, Collection, Tuple
 
-from sqlalchemy import select, update, delete, func, and_, or_
+from sqlalchemy import (
+    select, insert, update, delete, func, and_, or_, case, inspect, bindparam, literal, Row
+)
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import selectinload, joinedload
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 from src.config import config
-from src.database.models import Base, User, Reminder, UserStatistics, ReminderTemplate, SystemLog
+from src.utils.formatters import render_reminder_payload
+from src.database.aggregator import CounterAggregator
+from src.database.sqlite_tuning import apply_sqlite_profile, apply_read_only, apply_immediate_transactions
+from src.database.writer import GroupCommitSession, SQLiteWriter, after_commit
+from src.database.models import (
+    Base, User, Reminder, UserStatistics, ReminderTemplate, SystemLog, DeliveryStatsHourly,
+    SchedulerLease, SchedulerReplica
+)
 
 from contextlib import asynccontextmanager
 
+# (shard count, shards to include); reminders are sharded by user_id % shard count
+ShardFilter = Tuple[int, Collection[int]]
+
 logger = logging.getLogger(__name__)
 
-# Database engine and session
+# Database engine and session; pooled so connections keep their page cache.
+# The pool is bounded: the profile's cache budget is split across at most
+# this many connections (plus the writer's in split mode)
+max_connections = config.DATABASE_POOL_SIZE + config.DATABASE_MAX_OVERFLOW
+if config.SQLITE_ENGINE_MODE == 'split':
+    max_connections += 1
+
 engine = create_async_engine(
     config.DATABASE_URL,
     echo=config.DEBUG,
     pool_pre_ping=True,
     pool_recycle=3600,
+    poolclass=AsyncAdaptedQueuePool,
+    pool_size=config.DATABASE_POOL_SIZE,
+    max_overflow=config.DATABASE_MAX_OVERFLOW,  # Beyond this, sessions wait for a connection
 )
+apply_sqlite_profile(engine, config.SQLITE_PROFILE, max_connections)
 
 async_session = async_sessionmaker(
     engine,
@@ -34,18 +59,94 @@ async_session = async_sessionmaker(
     expire_on_commit=False,
 )
 
+# Split mode: the pool above only reads, and every write goes through
+# one connection owned by the writer task (see run_write)
+writer_engine = engine
+db_writer: Optional[SQLiteWriter] = None
+
+if config.SQLITE_ENGINE_MODE == 'split':
+    apply_read_only(engine)
+    
+    writer_engine = create_async_engine(
+        config.DATABASE_URL,
+        echo=config.DEBUG,
+        poolclass=AsyncAdaptedQueuePool,
+        pool_size=1,
+        max_overflow=0,
+    )
+    apply_sqlite_profile(writer_engine, config.SQLITE_PROFILE, max_connections)
+    apply_immediate_transactions(writer_engine)
+    
+    db_writer = SQLiteWriter(
+        async_sessionmaker(writer_engine, class_=GroupCommitSession, expire_on_commit=False),
+        queue_size=config.SQLITE_WRITER_QUEUE_SIZE,
+        max_batch=config.SQLITE_GROUP_COMMIT_MAX,
+        max_wait=config.SQLITE_GROUP_COMMIT_WAIT_MS / 1000,
+    )
+
+
+# Schema changes to tables that existed before, in order. PRAGMA
+# user_version counts how many a database has had; new databases get the
+# current schema from create_all and are stamped with the latest version.
+# Append new entries, never edit released ones.
+MIGRATIONS: List[Tuple[str, ...]] = [
+    # 1: delivery retries
+    (
+        "ALTER TABLE reminders ADD COLUMN retry_count INTEGER DEFAULT 0 NOT NULL",
+        "ALTER TABLE reminders ADD COLUMN next_attempt_at DATETIME",
+        "ALTER TABLE reminders ADD COLUMN failure_reason VARCHAR(1000)",
+        "ALTER TABLE reminders ADD COLUMN is_failed BOOLEAN DEFAULT 0 NOT NULL",
+        "CREATE INDEX ix_reminders_next_attempt_at ON reminders (next_attempt_at)",
+    ),
+    # 2: per-user lateness budget
+    (
+        "ALTER TABLE users ADD COLUMN lateness_budget INTEGER",
+    ),
+    # 3: pre-rendered notifications
+    (
+        "ALTER TABLE reminders ADD COLUMN rendered_payload TEXT",
+    ),
+    # 4: recurrence anchor
+    (
+        "ALTER TABLE reminders ADD COLUMN recurrence_start DATETIME",
+    ),
+    # 5: change tracking for schedule snapshots
+    (
+        "ALTER TABLE reminders ADD COLUMN updated_at DATETIME",
+        "CREATE INDEX ix_reminders_updated_at ON reminders (updated_at)",
+    ),
+]
+
 
 async def init_database() -> None:
-    """Initialize database tables."""
+    """Initialize database tables and migrate an older schema."""
     try:
-        async with engine.begin() as conn:
-            await conn.run_sync(Base.metadata.create_all)
+        async with writer_engine.begin() as conn:
+            await conn.run_sync(_create_schema)
         logger.info("✅ Database initialized successfully")
     except Exception as e:
         logger.error(f"❌ Failed to initialize database: {e}")
         raise
 
 
+def _create_schema(sync_conn) -> None:
+    """Create missing tables, then run the migrations this database has not had yet."""
+    version = sync_conn.exec_driver_sql("PRAGMA user_version").scalar()
+    outdated = version < len(MIGRATIONS) and inspect(sync_conn).has_table(Reminder.__tablename__)
+    
+    Base.metadata.create_all(sync_conn)
+    if version >= len(MIGRATIONS):
+        return
+    
+    if outdated:
+        for number in range(version + 1, len(MIGRATIONS) + 1):
+            for statement in MIGRATIONS[number - 1]:
+                sync_conn.exec_driver_sql(statement)
+            logger.info(f"🔧 Applied schema migration {number}")
+    
+    sync_conn.exec_driver_sql(f"PRAGMA user_version = {len(MIGRATIONS)}")
+
+
 @asynccontextmanager
 async def get_session() -> AsyncSession:
     """Get database session."""
@@ -59,6 +160,179 @@ async def get_session() -> AsyncSession:
             await session.close()
 
 
+async def run_write(operation: Callable[..., Awaitable[Any]], *args: Any, **kwargs: Any) -> Any:
+    """
+    Run a write operation, ``operation(session, *args, **kwargs)``.
+    
+    In split mode it is queued for the writer and committed together
+    with whatever else is waiting; otherwise it gets a session of its
+    own. Either way the operation commits as usual.
+    """
+    if db_writer is not None:
+        return await db_writer.submit(operation, *args, **kwargs)
+    
+    async with get_session() as session:
+        return await operation(session, *args, **kwargs)
+
+
+# Write-behind UserStatistics counters (see STATS_WRITE_BEHIND), added
+# once the change that counts them is committed
+stats_aggregator = CounterAggregator(
+    UserStatistics.__table__,
+    get_session,
+    counters=('total_reminders_created', 'total_reminders_sent', 'total_reminders_missed'),
+    timestamps=('last_updated',),
+    flush_interval=config.STATS_FLUSH_SECONDS,
+    max_pending=config.STATS_FLUSH_MAX_PENDING,
+    run_write=run_write,
+)
+
+
+class UserStatsCache:
+    """
+    LRU cache of what the stats screens show, per user.
+    
+    Entries are dropped by every write that changes a user's reminders
+    or counters, and expire by themselves when the next pending
+    reminder becomes overdue. Telegram IDs are mapped to user IDs here
+    too, as that mapping never changes.
+    """
+    
+    def __init__(self, max_users: int = 10000):
+        """Initialize cache."""
+        self.max_users = max_users
+        self._entries: OrderedDict = OrderedDict()  # user_id -> (value, valid_until)
+        self._user_ids: OrderedDict = OrderedDict()  # telegram_id -> user_id
+        self._stats = {'hits': 0, 'misses': 0, 'invalidations': 0}
+    
+    def get(self, user_id: int, now: datetime) -> Optional[Dict[str, Any]]:
+        """Get a user's cached stats, if still valid at ``now``."""
+        entry = self._entries.get(user_id)
+        if entry is None or (entry[1] is not None and entry[1] <= now):
+            self._stats['misses'] += 1
+            return None
+        
+        self._entries.move_to_end(user_id)
+        self._stats['hits'] += 1
+        return entry[0]
+    
+    def put(self, user_id: int, value: Dict[str, Any], valid_until: Optional[datetime] = None) -> None:
+        """Cache a user's stats until invalidated or ``valid_until``."""
+        self._entries[user_id] = (value, valid_until)
+        self._entries.move_to_end(user_id)
+        if len(self._entries) > self.max_users:
+            self._entries.popitem(last=False)
+    
+    def invalidate(self, user_ids: Collection[int]) -> None:
+        """Drop the cached stats of these users."""
+        for user_id in user_ids:
+            if self._entries.pop(user_id, None) is not None:
+                self._stats['invalidations'] += 1
+    
+    def clear(self) -> None:
+        """Drop everything, e.g. after the database was emptied."""
+        self._entries.clear()
+        self._user_ids.clear()
+    
+    def get_user_id(self, telegram_id: int) -> Optional[int]:
+        """Get a known user ID by Telegram ID."""
+        return self._user_ids.get(telegram_id)
+    
+    def put_user_id(self, telegram_id: int, user_id: int) -> None:
+        """Remember a user's ID."""
+        self._user_ids[telegram_id] = user_id
+        self._user_ids.move_to_end(telegram_id)
+        if len(self._user_ids) > self.max_users:
+            self._user_ids.popitem(last=False)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics."""
+        return {'users': len(self._entries), **self._stats}
+
+
+user_stats_cache = UserStatsCache(config.STATS_CACHE_SIZE)
+
+
+class ReminderLimitError(Exception):
+    """Raised when a user already has the maximum number of active reminders."""
+    
+    def __init__(self, limit: int):
+        super().__init__(f"Reminder limit of {limit} reached")
+        self.limit = limit
+
+
+class DeliveryUser:
+    """User columns read when delivering a reminder."""
+    
+    __slots__ = ('id', 'telegram_id', 'timezone', 'notification_enabled', 'lateness_budget')
+    
+    def __init__(
+        self,
+        id: int,
+        telegram_id: int,
+        timezone: str,
+        notification_enabled: bool,
+        lateness_budget: Optional[int],
+    ):
+        """Initialize record."""
+        self.id = id
+        self.telegram_id = telegram_id
+        self.timezone = timezone
+        self.notification_enabled = notification_enabled
+        self.lateness_budget = lateness_budget
+
+
+class DeliveryRecord:
+    """
+    Reminder as read for delivery: plain attributes, no ORM state.
+    
+    Attribute names match ``Reminder`` (and ``user`` matches ``User``),
+    so formatters and the recurrence engine accept either.
+    """
+    
+    __slots__ = (
+        'id', 'user_id', 'title', 'description', 'category', 'priority',
+        'scheduled_time', 'next_attempt_at', 'retry_count', 'rendered_payload',
+        'is_recurring', 'recurrence_pattern', 'recurrence_start', 'recurrence_end_date',
+        'user',
+    )
+    
+    # Selected in this order, followed by USER_COLUMNS
+    COLUMNS = (
+        Reminder.id, Reminder.user_id, Reminder.title, Reminder.description,
+        Reminder.category, Reminder.priority, Reminder.scheduled_time,
+        Reminder.next_attempt_at, Reminder.retry_count, Reminder.rendered_payload,
+        Reminder.is_recurring, Reminder.recurrence_pattern, Reminder.recurrence_start,
+        Reminder.recurrence_end_date,
+    )
+    USER_COLUMNS = (User.telegram_id, User.timezone, User.notification_enabled, User.lateness_budget)
+    
+    def __init__(self, row: Sequence[Any]):
+        """Initialize record from a row of ``COLUMNS + USER_COLUMNS``."""
+        (
+            self.id, self.user_id, self.title, self.description, self.category,
+            self.priority, self.scheduled_time, self.next_attempt_at, self.retry_count,
+            self.rendered_payload, self.is_recurring, self.recurrence_pattern,
+            self.recurrence_start, self.recurrence_end_date,
+            telegram_id, timezone, notification_enabled, lateness_budget,
+        ) = row
+        self.user = DeliveryUser(self.user_id, telegram_id, timezone, notification_enabled, lateness_budget)
+    
+    @property
+    def chat_id(self) -> int:
+        """Telegram chat to deliver to."""
+        return self.user.telegram_id
+
+
+def _shard_conditions(shards: Optional[ShardFilter]) -> list:
+    """Get WHERE conditions restricting reminders to the given shards."""
+    if shards is None:
+        return []
+    
+    shard_count, owned = shards
+    return [(Reminder.user_id % shard_count).in_(list(owned))]
+
+
 class UserOperations:
     """User database operations."""
     
@@ -104,6 +378,16 @@ class UserOperations:
         await session.refresh(user)
         return user
     
+    @staticmethod
+    async def get_user_id_by_telegram_id(session: AsyncSession, telegram_id: int) -> Optional[int]:
+        """Get user ID by Telegram ID (cached once known)."""
+        user_id = user_stats_cache.get_user_id(telegram_id)
+        if user_id is None:
+            user_id = await session.scalar(select(User.id).where(User.telegram_id == telegram_id))
+            if user_id is not None:
+                user_stats_cache.put_user_id(telegram_id, user_id)
+        return user_id
+    
     @staticmethod
     async def get_user_by_telegram_id(session: AsyncSession, telegram_id: int) -> Optional[User]:
         """Get user by telegram ID."""
@@ -123,6 +407,18 @@ class UserOperations:
         await session.commit()
         return result.rowcount > 0
     
+    @staticmethod
+    async def update_lateness_budget(session: AsyncSession, telegram_id: int, seconds: Optional[int]) -> bool:
+        """Update how late a user's reminders may be sent to spread load (None = default)."""
+        stmt = (
+            update(User)
+            .where(User.telegram_id == telegram_id)
+            .values(lateness_budget=seconds)
+        )
+        result = await session.execute(stmt)
+        await session.commit()
+        return result.rowcount > 0
+    
     @staticmethod
     async def get_active_users_count(session: AsyncSession) -> int:
         """Get count of active users."""
@@ -159,18 +455,99 @@ class ReminderOperations:
             is_recurring=is_recurring,
             recurrence_pattern=recurrence_pattern,
             recurrence_end_date=recurrence_end_date,
+            recurrence_start=scheduled_time if is_recurring else None,
             original_text=original_text,
         )
         
         session.add(reminder)
-        await session.commit()
-        await session.refresh(reminder)
+        await session.flush()  # Assigns the ID
+        if config.DELIVERY_PRERENDER:
+            reminder.rendered_payload = render_reminder_payload(reminder)
         
-        # Update user statistics
-        await UserOperations.increment_reminders_created(session, user_id)
+        await StatisticsOperations.increment_reminders_created(session, user_id, commit=False)
+        await session.commit()
+        after_commit(session, user_stats_cache.invalidate, [user_id])
         
         return reminder
     
+    @staticmethod
+    async def create_reminder_by_telegram_id(
+        session: AsyncSession,
+        telegram_id: int,
+        title: str,
+        description: Optional[str],
+        scheduled_time: datetime,
+        category: Optional[str] = None,
+        priority: str = "normal",
+        original_text: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> Optional[int]:
+        """
+        Create a reminder for a Telegram user in one transaction.
+        
+        The reminder is inserted with ``INSERT ... SELECT`` from the user's
+        row, guarded by a count of their active reminders, so the lookup and
+        the limit check cannot race with another create. The creation
+        counter is bumped in the same transaction and committed once.
+        
+        Returns:
+            New reminder ID, or None if the user is not registered
+        
+        Raises:
+            ReminderLimitError: If the user has ``limit`` active reminders
+                (``config.MAX_REMINDERS_PER_USER`` by default)
+        """
+        limit = limit or config.MAX_REMINDERS_PER_USER
+        values = {
+            'title': title,
+            'description': description,
+            'scheduled_time': scheduled_time,
+            'category': category,
+            'priority': priority,
+            'original_text': original_text,
+        }
+        columns = Reminder.__table__.c
+        
+        active = (
+            select(func.count())
+            .where(and_(
+                Reminder.user_id == User.id,
+                Reminder.is_sent == False,
+                Reminder.is_failed == False
+            ))
+            .scalar_subquery()
+        )
+        source = (
+            select(User.id, *(literal(value, columns[name].type) for name, value in values.items()))
+            .where(and_(User.telegram_id == telegram_id, active < limit))
+        )
+        result = await session.execute(
+            insert(Reminder)
+            .from_select(['user_id', *values], source)
+            .returning(Reminder.id, Reminder.user_id)
+        )
+        row = result.first()
+        
+        if row is None:
+            await session.rollback()
+            user_id = await session.scalar(select(User.id).where(User.telegram_id == telegram_id))
+            if user_id is None:
+                return None
+            raise ReminderLimitError(limit)
+        
+        reminder_id, user_id = row
+        if config.DELIVERY_PRERENDER:
+            payload = render_reminder_payload(Reminder(id=reminder_id, user_id=user_id, **values))
+            await session.execute(
+                update(Reminder).where(Reminder.id == reminder_id).values(rendered_payload=payload)
+            )
+        
+        await StatisticsOperations.increment_reminders_created(session, user_id, commit=False)
+        await session.commit()
+        after_commit(session, user_stats_cache.invalidate, [user_id])
+        
+        return reminder_id
+    
     @staticmethod
     async def get_user_reminders(
         session: AsyncSession,
@@ -214,26 +591,289 @@ class ReminderOperations:
         result = await session.execute(stmt)
         return list(result.scalars().all())
     
+    @staticmethod
+    async def iter_pending_schedule(
+        session: AsyncSession,
+        after: Optional[datetime],
+        until: datetime,
+        batch_size: int = 1000,
+        shards: Optional[ShardFilter] = None,
+        after_id: Optional[int] = None,
+    ) -> AsyncIterator[Sequence[Row]]:
+        """
+        Stream ``(id, due_time)`` rows of unsent reminders in a time window.
+        
+        Rows come in partitions of ``batch_size`` straight off the
+        ``idx_scheduled_unsent`` range scan, without building ORM objects.
+        Reminders waiting for a delivery retry are matched on
+        ``next_attempt_at`` instead of ``scheduled_time``. ``shards`` and
+        ``after_id`` narrow the scan to some shards or to newer rows.
+        """
+        for due_column, retrying in (
+            (Reminder.scheduled_time, False),
+            (Reminder.next_attempt_at, True),
+        ):
+            conditions = [
+                due_column <= until,
+                Reminder.is_sent == False,
+                Reminder.is_failed == False,
+                Reminder.next_attempt_at.isnot(None) if retrying else Reminder.next_attempt_at.is_(None),
+            ]
+            if after is not None:
+                conditions.append(due_column > after)
+            if after_id is not None:
+                conditions.append(Reminder.id > after_id)
+            conditions.extend(_shard_conditions(shards))
+            
+            stmt = (
+                select(Reminder.id, due_column)
+                .where(and_(*conditions))
+                .order_by(due_column)
+                .execution_options(yield_per=batch_size)
+            )
+            
+            result = await session.stream(stmt)
+            async for partition in result.partitions():
+                yield partition
+    
+    @staticmethod
+    async def iter_schedule_changes(
+        session: AsyncSession,
+        since: datetime,
+        after_id: int,
+        batch_size: int = 1000,
+        shards: Optional[ShardFilter] = None,
+    ) -> AsyncIterator[Sequence[Row]]:
+        """
+        Stream ``(id, due_time, pending)`` rows of reminders created after
+        ``after_id`` or modified since ``since``, whatever their state.
+        ``shards`` narrows them to some shards.
+        """
+        stmt = (
+            select(
+                Reminder.id,
+                func.coalesce(Reminder.next_attempt_at, Reminder.scheduled_time),
+                and_(Reminder.is_sent == False, Reminder.is_failed == False)
+            )
+            .where(and_(or_(Reminder.id > after_id, Reminder.updated_at >= since), *_shard_conditions(shards)))
+            .execution_options(yield_per=batch_size)
+        )
+        
+        result = await session.stream(stmt)
+        async for partition in result.partitions():
+            yield partition
+    
     @staticmethod
     async def mark_reminder_sent(session: AsyncSession, reminder_id: int) -> bool:
         """Mark reminder as sent."""
-        stmt = (
+        return await ReminderOperations.mark_reminders_sent(session, [reminder_id]) > 0
+    
+    @staticmethod
+    async def mark_reminders_sent(
+        session: AsyncSession,
+        reminder_ids: List[int],
+        advanced_user_ids: Sequence[int] = (),
+    ) -> int:
+        """
+        Mark a batch of reminders as sent and count them in user statistics.
+        
+        One ``UPDATE ... RETURNING user_id`` marks the reminders, then one
+        grouped counter update per user bumps ``total_reminders_sent``,
+        all in a single commit. ``advanced_user_ids`` lists the owners of
+        delivered recurring reminders that were moved to their next
+        occurrence instead of being marked; they are counted too.
+        
+        Returns:
+            Number of reminders marked sent
+        """
+        now = datetime.utcnow()
+        sent_user_ids: List[int] = []
+        
+        if reminder_ids:
+            result = await session.execute(
+                update(Reminder)
+                .where(and_(Reminder.id.in_(reminder_ids), Reminder.is_sent == False))
+                .values(is_sent=True, sent_at=now)
+                .returning(Reminder.user_id)
+            )
+            sent_user_ids = list(result.scalars())
+        
+        delivered_per_user = Counter(sent_user_ids + list(advanced_user_ids))
+        await StatisticsOperations.add_reminders_sent(session, delivered_per_user, now)
+        
+        await session.commit()
+        after_commit(session, user_stats_cache.invalidate, delivered_per_user)
+        return len(sent_user_ids)
+    
+    @staticmethod
+    async def mark_overdue_missed(
+        session: AsyncSession,
+        before: datetime,
+        shards: Optional[ShardFilter] = None
+    ) -> int:
+        """
+        Give up on every pending reminder due at or before ``before``.
+        
+        Set-based: one UPDATE bumps ``total_reminders_missed`` per user and
+        one UPDATE marks the reminders, in a single transaction.
+        """
+        now = datetime.utcnow()
+        overdue = and_(
+            Reminder.is_sent == False,
+            Reminder.is_failed == False,
+            Reminder.is_recurring == False,  # Advanced instead, see get_overdue_recurring
+            or_(
+                and_(Reminder.next_attempt_at.is_(None), Reminder.scheduled_time <= before),
+                Reminder.next_attempt_at <= before
+            ),
+            *_shard_conditions(shards)
+        )
+        
+        missed_per_user = (
+            select(func.count(Reminder.id))
+            .where(and_(Reminder.user_id == UserStatistics.user_id, overdue))
+            .scalar_subquery()
+        )
+        await session.execute(
+            update(UserStatistics)
+            .where(UserStatistics.user_id.in_(select(Reminder.user_id).where(overdue)))
+            .values(
+                total_reminders_missed=UserStatistics.total_reminders_missed + missed_per_user,
+                last_updated=now
+            )
+        )
+        
+        result = await session.execute(
             update(Reminder)
-            .where(Reminder.id == reminder_id)
-            .values(is_sent=True, sent_at=datetime.utcnow())
+            .where(overdue)
+            .values(is_failed=True, failure_reason="missed")
+            .returning(Reminder.user_id)
         )
+        missed_user_ids = list(result.scalars())
+        missed = len(missed_user_ids)
+        
+        if missed:
+            session.add(SystemLog(
+                level="WARNING",
+                message=f"{missed} reminders missed (overdue)",
+                module="scheduler"
+            ))
         
-        result = await session.execute(stmt)
         await session.commit()
+        after_commit(session, user_stats_cache.invalidate, missed_user_ids)
+        return missed
+    
+    @staticmethod
+    async def get_overdue_recurring(
+        session: AsyncSession,
+        before: datetime,
+        shards: Optional[ShardFilter] = None
+    ) -> List[Reminder]:
+        """Get pending recurring reminders (with users) due at or before ``before``."""
+        stmt = (
+            select(Reminder)
+            .options(joinedload(Reminder.user))
+            .where(
+                and_(
+                    Reminder.is_sent == False,
+                    Reminder.is_failed == False,
+                    Reminder.is_recurring == True,
+                    func.coalesce(Reminder.next_attempt_at, Reminder.scheduled_time) <= before,
+                    *_shard_conditions(shards)
+                )
+            )
+        )
+        result = await session.execute(stmt)
+        return list(result.scalars().all())
+    
+    @staticmethod
+    async def advance_recurring(
+        session: AsyncSession,
+        advances: List[Dict[str, Any]],
+        commit: bool = True
+    ) -> None:
+        """Move recurring reminders to their next occurrence in place (bulk update by ID)."""
+        if advances:
+            await session.execute(update(Reminder), advances)
+        
+        if commit:
+            await session.commit()
+    
+    @staticmethod
+    async def record_delivery_failures(
+        session: AsyncSession,
+        failures: List[Dict[str, Any]],
+        commit: bool = True,
+    ) -> None:
+        """
+        Record failed deliveries with one executemany UPDATE.
+        
+        Each entry holds ``id``, ``retry_count``, ``next_attempt_at``,
+        ``failure_reason`` and ``is_failed`` (dead-lettered).
+        """
+        if failures:
+            await session.execute(update(Reminder), failures)
+        
+        if commit:
+            await session.commit()
+    
+    @staticmethod
+    async def get_delivery_records(
+        session: AsyncSession,
+        reminder_ids: List[int],
+        due_before: Optional[datetime] = None,
+    ) -> List[DeliveryRecord]:
+        """
+        Get unsent reminders and their users' delivery settings.
+        
+        A single joined SELECT of plain columns: rows never enter the
+        identity map and nothing can trigger a lazy load later. With
+        ``due_before`` only reminders due by then are returned, so an
+        out-of-date schedule entry cannot send one early.
+        """
+        if not reminder_ids:
+            return []
         
-        if result.rowcount > 0:
-            # Update user statistics
-            reminder = await ReminderOperations.get_reminder_by_id(session, reminder_id)
-            if reminder:
-                await UserOperations.increment_reminders_sent(session, reminder.user_id)
-            return True
+        conditions = [
+            Reminder.id.in_(reminder_ids),
+            Reminder.is_sent == False,
+            Reminder.is_failed == False
+        ]
+        if due_before is not None:
+            conditions.append(func.coalesce(Reminder.next_attempt_at, Reminder.scheduled_time) <= due_before)
         
-        return False
+        stmt = (
+            select(*DeliveryRecord.COLUMNS, *DeliveryRecord.USER_COLUMNS)
+            .join(User, Reminder.user_id == User.id)
+            .where(and_(*conditions))
+        )
+        result = await session.execute(stmt)
+        return [DeliveryRecord(row) for row in result]
+    
+    @staticmethod
+    async def get_due_times(session: AsyncSession, reminder_ids: Collection[int]) -> List[Row]:
+        """Get ``(id, due_time)`` rows of the given reminders that are still unsent."""
+        if not reminder_ids:
+            return []
+        
+        stmt = select(
+            Reminder.id,
+            func.coalesce(Reminder.next_attempt_at, Reminder.scheduled_time)
+        ).where(
+            and_(
+                Reminder.id.in_(list(reminder_ids)),
+                Reminder.is_sent == False,
+                Reminder.is_failed == False
+            )
+        )
+        result = await session.execute(stmt)
+        return list(result)
+    
+    @staticmethod
+    async def get_max_id(session: AsyncSession) -> int:
+        """Get the highest reminder ID (0 if there are none)."""
+        result = await session.execute(select(func.max(Reminder.id)))
+        return result.scalar() or 0
     
     @staticmethod
     async def get_reminder_by_id(session: AsyncSession, reminder_id: int) -> Optional[Reminder]:
@@ -260,6 +900,10 @@ class ReminderOperations:
             updates["description"] = description
         if scheduled_time is not None:
             updates["scheduled_time"] = scheduled_time
+            # A new time starts a fresh delivery attempt (and recurrence anchor)
+            updates["next_attempt_at"] = None
+            updates["retry_count"] = 0
+            updates["recurrence_start"] = None
         if category is not None:
             updates["category"] = category
         if priority is not None:
@@ -268,11 +912,30 @@ class ReminderOperations:
         if not updates:
             return False
         
-        stmt = update(Reminder).where(Reminder.id == reminder_id).values(**updates)
-        result = await session.execute(stmt)
+        stmt = (
+            update(Reminder)
+            .where(Reminder.id == reminder_id)
+            .values(**updates)
+            .returning(Reminder.user_id)
+        )
+        user_id = (await session.execute(stmt)).scalar_one_or_none()
+        
+        if user_id is not None and config.DELIVERY_PRERENDER:
+            stmt = (
+                select(Reminder)
+                .where(Reminder.id == reminder_id)
+                .execution_options(populate_existing=True)
+            )
+            reminder = (await session.execute(stmt)).scalar_one()
+            reminder.rendered_payload = render_reminder_payload(reminder)
+        
         await session.commit()
         
-        return result.rowcount > 0
+        if user_id is None:
+            return False
+        
+        after_commit(session, user_stats_cache.invalidate, [user_id])
+        return True
     
     @staticmethod
     async def delete_reminder(session: AsyncSession, reminder_id: int, user_id: int) -> bool:
@@ -282,6 +945,7 @@ class ReminderOperations:
         )
         result = await session.execute(stmt)
         await session.commit()
+        after_commit(session, user_stats_cache.invalidate, [user_id])
         
         return result.rowcount > 0
     
@@ -291,6 +955,7 @@ class ReminderOperations:
         stmt = delete(Reminder).where(Reminder.user_id == user_id)
         result = await session.execute(stmt)
         await session.commit()
+        after_commit(session, user_stats_cache.invalidate, [user_id])
         
         return result.rowcount or 0
     
@@ -315,84 +980,155 @@ class ReminderOperations:
     
     @staticmethod
     async def get_user_reminder_stats(session: AsyncSession, user_id: int) -> Dict[str, Any]:
-        """Get user's reminder statistics."""
-        # Total reminders
-        total_stmt = select(func.count(Reminder.id)).where(Reminder.user_id == user_id)
-        total_result = await session.execute(total_stmt)
-        total = total_result.scalar() or 0
-        
-        # Sent reminders
-        sent_stmt = select(func.count(Reminder.id)).where(
-            and_(Reminder.user_id == user_id, Reminder.is_sent == True)
-        )
-        sent_result = await session.execute(sent_stmt)
-        sent = sent_result.scalar() or 0
+        """
+        Get user's reminder statistics in one pass over their rows.
         
-        # Pending reminders
-        pending_stmt = select(func.count(Reminder.id)).where(
-            and_(Reminder.user_id == user_id, Reminder.is_sent == False)
-        )
-        pending_result = await session.execute(pending_stmt)
-        pending = pending_result.scalar() or 0
-        
-        # Overdue reminders
+        Conditional sums over the ``idx_user_scheduled_time`` range of the
+        user. ``next_due`` is when the next pending reminder turns
+        overdue, i.e. until when the counts hold without any writes.
+        """
         now = datetime.utcnow()
-        overdue_stmt = select(func.count(Reminder.id)).where(
-            and_(
-                Reminder.user_id == user_id,
-                Reminder.scheduled_time < now,
-                Reminder.is_sent == False
+        unsent = Reminder.is_sent == False
+        
+        stmt = (
+            select(
+                func.count(),
+                func.sum(case((Reminder.is_sent == True, 1), else_=0)),
+                func.sum(case((and_(unsent, Reminder.scheduled_time < now), 1), else_=0)),
+                func.min(case((and_(unsent, Reminder.scheduled_time >= now), Reminder.scheduled_time))),
             )
+            .where(Reminder.user_id == user_id)
         )
-        overdue_result = await session.execute(overdue_stmt)
-        overdue = overdue_result.scalar() or 0
+        total, sent, overdue, next_due = (await session.execute(stmt)).one()
+        sent = sent or 0
         
         return {
             "total": total,
             "sent": sent,
-            "pending": pending,
-            "overdue": overdue,
+            "pending": total - sent,
+            "overdue": overdue or 0,
             "completion_rate": (sent / total * 100) if total > 0 else 0,
+            "next_due": next_due,
         }
 
 
 class StatisticsOperations:
     """Statistics database operations."""
     
+    @staticmethod
+    async def get_stats_overview(session: AsyncSession, user_id: int) -> Dict[str, Any]:
+        """
+        Get everything the stats screens show, from memory when possible.
+        
+        Returns:
+            ``statistics`` (UserStatistics or None) and ``reminders``
+            (see ``ReminderOperations.get_user_reminder_stats``)
+        """
+        overview = user_stats_cache.get(user_id, datetime.utcnow())
+        if overview is not None:
+            return overview
+        
+        statistics = await StatisticsOperations.get_user_statistics(session, user_id)
+        if statistics is not None and statistics in session:
+            session.expunge(statistics)  # Outlives the session in the cache
+        reminders = await ReminderOperations.get_user_reminder_stats(session, user_id)
+        
+        overview = {'statistics': statistics, 'reminders': reminders}
+        user_stats_cache.put(user_id, overview, reminders['next_due'])
+        return overview
+    
     @staticmethod
     async def get_user_statistics(session: AsyncSession, user_id: int) -> Optional[UserStatistics]:
-        """Get user statistics."""
+        """Get user statistics, including counts not yet written behind."""
         stmt = select(UserStatistics).where(UserStatistics.user_id == user_id)
         result = await session.execute(stmt)
-        return result.scalar_one_or_none()
+        stats = result.scalar_one_or_none()
+        
+        if stats and stats_aggregator.pending(user_id):
+            # Detached, so the overlaid counts are never flushed as-is
+            session.expunge(stats)
+            stats_aggregator.overlay(stats)
+        
+        return stats
     
     @staticmethod
-    async def increment_reminders_created(session: AsyncSession, user_id: int) -> None:
+    async def increment_reminders_created(
+        session: AsyncSession,
+        user_id: int,
+        commit: bool = True,
+    ) -> None:
         """Increment user's reminders created count."""
-        stmt = (
-            update(UserStatistics)
-            .where(UserStatistics.user_id == user_id)
-            .values(
-                total_reminders_created=UserStatistics.total_reminders_created + 1,
-                last_updated=datetime.utcnow()
+        if config.STATS_WRITE_BEHIND:
+            after_commit(session, stats_aggregator.add, user_id, total_reminders_created=1, last_updated=datetime.utcnow())
+        else:
+            stmt = (
+                update(UserStatistics)
+                .where(UserStatistics.user_id == user_id)
+                .values(
+                    total_reminders_created=UserStatistics.total_reminders_created + 1,
+                    last_updated=datetime.utcnow()
+                )
             )
-        )
-        await session.execute(stmt)
-        await session.commit()
+            await session.execute(stmt)
+        
+        if commit:
+            await session.commit()
     
     @staticmethod
     async def increment_reminders_sent(session: AsyncSession, user_id: int) -> None:
         """Increment user's reminders sent count."""
+        await StatisticsOperations.add_reminders_sent(session, {user_id: 1})
+        await session.commit()
+    
+    @staticmethod
+    async def add_reminders_sent(
+        session: AsyncSession,
+        sent_per_user: Dict[int, int],
+        now: Optional[datetime] = None,
+    ) -> None:
+        """Add to users' sent counters with one executemany UPDATE (no commit)."""
+        await StatisticsOperations._add_per_user(session, 'total_reminders_sent', sent_per_user, now)
+    
+    @staticmethod
+    async def add_reminders_missed(
+        session: AsyncSession,
+        missed_per_user: Dict[int, int],
+        now: Optional[datetime] = None,
+    ) -> None:
+        """Add to users' missed counters with one executemany UPDATE (no commit)."""
+        await StatisticsOperations._add_per_user(session, 'total_reminders_missed', missed_per_user, now)
+        after_commit(session, user_stats_cache.invalidate, list(missed_per_user))
+    
+    @staticmethod
+    async def _add_per_user(
+        session: AsyncSession,
+        counter: str,
+        per_user: Dict[int, int],
+        now: Optional[datetime] = None,
+    ) -> None:
+        """Add per-user amounts to one UserStatistics counter, written behind if enabled."""
+        if not per_user:
+            return
+        
+        now = now or datetime.utcnow()
+        if config.STATS_WRITE_BEHIND:
+            for user_id, count in per_user.items():
+                after_commit(session, stats_aggregator.add, user_id, last_updated=now, **{counter: count})
+            return
+        
+        stats = UserStatistics.__table__
         stmt = (
-            update(UserStatistics)
-            .where(UserStatistics.user_id == user_id)
-            .values(
-                total_reminders_sent=UserStatistics.total_reminders_sent + 1,
-                last_updated=datetime.utcnow()
-            )
+            update(stats)
+            .where(stats.c.user_id == bindparam('stats_user_id'))
+            .values({
+                counter: stats.c[counter] + bindparam('amount'),
+                'last_updated': bindparam('now'),
+            })
         )
-        await session.execute(stmt)
-        await session.commit()
+        await session.execute(stmt, [
+            {'stats_user_id': user_id, 'amount': count, 'now': now}
+            for user_id, count in per_user.items()
+        ])
 
 
 class SystemLogOperations:
@@ -422,6 +1158,14 @@ class SystemLogOperations:
         await session.commit()
         return log
     
+    @staticmethod
+    async def create_logs(session: AsyncSession, rows: List[Dict[str, Any]]) -> int:
+        """Insert system log rows with one executemany and commit."""
+        if rows:
+            await session.execute(insert(SystemLog), rows)
+            await session.commit()
+        return len(rows)
+    
     @staticmethod
     async def cleanup_old_logs(session: AsyncSession, days_to_keep: int = 30) -> int:
         """Clean up old log entries."""
@@ -432,3 +1176,126 @@ class SystemLogOperations:
         await session.commit()
         
         return result.rowcount or 0
+
+
+class MetricsOperations:
+    """Delivery metrics database operations."""
+    
+    @staticmethod
+    async def get_hourly_stats(session: AsyncSession, hours: List[datetime]) -> List[DeliveryStatsHourly]:
+        """Get stored aggregates for the given hours."""
+        if not hours:
+            return []
+        
+        stmt = select(DeliveryStatsHourly).where(DeliveryStatsHourly.hour.in_(hours))
+        result = await session.execute(stmt)
+        return list(result.scalars().all())
+    
+    @staticmethod
+    async def cleanup_old_hourly_stats(session: AsyncSession, days_to_keep: int = 30) -> int:
+        """Clean up old hourly aggregates."""
+        cutoff_date = datetime.utcnow() - timedelta(days=days_to_keep)
+        
+        stmt = delete(DeliveryStatsHourly).where(DeliveryStatsHourly.hour < cutoff_date)
+        result = await session.execute(stmt)
+        await session.commit()
+        
+        return result.rowcount or 0
+
+
+class LeaseOperations:
+    """Scheduler shard lease database operations."""
+    
+    @staticmethod
+    async def ensure_shards(session: AsyncSession, shard_count: int) -> None:
+        """Create lease rows for shards that don't have one yet."""
+        result = await session.execute(select(SchedulerLease.shard))
+        existing = set(result.scalars().all())
+        
+        session.add_all(
+            SchedulerLease(shard=shard)
+            for shard in range(shard_count)
+            if shard not in existing
+        )
+        try:
+            await session.commit()
+        except IntegrityError:
+            await session.rollback()  # Another replica created them first
+    
+    @staticmethod
+    async def heartbeat(session: AsyncSession, replica_id: str, now: datetime) -> None:
+        """Record that a replica is alive."""
+        result = await session.execute(
+            update(SchedulerReplica)
+            .where(SchedulerReplica.replica_id == replica_id)
+            .values(heartbeat_at=now)
+        )
+        if not result.rowcount:
+            session.add(SchedulerReplica(replica_id=replica_id, heartbeat_at=now, started_at=now))
+        await session.commit()
+    
+    @staticmethod
+    async def get_live_replicas(session: AsyncSession, since: datetime) -> List[str]:
+        """Get IDs of replicas with a heartbeat after ``since``."""
+        stmt = select(SchedulerReplica.replica_id).where(SchedulerReplica.heartbeat_at > since)
+        result = await session.execute(stmt)
+        return list(result.scalars().all())
+    
+    @staticmethod
+    async def get_leases(session: AsyncSession) -> List[SchedulerLease]:
+        """Get all shard leases."""
+        result = await session.execute(select(SchedulerLease).order_by(SchedulerLease.shard))
+        return list(result.scalars().all())
+    
+    @staticmethod
+    async def renew(session: AsyncSession, owner: str, expires_at: datetime) -> None:
+        """Extend every lease held by ``owner``."""
+        await session.execute(
+            update(SchedulerLease)
+            .where(SchedulerLease.owner == owner)
+            .values(expires_at=expires_at)
+        )
+        await session.commit()
+    
+    @staticmethod
+    async def try_acquire(
+        session: AsyncSession,
+        shard: int,
+        owner: str,
+        now: datetime,
+        expires_at: datetime
+    ) -> bool:
+        """Take a shard if it is free, expired or already ours (compare-and-set)."""
+        result = await session.execute(
+            update(SchedulerLease)
+            .where(
+                and_(
+                    SchedulerLease.shard == shard,
+                    or_(
+                        SchedulerLease.owner.is_(None),
+                        SchedulerLease.owner == owner,
+                        SchedulerLease.expires_at < now
+                    )
+                )
+            )
+            .values(owner=owner, expires_at=expires_at, acquired_at=now)
+        )
+        await session.commit()
+        return result.rowcount > 0
+    
+    @staticmethod
+    async def release(session: AsyncSession, owner: str, shards: Collection[int]) -> None:
+        """Give up shards so other replicas can take them right away."""
+        if shards:
+            await session.execute(
+                update(SchedulerLease)
+                .where(and_(SchedulerLease.owner == owner, SchedulerLease.shard.in_(list(shards))))
+                .values(owner=None, expires_at=None)
+            )
+        await session.commit()
+    
+    @staticmethod
+    async def remove_replica(session: AsyncSession, replica_id: str) -> None:
+        """Forget a replica that is shutting down."""
+        await session.execute(delete(SchedulerReplica).where(SchedulerReplica.replica_id == replica_id))
+        await session.commit()
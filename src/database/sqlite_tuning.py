@@ -0,0 +1,225 @@
+"""
+SQLite Tuning
+
+Connection pragmas chosen by profile and applied to every new
+connection, the read-only and writer connection setups of the split
+engine mode, plus a background WAL checkpointer.
+"""
+
+import asyncio
+import logging
+import os
+from typing import Any, Dict, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from src.utils.clock import Clock, get_clock
+
+logger = logging.getLogger(__name__)
+
+# Applied in this order; busy_timeout first so the journal switch waits on locks.
+# cache_size is the page cache budget of a whole engine, split evenly across
+# the most connections it may open (never below MIN_CACHE_KIB each), so an
+# engine's caches stay within it however many connections a burst opens.
+# mmap_size maps the database file itself: every connection shares the same
+# OS page cache pages, so it is not multiplied by the connection count.
+PROFILES: Dict[str, Dict[str, Any]] = {
+    # Every commit reaches the disk before it returns
+    'durable': {
+        'busy_timeout': 5000,
+        'journal_mode': 'WAL',
+        'synchronous': 'FULL',
+        'cache_size': -16384,  # KiB for the whole engine
+        'mmap_size': 0,
+        'temp_store': 'DEFAULT',
+    },
+    # Survives process crashes; a power cut may lose the last commits
+    'balanced': {
+        'busy_timeout': 5000,
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'cache_size': -65536,
+        'mmap_size': 256 * 1024 * 1024,
+        'temp_store': 'MEMORY',
+    },
+    # Leaves flushing to the OS; a crash of the machine may corrupt the database
+    'throughput': {
+        'busy_timeout': 10000,
+        'journal_mode': 'WAL',
+        'synchronous': 'OFF',
+        'cache_size': -262144,
+        'mmap_size': 1024 * 1024 * 1024,
+        'temp_store': 'MEMORY',
+    },
+}
+
+MIN_CACHE_KIB = 2048  # SQLite's own default
+
+
+def apply_sqlite_profile(engine: AsyncEngine, profile: str, max_connections: int = 1) -> None:
+    """
+    Run the ``profile`` pragmas on every connection ``engine`` opens.
+
+    ``max_connections`` is the engine's pool size plus overflow; each
+    connection gets that share of the profile's cache budget.
+    """
+    if profile not in PROFILES:
+        raise ValueError(f"Unknown SQLite profile {profile!r}")
+    if max_connections <= 0:
+        raise ValueError("max_connections must be positive")
+
+    pragmas = dict(PROFILES[profile])
+    pragmas['cache_size'] = -max(-pragmas['cache_size'] // max_connections, MIN_CACHE_KIB)
+    in_memory = engine.url.database in (None, '', ':memory:')
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def _set_pragmas(dbapi_connection, connection_record) -> None:
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                if name == 'journal_mode' and in_memory:
+                    continue  # In-memory databases cannot use WAL
+                cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
+
+    logger.debug(f"🗄️ SQLite profile {profile!r} applied to {engine.url}")
+
+
+def apply_read_only(engine: AsyncEngine) -> None:
+    """Refuse writes on every connection ``engine`` opens (``PRAGMA query_only``)."""
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def _set_query_only(dbapi_connection, connection_record) -> None:
+        cursor = dbapi_connection.cursor()
+        try:
+            cursor.execute("PRAGMA query_only=ON")
+        finally:
+            cursor.close()
+
+
+def apply_immediate_transactions(engine: AsyncEngine) -> None:
+    """
+    Start every transaction of ``engine`` with ``BEGIN IMMEDIATE``.
+
+    The driver's own transaction handling is turned off, so the write
+    lock is taken up front and SAVEPOINTs nest inside the transaction
+    instead of starting one.
+    """
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def _disable_driver_transactions(dbapi_connection, connection_record) -> None:
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine.sync_engine, "begin")
+    def _begin_immediate(conn) -> None:
+        conn.exec_driver_sql("BEGIN IMMEDIATE")
+
+
+class WalCheckpointer:
+    """
+    Checkpoints the write-ahead log in the background.
+
+    Every ``interval`` seconds a PASSIVE checkpoint copies what it can
+    into the database without waiting for readers or writers. When the
+    WAL file has grown past ``truncate_bytes``, a TRUNCATE checkpoint
+    waits (up to the busy timeout) for a quiet moment and resets it to
+    zero length instead, so one long-lived reader cannot let it grow
+    without bound.
+    """
+
+    def __init__(
+        self,
+        engine: AsyncEngine,
+        path: str,
+        interval: float = 60.0,
+        truncate_bytes: int = 64 * 1024 * 1024,
+        clock: Optional[Clock] = None,
+    ):
+        """Initialize checkpointer for the database file at ``path``."""
+        if interval <= 0:
+            raise ValueError("interval must be positive")
+
+        self.engine = engine
+        self.wal_path = f"{path}-wal"
+        self.interval = interval
+        self.truncate_bytes = truncate_bytes
+        self.clock = clock or get_clock()
+        self._task: Optional[asyncio.Task] = None
+        self._stats = {
+            'checkpoints': 0,
+            'truncations': 0,
+            'busy': 0,
+            'errors': 0,
+            'last_wal_frames': 0,
+            'last_checkpointed_frames': 0,
+        }
+
+    def wal_size(self) -> int:
+        """Get the size of the WAL file in bytes (0 if there is none)."""
+        try:
+            return os.path.getsize(self.wal_path)
+        except OSError:
+            return 0
+
+    async def checkpoint(self, mode: str = 'PASSIVE') -> Tuple[int, int, int]:
+        """
+        Run one checkpoint.
+
+        Returns:
+            SQLite's (busy, WAL frames, checkpointed frames)
+        """
+        if mode not in ('PASSIVE', 'FULL', 'RESTART', 'TRUNCATE'):
+            raise ValueError(f"Unknown checkpoint mode {mode!r}")
+
+        async with self.engine.connect() as conn:
+            result = await conn.exec_driver_sql(f"PRAGMA wal_checkpoint({mode})")
+            busy, frames, checkpointed = result.one()
+
+        self._stats['checkpoints'] += 1
+        self._stats['busy'] += busy
+        self._stats['last_wal_frames'] = frames
+        self._stats['last_checkpointed_frames'] = checkpointed
+        if mode == 'TRUNCATE' and not busy:
+            self._stats['truncations'] += 1
+        return busy, frames, checkpointed
+
+    async def start(self) -> None:
+        """Start checkpointing."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop checkpointing and truncate the WAL one last time."""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+        try:
+            await self.checkpoint('TRUNCATE')
+        except Exception as e:
+            logger.error(f"❌ Final WAL checkpoint failed: {e}")
+
+    async def _run(self) -> None:
+        """Checkpoint every interval until cancelled."""
+        while True:
+            await self.clock.sleep(self.interval)
+            mode = 'TRUNCATE' if self.wal_size() > self.truncate_bytes else 'PASSIVE'
+            try:
+                busy, frames, checkpointed = await self.checkpoint(mode)
+                logger.debug(f"🗄️ WAL checkpoint ({mode}): {checkpointed}/{frames} frames, busy={busy}")
+            except Exception as e:
+                self._stats['errors'] += 1
+                logger.error(f"❌ WAL checkpoint failed: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get checkpoint statistics and the current WAL size."""
+        return {
+            'wal_bytes': self.wal_size(),
+            **self._stats,
+        }
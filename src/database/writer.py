@@ -0,0 +1,302 @@
+"""
+SQLite Writer
+
+Single writer task for the split engine mode: write operations are
+queued, run one after another on the only write connection and
+committed in groups.
+"""
+
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm import Session, SessionTransaction
+
+from src.utils.clock import Clock, get_clock
+
+logger = logging.getLogger(__name__)
+
+# Session.info keys: callbacks waiting for the transaction to commit, the
+# savepoint of the operation currently running (with the number of
+# callbacks queued before it started), and the no-savepoint pass
+AFTER_COMMIT = 'after_commit'
+_SAVEPOINT = 'savepoint'
+_SHARED = 'shared'
+
+Operation = Callable[..., Awaitable[Any]]
+
+
+class _Isolate(Exception):
+    """An operation rolled back while sharing the group's transaction."""
+
+
+class GroupCommitSession(AsyncSession):
+    """
+    Session handed to operations run by the writer.
+
+    ``commit`` only flushes, as the writer commits the whole group.
+    ``rollback`` undoes the calling operation's changes alone: inside
+    the operation's SAVEPOINT when it has one, otherwise it aborts the
+    shared pass so the writer re-runs the group with savepoints.
+    """
+
+    async def commit(self) -> None:
+        """Flush; the group is committed by the writer."""
+        await self.flush()
+
+    async def rollback(self) -> None:
+        """Roll back to this operation's savepoint, dropping its callbacks, and start a new one."""
+        if self.info.get(_SHARED):
+            raise _Isolate()
+
+        if _SAVEPOINT not in self.info:
+            await super().rollback()
+            return
+
+        savepoint, hooks = self.info[_SAVEPOINT]
+        await savepoint.rollback()
+        _discard_after_commit(self, hooks)
+        self.info[_SAVEPOINT] = (await self.begin_nested(), hooks)
+
+    async def commit_group(self) -> None:
+        """Commit the group's transaction."""
+        await super().commit()
+
+
+def after_commit(session: AsyncSession, callback: Callable[..., Any], *args: Any, **kwargs: Any) -> None:
+    """
+    Run ``callback(*args, **kwargs)`` once ``session``'s changes are committed.
+
+    Inside a transaction the callback waits for it to commit (for
+    sessions of the writer, the group commit) and is dropped if it
+    rolls back instead; outside of one it runs right away.
+    """
+    if not session.in_transaction():
+        callback(*args, **kwargs)
+        return
+
+    session.info.setdefault(AFTER_COMMIT, []).append((callback, args, kwargs))
+
+
+def _discard_after_commit(session: AsyncSession, keep: int) -> None:
+    """Drop the callbacks queued after the first ``keep`` ones."""
+    del session.info.get(AFTER_COMMIT, [])[keep:]
+
+
+@event.listens_for(Session, 'after_commit')
+def _run_after_commit(session: Session) -> None:
+    """Run the callbacks of a transaction that has just committed."""
+    if session.in_nested_transaction():
+        return  # A savepoint; wait for the transaction itself
+
+    for callback, args, kwargs in session.info.pop(AFTER_COMMIT, ()):
+        try:
+            callback(*args, **kwargs)
+        except Exception as e:
+            logger.error(f"❌ After-commit callback failed: {e}")
+
+
+@event.listens_for(Session, 'after_transaction_end')
+def _drop_after_commit(session: Session, transaction: SessionTransaction) -> None:
+    """Forget the callbacks of a transaction that ended without committing."""
+    if transaction.parent is None:
+        session.info.pop(AFTER_COMMIT, None)
+
+
+class SQLiteWriter:
+    """
+    Owns the only write connection and commits queued writes in groups.
+
+    ``submit`` queues ``operation(session, *args, **kwargs)`` and waits
+    for its result. The writer takes everything queued (up to
+    ``max_batch`` operations, optionally waiting ``max_wait`` seconds
+    for more) and runs it in one ``BEGIN IMMEDIATE`` transaction, so
+    writes that arrive while a commit is in progress share the next
+    one: one fsync for many handler writes.
+
+    Operations first run back to back without savepoints. If one
+    raises or rolls back, the whole transaction is rolled back and the
+    group runs again with a SAVEPOINT per operation, so only that
+    operation fails (its caller gets the exception) and the rest still
+    commit. Operations should therefore keep side effects other than
+    database writes to ``after_commit`` callbacks. If the commit itself
+    fails, every caller in the group gets that error. Results are
+    handed out only after the commit.
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker,
+        queue_size: int = 10000,
+        max_batch: int = 500,
+        max_wait: float = 0.0,
+        clock: Optional[Clock] = None,
+    ):
+        """Initialize writer for sessions of ``session_factory`` (class ``GroupCommitSession``)."""
+        if queue_size <= 0 or max_batch <= 0 or max_wait < 0:
+            raise ValueError("queue_size and max_batch must be positive, max_wait must not be negative")
+
+        self.session_factory = session_factory
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.clock = clock or get_clock()
+
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+        self._stats = {
+            'operations': 0,
+            'failed_operations': 0,
+            'groups': 0,
+            'isolated_groups': 0,
+            'failed_groups': 0,
+            'largest_group': 0,
+        }
+
+    async def submit(self, operation: Operation, *args: Any, **kwargs: Any) -> Any:
+        """
+        Queue a write operation and wait until its group has committed.
+
+        Waits for room when the queue is full.
+
+        Returns:
+            What ``operation`` returned
+        """
+        if self._stopping:
+            raise RuntimeError("Writer is stopped")
+
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((operation, args, kwargs, future))
+        return await future
+
+    async def stop(self) -> None:
+        """Commit what is queued and stop the writer task."""
+        self._stopping = True
+        if self._task:
+            await self._queue.put(None)
+            await self._task
+            self._task = None
+
+    async def _run(self) -> None:
+        """Take groups off the queue until the stop marker."""
+        while True:
+            item = await self._queue.get()
+            if item is None:
+                return
+
+            group = [item]
+            stop = await self._fill(group)
+            await self._commit(group)
+            if stop:
+                return
+
+    async def _fill(self, group: List[Tuple]) -> bool:
+        """
+        Add queued operations to ``group``.
+
+        Returns:
+            True if the stop marker was reached
+        """
+        waited = False
+        while len(group) < self.max_batch:
+            try:
+                item = self._queue.get_nowait()
+            except asyncio.QueueEmpty:
+                if waited or not self.max_wait:
+                    return False
+                await self.clock.sleep(self.max_wait)
+                waited = True
+                continue
+
+            if item is None:
+                return True
+            group.append(item)
+        return False
+
+    async def _commit(self, group: List[Tuple]) -> None:
+        """Run a group of operations in one transaction and resolve their futures."""
+        # Nobody waits for cancelled ones; skip rather than write blind
+        group = [item for item in group if not item[3].cancelled()]
+        if not group:
+            return
+
+        try:
+            async with self.session_factory() as session:
+                outcomes = await self._execute(session, group)
+                await session.commit_group()
+
+        except Exception as e:
+            self._stats['failed_groups'] += 1
+            logger.error(f"❌ Group commit of {len(group)} writes failed: {e}")
+            for _, _, _, future in group:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for future, result, error in outcomes:
+            if error is not None:
+                self._stats['failed_operations'] += 1
+            if future.done():
+                continue
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+
+        self._stats['operations'] += len(outcomes)
+        self._stats['groups'] += 1
+        self._stats['largest_group'] = max(self._stats['largest_group'], len(outcomes))
+
+    async def _execute(self, session: GroupCommitSession, group: List[Tuple]) -> List[Tuple]:
+        """
+        Run a group's operations in ``session`` without committing.
+
+        Returns:
+            (future, result, exception) per operation
+        """
+        session.info[_SHARED] = True
+        outcomes: Optional[List[Tuple]] = []
+        try:
+            for operation, args, kwargs, future in group:
+                outcomes.append((future, await operation(session, *args, **kwargs), None))
+        except Exception:
+            outcomes = None
+        finally:
+            del session.info[_SHARED]
+
+        if outcomes is not None:
+            return outcomes
+
+        # Start over, isolating each operation in a savepoint; the
+        # rollback also drops the callbacks queued by the shared pass
+        self._stats['isolated_groups'] += 1
+        await session.rollback()
+        outcomes = []
+        for operation, args, kwargs, future in group:
+            hooks = len(session.info.get(AFTER_COMMIT, ()))
+            session.info[_SAVEPOINT] = (await session.begin_nested(), hooks)
+            try:
+                result = await operation(session, *args, **kwargs)
+            except Exception as e:
+                savepoint, hooks = session.info.pop(_SAVEPOINT)
+                await savepoint.rollback()
+                _discard_after_commit(session, hooks)
+                outcomes.append((future, None, e))
+            else:
+                savepoint, _ = session.info.pop(_SAVEPOINT)
+                await savepoint.commit()
+                outcomes.append((future, result, None))
+        return outcomes
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get writer statistics."""
+        return {
+            'queued': self._queue.qsize(),
+            'average_group': round(self._stats['operations'] / self._stats['groups'], 2) if self._stats['groups'] else 0.0,
+            **self._stats,
+        }
@@ -14,9 +14,9 @@ from aiogram.types import Message, CallbackQuery, InlineKeyboardMarkup, InlineKe
 from aiogram.fsm.context import FSMContext
 from aiogram.filters import Command
 
-from src.database.operations import get_session, ReminderOperations, UserOperations
+from src.database.operations import run_write, ReminderOperations, ReminderLimitError
 from src.services.time_parser import time_parser, TimeParseError
-from src.services.scheduler_service import scheduler_service
+from src.services.scheduler_service import SchedulerService
 from src.bot.states import ReminderStates
 from src.utils.formatters import format_reminder_preview, format_reminder_list, format_datetime
 from src.utils.keyboards import (
@@ -333,8 +333,12 @@ async def process_quick_reminder(message: Message, state: FSMContext):
 
 
 @router.callback_query(F.data == "confirm_create_reminder")
-async def confirm_create_reminder(callback: CallbackQuery, state: FSMContext):
-    """Confirm and create reminder."""
+async def confirm_create_reminder(
+    callback: CallbackQuery,
+    state: FSMContext,
+    scheduler: Optional[SchedulerService] = None,
+):
+    """Confirm and create reminder; ``scheduler`` is the running one from the dispatcher's workflow data."""
     await callback.answer()
     
     data = await state.get_data()
@@ -350,45 +354,51 @@ async def confirm_create_reminder(callback: CallbackQuery, state: FSMContext):
         return
     
     try:
-        async with get_session() as session:
-            # Get user
-            user = await UserOperations.get_user_by_telegram_id(
-                session, callback.from_user.id
-            )
-            if not user:
-                await callback.message.edit_text(
-                    "❌ **Пользователь не найден**\n\nПопробуйте /start",
-                    reply_markup=main_menu_keyboard()
-                )
-                await state.clear()
-                return
-            
-            # Create reminder
-            reminder = await ReminderOperations.create_reminder(
-                session=session,
-                user_id=user.id,
-                title=reminder_text,
-                description=None,
-                scheduled_time=scheduled_time,
-                original_text=data.get('scheduled_time_text', '')
-            )
-            
-            # Schedule reminder
-            await scheduler_service.schedule_reminder(reminder.id, scheduled_time)
-            
-            # Success message
+        # Create reminder (user lookup, limit check and statistics in one commit)
+        reminder_id = await run_write(
+            ReminderOperations.create_reminder_by_telegram_id,
+            telegram_id=callback.from_user.id,
+            title=reminder_text,
+            description=None,
+            scheduled_time=scheduled_time,
+            original_text=data.get('scheduled_time_text', '')
+        )
+        
+        if reminder_id is None:
             await callback.message.edit_text(
-                f"✅ **Напоминание создано!**\n\n"
-                f"📝 **Текст:** {reminder_text}\n"
-                f"⏰ **Время:** {format_datetime(scheduled_time)}\n"
-                f"🆔 **ID:** #{reminder.id}\n\n"
-                f"🔔 Я напомню вам точно в срок!",
-                reply_markup=main_menu_keyboard(),
-                parse_mode="Markdown"
+                "❌ **Пользователь не найден**\n\nПопробуйте /start",
+                reply_markup=main_menu_keyboard()
             )
-            
-            logger.info(f"Created reminder {reminder.id} for user {user.telegram_id}")
-            
+            await state.clear()
+            return
+        
+        # Schedule reminder once it is committed (without a scheduler the
+        # next change poll or horizon refill picks it up)
+        if scheduler is not None:
+            await scheduler.schedule_reminder(reminder_id, scheduled_time)
+        
+        # Success message
+        await callback.message.edit_text(
+            f"✅ **Напоминание создано!**\n\n"
+            f"📝 **Текст:** {reminder_text}\n"
+            f"⏰ **Время:** {format_datetime(scheduled_time)}\n"
+            f"🆔 **ID:** #{reminder_id}\n\n"
+            f"🔔 Я напомню вам точно в срок!",
+            reply_markup=main_menu_keyboard(),
+            parse_mode="Markdown"
+        )
+        
+        logger.info(f"Created reminder {reminder_id} for user {callback.from_user.id}")
+    
+    except ReminderLimitError as e:
+        await callback.message.edit_text(
+            f"⚠️ **Достигнут лимит напоминаний**\n\n"
+            f"У вас уже {e.limit} активных напоминаний. "
+            f"Удалите ненужные и попробуйте снова.",
+            reply_markup=main_menu_keyboard(),
+            parse_mode="Markdown"
+        )
+    
     except Exception as e:
         logger.error(f"Error creating reminder: {e}")
         await callback.message.edit_text(
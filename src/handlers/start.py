@@ -11,7 +11,7 @@ from aiogram.filters import Command
 from aiogram.filters.command import CommandStart
 from aiogram.fsm.context import FSMContext
 
-from src.database.operations import get_session, UserOperations
+from src.database.operations import get_session, run_write, UserOperations
 from src.utils.keyboards import main_menu_keyboard, help_keyboard, back_to_menu_keyboard
 from src.utils.formatters import format_help_message
 
@@ -28,18 +28,17 @@ async def cmd_start(message: Message, state: FSMContext):
     user_name = user.first_name or "друг"
     
     try:
-        async with get_session() as session:
-            # Create or update user
-            db_user = await UserOperations.create_or_update_user(
-                session=session,
-                telegram_id=user.id,
-                username=user.username,
-                first_name=user.first_name,
-                last_name=user.last_name,
-                language_code=user.language_code
-            )
-            
-            logger.info(f"👤 User {user.id} started bot (DB ID: {db_user.id})")
+        # Create or update user
+        db_user = await run_write(
+            UserOperations.create_or_update_user,
+            telegram_id=user.id,
+            username=user.username,
+            first_name=user.first_name,
+            last_name=user.last_name,
+            language_code=user.language_code
+        )
+        
+        logger.info(f"👤 User {user.id} started bot (DB ID: {db_user.id})")
         
         welcome_message = (
             f"👋 **Добро пожаловать, {user_name}!**\n\n"
@@ -139,19 +138,20 @@ async def cmd_stats(message: Message):
             from src.database.operations import StatisticsOperations
             
             # Get user
-            user = await UserOperations.get_user_by_telegram_id(
+            user_id = await UserOperations.get_user_id_by_telegram_id(
                 session, message.from_user.id
             )
             
-            if not user:
+            if user_id is None:
                 await message.answer(
                     "❌ **Пользователь не найден**\n\nИспользуйте /start для регистрации",
                     parse_mode="Markdown"
                 )
                 return
             
-            # Get statistics
-            stats = await StatisticsOperations.get_user_statistics(session, user.id)
+            # Get statistics (cached until the user's reminders change)
+            overview = await StatisticsOperations.get_stats_overview(session, user_id)
+            stats = overview['statistics']
             
             if not stats:
                 await message.answer(
@@ -162,7 +162,7 @@ async def cmd_stats(message: Message):
                 return
             
             from src.utils.formatters import format_user_statistics
-            stats_text = format_user_statistics(stats)
+            stats_text = format_user_statistics(stats, overview['reminders'])
             
             await message.answer(
                 stats_text,
@@ -189,11 +189,11 @@ async def show_stats_callback(callback: CallbackQuery):
             from src.database.operations import StatisticsOperations
             
             # Get user
-            user = await UserOperations.get_user_by_telegram_id(
+            user_id = await UserOperations.get_user_id_by_telegram_id(
                 session, callback.from_user.id
             )
             
-            if not user:
+            if user_id is None:
                 await callback.message.edit_text(
                     "❌ **Пользователь не найден**\n\nИспользуйте /start для регистрации",
                     reply_markup=main_menu_keyboard(),
@@ -201,8 +201,9 @@ async def show_stats_callback(callback: CallbackQuery):
                 )
                 return
             
-            # Get statistics
-            stats = await StatisticsOperations.get_user_statistics(session, user.id)
+            # Get statistics (cached until the user's reminders change)
+            overview = await StatisticsOperations.get_stats_overview(session, user_id)
+            stats = overview['statistics']
             
             if not stats:
                 await callback.message.edit_text(
@@ -213,7 +214,7 @@ async def show_stats_callback(callback: CallbackQuery):
                 return
             
             from src.utils.formatters import format_user_statistics
-            stats_text = format_user_statistics(stats)
+            stats_text = format_user_statistics(stats, overview['reminders'])
             
             await callback.message.edit_text(
                 stats_text,
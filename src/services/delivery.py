@@ -0,0 +1,702 @@
+"""
+Delivery Pipeline
+
+Batched delivery of due reminders: one joined read per batch,
+a bounded pool of send workers and one bulk write per batch.
+Failed sends are persisted with a backoff time and handed back
+to the dispatcher, so retries take the same path; recurring
+reminders are moved to their next occurrence the same way. With smoothing
+on, sends are spread across each user's lateness budget. Workers
+drain per-priority lanes by weighted round-robin. With coalescing
+on, a user's reminders due close together go out as one digest.
+"""
+
+import asyncio
+import json
+import logging
+import time
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from src.database.operations import get_session, run_write, DeliveryRecord, ReminderOperations
+from src.services.dispatcher import to_epoch
+from src.services.log_sink import LogSink
+from src.services.metrics import DeliveryMetrics
+from src.services.recurrence import advance_values
+from src.services.retry_policy import RetryPolicy
+from src.utils.clock import Clock, get_clock
+
+logger = logging.getLogger(__name__)
+
+RescheduleCallback = Callable[[int, datetime], Awaitable[Any]]
+
+# Fractional part of the golden ratio; spreads consecutive IDs evenly over [0, 1)
+_SPREAD = 0.6180339887498949
+
+
+class DeliveryBatch:
+    """Reminders of one tick travelling through the pipeline together."""
+
+    def __init__(self, size: int):
+        """Initialize batch."""
+        self.remaining = size
+        self.sent: List[Tuple[int, int]] = []  # (reminder_id, user_id)
+        self.failed: List[Tuple[DeliveryRecord, Exception]] = []
+        self.coalesced = 0  # Sent (and marked) as part of a digest
+        self.deferred = 0  # Left unsent by a shutdown drain
+        self.advanced: List[Dict[str, Any]] = []  # Recurring, moved to next occurrence
+        self._done = asyncio.Event()
+        if size == 0:
+            self._done.set()
+
+    def item_done(self) -> None:
+        """Account for one finished item."""
+        self.remaining -= 1
+        if self.remaining <= 0:
+            self._done.set()
+
+    async def wait(self) -> None:
+        """Wait until every item has been processed."""
+        await self._done.wait()
+
+
+class Digest:
+    """Reminders of one user collected to go out as a single message."""
+
+    __slots__ = ('user_id', 'items', 'handle')
+
+    def __init__(self, user_id: int):
+        """Initialize digest."""
+        self.user_id = user_id
+        self.items: List[Tuple[DeliveryBatch, DeliveryRecord]] = []
+        self.handle: Optional[Any] = None  # Timer handle closing the digest
+
+
+class LaneQueue:
+    """
+    Per-priority FIFO lanes drained by smooth weighted round-robin.
+    
+    Among lanes with work waiting, each ``get`` adds every lane's weight
+    to its credit and serves the richest one, so a lane with weight 6
+    gets six turns for every turn of a weight-1 lane while both are busy
+    and an idle lane never holds the others back.
+    """
+    
+    def __init__(self, weights: Dict[str, int], default_lane: str = "normal"):
+        """Initialize lanes."""
+        if default_lane not in weights:
+            raise ValueError(f"Default lane {default_lane!r} has no weight")
+        
+        self.weights = dict(weights)
+        self.default_lane = default_lane
+        self._lanes: Dict[str, deque] = {lane: deque() for lane in weights}
+        self._credit: Dict[str, int] = {lane: 0 for lane in weights}
+        self._ready = asyncio.Semaphore(0)
+    
+    def lane_for(self, priority: Optional[str]) -> str:
+        """Map a reminder priority to its lane."""
+        return priority if priority in self._lanes else self.default_lane
+    
+    def put_nowait(self, lane: str, item: Any) -> None:
+        """Append an item to a lane."""
+        self._lanes[lane].append(item)
+        self._ready.release()
+    
+    async def get(self) -> Tuple[str, Any]:
+        """Wait for the next item and return it with its lane."""
+        await self._ready.acquire()
+        
+        busy = [lane for lane, items in self._lanes.items() if items]
+        total = 0
+        for lane in busy:
+            self._credit[lane] += self.weights[lane]
+            total += self.weights[lane]
+        
+        lane = max(busy, key=self._credit.__getitem__)
+        self._credit[lane] -= total
+        return lane, self._lanes[lane].popleft()
+    
+    def clear(self) -> List[Any]:
+        """Remove and return every queued item (only once no consumer is waiting)."""
+        items = []
+        for lane_items in self._lanes.values():
+            items.extend(lane_items)
+            lane_items.clear()
+        self._ready = asyncio.Semaphore(0)
+        return items
+    
+    def qsize(self, lane: Optional[str] = None) -> int:
+        """Get number of queued items, overall or in one lane."""
+        if lane is not None:
+            return len(self._lanes[lane])
+        return sum(len(items) for items in self._lanes.values())
+
+
+class DeliveryPipeline:
+    """Delivers due reminders in batches through a bounded worker pool."""
+
+    def __init__(
+        self,
+        bot,
+        formatter: Callable[[DeliveryRecord], str],
+        on_reschedule: RescheduleCallback,
+        retry_policy: RetryPolicy,
+        concurrency: int = 20,
+        batch_size: int = 500,
+        smoothing: bool = False,
+        lateness_budget: float = 0.0,
+        lane_weights: Optional[Dict[str, int]] = None,
+        metrics: Optional[DeliveryMetrics] = None,
+        coalesce_window: Optional[float] = None,
+        digest_formatter: Optional[Callable[[List[DeliveryRecord]], str]] = None,
+        owns: Optional[Callable[[int], bool]] = None,
+        lead_seconds: float = 0.0,
+        clock: Optional[Clock] = None,
+        log_sink: Optional[LogSink] = None,
+    ):
+        """
+        Initialize delivery pipeline.
+        
+        With ``smoothing`` each reminder is sent at a stable offset within
+        its user's lateness budget (``lateness_budget`` when the user has
+        none, 0 for high priority) instead of the moment it is due.
+        
+        ``lane_weights`` maps priorities to their share of the workers
+        while the send queue is backed up.
+        
+        With ``coalesce_window`` set, reminders of one user that come due
+        within that many seconds of the first are sent as one digest
+        built by ``digest_formatter``; high priority is always sent alone.
+        
+        ``owns`` tells, by user ID, whether this replica may deliver a
+        reminder; others are dropped right before sending.
+        
+        ``lead_seconds`` is how early the dispatcher hands reminders
+        over. Anything handed over before it is due (a schedule entry
+        left behind by an edit made elsewhere) is not sent but
+        rescheduled for its current due time.
+        
+        Outcomes are recorded as SystemLog rows through ``log_sink`` once
+        the batch is committed; without one they are not recorded.
+        """
+        self.bot = bot
+        self.formatter = formatter
+        self.on_reschedule = on_reschedule
+        self.retry_policy = retry_policy
+        self.concurrency = concurrency
+        self.batch_size = batch_size
+        self.smoothing = smoothing
+        self.lateness_budget = lateness_budget
+        self.metrics = metrics or DeliveryMetrics()
+        self.coalesce_window = coalesce_window
+        self.owns = owns
+        self.lead_seconds = lead_seconds
+        self.log_sink = log_sink
+        self.clock = clock or get_clock()
+        self.digest_formatter = digest_formatter
+        if coalesce_window is not None and digest_formatter is None:
+            raise ValueError("Coalescing needs a digest formatter")
+        self._queue = LaneQueue(lane_weights or {"high": 6, "normal": 3, "low": 1})
+        self._workers: List[asyncio.Task] = []
+        self._held: Dict[int, Tuple[Any, DeliveryBatch, DeliveryRecord]] = {}  # Timer handles
+        self._digests: Dict[int, Digest] = {}  # user_id -> open digest
+        self._active_batches = 0
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self._draining = False  # Send as soon as due, no smoothing or digests
+        self._closed = False  # Past the drain deadline, defer everything
+        self._stats = {
+            'batches': 0,
+            'delivered': 0,
+            'failed': 0,
+            'retried': 0,
+            'dead_lettered': 0,
+            'skipped': 0,
+            'rearmed': 0,
+            'advanced': 0,
+            'digests': 0,
+            'coalesced': 0,
+            'deferred': 0,
+            'fetch_seconds': 0.0,
+            'send_seconds': 0.0,
+            'write_seconds': 0.0,
+            'lateness_samples': 0,
+            'lateness_seconds_total': 0.0,
+            'lateness_seconds_max': 0.0,
+        }
+        self._lane_stats = {
+            lane: {'sent': 0, 'lateness_seconds_total': 0.0, 'lateness_seconds_max': 0.0}
+            for lane in self._queue.weights
+        }
+        self._last_batch: Dict[str, Any] = {}
+
+    async def start(self) -> None:
+        """Start send workers."""
+        if not self._workers:
+            self._workers = [
+                asyncio.create_task(self._worker())
+                for _ in range(self.concurrency)
+            ]
+
+    async def stop(self) -> None:
+        """Stop send workers."""
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+    
+    async def drain(self, timeout: float) -> Dict[str, int]:
+        """
+        Finish queued deliveries within ``timeout`` seconds, then stop.
+        
+        Smoothing holds and open digests are cut short, so reminders go
+        out as soon as they are due (dispatch may run a little ahead of
+        that). At the deadline,
+        sends still in flight are cancelled and queued reminders are
+        dropped unsent; both stay due in the database for catch-up on
+        the next start. Results of every batch are written before this
+        returns.
+        
+        Returns:
+            Number of reminders ``drained`` (sent or failed) and ``deferred``
+        """
+        self._draining = True
+        finished_before = self._stats['delivered'] + self._stats['failed']
+        deferred_before = self._stats['deferred']
+        
+        held, self._held = self._held, {}
+        for handle, batch, reminder in held.values():
+            handle.cancel()
+            self._enqueue(batch, [reminder])
+        for user_id, digest in list(self._digests.items()):
+            digest.handle.cancel()
+            self._close_digest(user_id)
+        
+        try:
+            await asyncio.wait_for(self._idle.wait(), timeout)
+        except asyncio.TimeoutError:
+            self._closed = True
+            await self.stop()
+            
+            for batch, item in self._queue.clear():
+                if batch is None:
+                    for digest_batch, _ in item.items:
+                        digest_batch.deferred += 1
+                        digest_batch.item_done()
+                else:
+                    batch.deferred += 1
+                    batch.item_done()
+            
+            # Batches now complete and write what was sent
+            await self._idle.wait()
+        
+        await self.stop()
+        
+        finished = self._stats['delivered'] + self._stats['failed'] - finished_before
+        return {
+            'drained': finished,
+            'deferred': self._stats['deferred'] - deferred_before,
+        }
+
+    async def deliver(self, reminder_ids: List[int]) -> None:
+        """Deliver reminders, splitting them into batches."""
+        # Batches share the lanes side by side, so a high-priority reminder
+        # in a later batch does not wait for earlier batches to drain
+        await asyncio.gather(*(
+            self._deliver_batch(reminder_ids[i:i + self.batch_size])
+            for i in range(0, len(reminder_ids), self.batch_size)
+        ))
+    
+    @staticmethod
+    def due_time(reminder: DeliveryRecord) -> datetime:
+        """Get the time a reminder is currently due at."""
+        return reminder.next_attempt_at or reminder.scheduled_time
+    
+    def _budget(self, reminder: DeliveryRecord) -> float:
+        """Get how late a reminder may go out."""
+        if reminder.priority == "high":
+            return 0.0
+        if reminder.user.lateness_budget is not None:
+            return float(reminder.user.lateness_budget)
+        return self.lateness_budget
+    
+    def _send_time(self, reminder: DeliveryRecord) -> float:
+        """Get the epoch time to send a reminder at."""
+        send_at = to_epoch(self.due_time(reminder))
+        if self.smoothing and not self._draining:
+            send_at += self._budget(reminder) * ((reminder.id * _SPREAD) % 1.0)
+        return send_at
+    
+    def _enqueue(self, batch: DeliveryBatch, reminders: List[DeliveryRecord]) -> None:
+        """Queue reminders for the workers, holding each until its send time."""
+        now = self.clock.time()
+        for reminder in reminders:
+            if self._closed:
+                batch.deferred += 1
+                batch.item_done()
+                continue
+            
+            delay = self._send_time(reminder) - now
+            if delay > 0:
+                handle = self.clock.call_later(delay, self._release, batch, reminder)
+                self._held[reminder.id] = (handle, batch, reminder)
+            else:
+                self._release(batch, reminder)
+    
+    def _release(self, batch: DeliveryBatch, reminder: DeliveryRecord) -> None:
+        """Hand a held reminder to the workers."""
+        self._held.pop(reminder.id, None)
+        if self.coalesce_window is not None and reminder.priority != "high" and not self._draining:
+            self._collect(batch, reminder)
+        else:
+            self._queue.put_nowait(self._queue.lane_for(reminder.priority), (batch, reminder))
+    
+    def _collect(self, batch: DeliveryBatch, reminder: DeliveryRecord) -> None:
+        """Add a reminder to its user's open digest, opening one if needed."""
+        digest = self._digests.get(reminder.user_id)
+        if digest is None:
+            digest = self._digests[reminder.user_id] = Digest(reminder.user_id)
+            digest.handle = self.clock.call_later(
+                self.coalesce_window, self._close_digest, reminder.user_id
+            )
+        digest.items.append((batch, reminder))
+    
+    def _close_digest(self, user_id: int) -> None:
+        """Queue a user's collected reminders, as a digest if there are several."""
+        digest = self._digests.pop(user_id, None)
+        if digest is None or not digest.items:
+            return
+        
+        if len(digest.items) == 1:
+            batch, reminder = digest.items[0]
+            self._queue.put_nowait(self._queue.lane_for(reminder.priority), (batch, reminder))
+            return
+        
+        lane = max(
+            {self._queue.lane_for(reminder.priority) for _, reminder in digest.items},
+            key=self._queue.weights.__getitem__
+        )
+        self._queue.put_nowait(lane, (None, digest))
+    
+    def discard(self, reminder_id: int) -> bool:
+        """Drop a reminder that is being held back, e.g. after it was edited or deleted."""
+        held = self._held.pop(reminder_id, None)
+        if held is not None:
+            handle, batch, _ = held
+            handle.cancel()
+            batch.item_done()
+            return True
+        
+        for digest in self._digests.values():
+            for i, (batch, reminder) in enumerate(digest.items):
+                if reminder.id == reminder_id:
+                    del digest.items[i]
+                    batch.item_done()
+                    return True
+        return False
+
+    async def _deliver_batch(self, reminder_ids: List[int]) -> None:
+        """Fetch, send and mark one batch, keeping count of batches in progress."""
+        self._active_batches += 1
+        self._idle.clear()
+        try:
+            await self._run_batch(reminder_ids)
+        finally:
+            self._active_batches -= 1
+            if not self._active_batches:
+                self._idle.set()
+    
+    async def _run_batch(self, reminder_ids: List[int]) -> None:
+        """Fetch, send and mark one batch."""
+        started = time.perf_counter()
+
+        # Single joined read for the whole batch
+        due_before = self.clock.utcnow() + timedelta(seconds=self.lead_seconds)
+        async with get_session() as session:
+            reminders = await ReminderOperations.get_delivery_records(session, reminder_ids, due_before)
+            not_due = []
+            if len(reminders) < len(reminder_ids):
+                # Sent, deleted, or moved to a later time
+                found = {reminder.id for reminder in reminders}
+                not_due = await ReminderOperations.get_due_times(
+                    session, [reminder_id for reminder_id in reminder_ids if reminder_id not in found]
+                )
+        for reminder_id, due_time in not_due:
+            self._stats['rearmed'] += 1
+            await self.on_reschedule(reminder_id, due_time)
+        if self.owns:
+            reminders = [reminder for reminder in reminders if self.owns(reminder.user_id)]
+        fetched = time.perf_counter()
+
+        batch = DeliveryBatch(len(reminders))
+        self._enqueue(batch, reminders)
+        await batch.wait()
+        sent = time.perf_counter()
+
+        await self._write_results(batch)
+        written = time.perf_counter()
+
+        self._record(len(reminder_ids), batch, started, fetched, sent, written)
+
+    async def _worker(self) -> None:
+        """Take reminders off the queue and send them."""
+        while True:
+            lane, (batch, item) = await self._queue.get()
+            if batch is None:
+                try:
+                    await self._send_digest(item, lane)
+                except asyncio.CancelledError:
+                    for digest_batch, _ in item.items:
+                        digest_batch.deferred += 1
+                    raise
+                except Exception as e:
+                    logger.error(f"❌ Delivery worker error for digest of user {item.user_id}: {e}")
+                finally:
+                    for digest_batch, _ in item.items:
+                        digest_batch.item_done()
+                continue
+            
+            try:
+                await self._send(batch, item, lane)
+            except asyncio.CancelledError:
+                batch.deferred += 1
+                raise
+            except Exception as e:
+                logger.error(f"❌ Delivery worker error for reminder {item.id}: {e}")
+            finally:
+                batch.item_done()
+
+    def _observe(self, reminder: DeliveryRecord, lane: str) -> None:
+        """Record how late a reminder is going out."""
+        lateness = max(self.clock.time() - to_epoch(self.due_time(reminder)), 0.0)
+        self._stats['lateness_samples'] += 1
+        self._stats['lateness_seconds_total'] += lateness
+        self._stats['lateness_seconds_max'] = max(self._stats['lateness_seconds_max'], lateness)
+        
+        lane_stats = self._lane_stats[lane]
+        lane_stats['sent'] += 1
+        lane_stats['lateness_seconds_total'] += lateness
+        lane_stats['lateness_seconds_max'] = max(lane_stats['lateness_seconds_max'], lateness)
+        self.metrics.record('lateness', lateness)
+
+    async def _send(self, batch: DeliveryBatch, reminder: DeliveryRecord, lane: str) -> None:
+        """Send a single reminder."""
+        if self.owns and not self.owns(reminder.user_id):
+            return  # Shard moved to another replica while queued
+        
+        self._observe(reminder, lane)
+        
+        started = self.clock.monotonic()
+        try:
+            await self.bot.send_message(
+                chat_id=reminder.chat_id,
+                **self.message_payload(reminder)
+            )
+            self.metrics.record('send', self.clock.monotonic() - started)
+            batch.sent.append((reminder.id, reminder.user_id))
+            
+            advance = advance_values(reminder, self.clock.utcnow())
+            if advance:
+                batch.advanced.append(advance)
+
+        except Exception as send_error:
+            self.metrics.record('send', self.clock.monotonic() - started)
+            logger.error(f"❌ Failed to send reminder {reminder.id}: {send_error}")
+            batch.failed.append((reminder, send_error))
+
+    async def _send_digest(self, digest: Digest, lane: str) -> None:
+        """Send a user's reminders as one message and mark them sent together."""
+        if self.owns and not self.owns(digest.user_id):
+            return  # Shard moved to another replica while queued
+        
+        reminders = [reminder for _, reminder in digest.items]
+        for reminder in reminders:
+            self._observe(reminder, lane)
+        
+        started = self.clock.monotonic()
+        try:
+            await self.bot.send_message(
+                chat_id=reminders[0].chat_id,
+                text=self.digest_formatter(reminders),
+                parse_mode="Markdown"
+            )
+            self.metrics.record('send', self.clock.monotonic() - started)
+        
+        except Exception as send_error:
+            # Each reminder falls back to its own retry schedule
+            self.metrics.record('send', self.clock.monotonic() - started)
+            logger.error(f"❌ Failed to send digest to user {digest.user_id}: {send_error}")
+            for batch, reminder in digest.items:
+                batch.failed.append((reminder, send_error))
+            return
+        
+        now = self.clock.utcnow()
+        advances = [advance for advance in (advance_values(r, now) for r in reminders) if advance]
+        advanced_ids = {advance['id'] for advance in advances}
+        
+        async def record(session) -> None:
+            await ReminderOperations.advance_recurring(session, advances, commit=False)
+            await ReminderOperations.mark_reminders_sent(
+                session,
+                [reminder.id for reminder in reminders if reminder.id not in advanced_ids],
+                [digest.user_id] * len(advanced_ids)
+            )
+        
+        try:
+            await run_write(record)
+        except Exception as e:
+            logger.error(f"❌ Failed to record digest for user {digest.user_id}: {e}")
+        else:
+            self._audit(
+                "INFO",
+                f"Digest of {len(reminders)} reminders sent successfully",
+                user_id=digest.user_id
+            )
+            await self._reschedule_advanced(advances)
+        
+        for batch, _ in digest.items:
+            batch.coalesced += 1
+        self._stats['digests'] += 1
+        self._stats['coalesced'] += len(reminders)
+    
+    def message_payload(self, reminder: DeliveryRecord) -> Dict[str, Any]:
+        """Get ``send_message`` arguments, rendering only if nothing was stored."""
+        if reminder.rendered_payload:
+            return json.loads(reminder.rendered_payload)
+        return {'text': self.formatter(reminder), 'parse_mode': "Markdown"}
+    
+    async def _write_results(self, batch: DeliveryBatch) -> None:
+        """Mark the batch sent, schedule retries and next occurrences, log outcomes in a single commit."""
+        if not batch.sent and not batch.failed:
+            return
+
+        now = self.clock.utcnow()
+        failures = []
+        failure_logs = []
+        for reminder, error in batch.failed:
+            next_attempt = self.retry_policy.next_attempt(reminder.retry_count, error, now)
+            reason = str(error)[:1000]
+            failures.append({
+                'id': reminder.id,
+                'retry_count': reminder.retry_count + 1,
+                'next_attempt_at': next_attempt,
+                'failure_reason': reason,
+                'is_failed': next_attempt is None,
+            })
+            failure_logs.append((
+                f"Failed to deliver reminder: {reason} "
+                + (f"(retry at {next_attempt})" if next_attempt else "(dead-lettered)"),
+                reminder.user_id,
+                reminder.id
+            ))
+
+        async def record(session) -> None:
+            await ReminderOperations.record_delivery_failures(session, failures, commit=False)
+            await ReminderOperations.advance_recurring(session, batch.advanced, commit=False)
+
+            # Commits the failures and advances together with the bulk update
+            advanced_ids = {advance['id'] for advance in batch.advanced}
+            await ReminderOperations.mark_reminders_sent(
+                session,
+                [reminder_id for reminder_id, _ in batch.sent if reminder_id not in advanced_ids],
+                [user_id for reminder_id, user_id in batch.sent if reminder_id in advanced_ids]
+            )
+
+        try:
+            await run_write(record)
+        except Exception as e:
+            logger.error(f"❌ Failed to record delivery batch: {e}")
+        else:
+            for reminder_id, user_id in batch.sent:
+                self._audit("INFO", "Reminder sent successfully", user_id, reminder_id)
+            for message, user_id, reminder_id in failure_logs:
+                self._audit("ERROR", message, user_id, reminder_id)
+            await self._reschedule_advanced(batch.advanced)
+
+        for failure in failures:
+            if failure['next_attempt_at']:
+                self._stats['retried'] += 1
+                await self.on_reschedule(failure['id'], failure['next_attempt_at'])
+            else:
+                self._stats['dead_lettered'] += 1
+                logger.warning(f"☠️ Reminder {failure['id']} dead-lettered: {failure['failure_reason']}")
+
+    def _audit(
+        self,
+        level: str,
+        message: str,
+        user_id: Optional[int] = None,
+        reminder_id: Optional[int] = None,
+    ) -> None:
+        """Queue a SystemLog row for the background writer."""
+        if self.log_sink is not None:
+            self.log_sink.log(level, message, "scheduler", user_id, reminder_id)
+
+    async def _reschedule_advanced(self, advances: List[Dict[str, Any]]) -> None:
+        """Hand next occurrences of recurring reminders back to the dispatcher."""
+        for advance in advances:
+            self._stats['advanced'] += 1
+            await self.on_reschedule(advance['id'], advance['scheduled_time'])
+
+    def _record(
+        self,
+        requested: int,
+        batch: DeliveryBatch,
+        started: float,
+        fetched: float,
+        sent: float,
+        written: float,
+    ) -> None:
+        """Update per-batch timing statistics."""
+        delivered = len(batch.sent) + batch.coalesced
+        skipped = requested - delivered - len(batch.failed) - batch.deferred
+
+        self._stats['batches'] += 1
+        self._stats['delivered'] += delivered
+        self._stats['failed'] += len(batch.failed)
+        self._stats['deferred'] += batch.deferred
+        self._stats['skipped'] += skipped
+        self._stats['fetch_seconds'] += fetched - started
+        self._stats['send_seconds'] += sent - fetched
+        self._stats['write_seconds'] += written - sent
+        self.metrics.record('db', (fetched - started) + (written - sent))
+
+        self._last_batch = {
+            'size': requested,
+            'delivered': delivered,
+            'failed': len(batch.failed),
+            'deferred': batch.deferred,
+            'skipped': skipped,
+            'fetch_ms': round((fetched - started) * 1000, 2),
+            'send_ms': round((sent - fetched) * 1000, 2),
+            'write_ms': round((written - sent) * 1000, 2),
+            'total_ms': round((written - started) * 1000, 2),
+        }
+
+        logger.debug(f"📦 Delivery batch: {self._last_batch}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get delivery statistics."""
+        samples = self._stats['lateness_samples']
+        return {
+            **self._stats,
+            'lateness_seconds_avg': self._stats['lateness_seconds_total'] / samples if samples else 0.0,
+            'smoothing': self.smoothing,
+            'queue_size': self._queue.qsize(),
+            'held': len(self._held),
+            'active_batches': self._active_batches,
+            'lanes': {
+                lane: {
+                    **stats,
+                    'weight': self._queue.weights[lane],
+                    'queued': self._queue.qsize(lane),
+                    'lateness_seconds_avg': (
+                        stats['lateness_seconds_total'] / stats['sent'] if stats['sent'] else 0.0
+                    ),
+                }
+                for lane, stats in self._lane_stats.items()
+            },
+            'workers': len(self._workers),
+            'last_batch': self._last_batch.copy(),
+        }
@@ -0,0 +1,276 @@
+"""
+Reminder Dispatcher
+
+Hierarchical timing wheel that keeps pending reminder IDs in memory
+and fires everything that is due once per tick.
+"""
+
+import asyncio
+import heapq
+import logging
+import math
+from array import array
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from src.utils.clock import Clock, get_clock
+
+logger = logging.getLogger(__name__)
+
+DueCallback = Callable[[List[int]], Awaitable[None]]
+
+
+def to_epoch(dt: datetime) -> float:
+    """Convert datetime to epoch seconds (naive values are treated as UTC)."""
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.timestamp()
+
+
+class ReminderDispatcher:
+    """
+    Two-level timing wheel.
+
+    Reminders are first filed into coarse slots (``slot_ticks`` ticks each,
+    a minute by default) stored as compact ``array('q')`` lists of IDs.
+    When a slot comes due its IDs cascade into per-tick buckets, so only
+    the current minute is ever held at full resolution. Only distinct
+    slot keys live in a min-heap, which keeps scheduling and cancelling
+    O(1) amortized regardless of how many reminders are pending.
+
+    Cancelled and rescheduled IDs are left behind in their old slot and
+    skipped when it fires; slots are compacted once stale entries
+    outnumber live ones.
+    """
+
+    COMPACT_MIN_STALE = 4096
+
+    def __init__(
+        self,
+        on_due: DueCallback,
+        tick_seconds: float = 1.0,
+        slot_ticks: int = 60,
+        lead_seconds: float = 0.0,
+        clock: Optional[Clock] = None,
+    ):
+        """
+        Initialize dispatcher.
+
+        ``lead_seconds`` hands reminders to the callback that much before
+        they are due, so the callback can prefetch and pace them itself.
+        """
+        if tick_seconds <= 0:
+            raise ValueError("tick_seconds must be positive")
+        if slot_ticks <= 0:
+            raise ValueError("slot_ticks must be positive")
+
+        self.tick_seconds = tick_seconds
+        self.slot_ticks = slot_ticks
+        self.lead_seconds = lead_seconds
+        self.clock = clock or get_clock()
+        self._on_due = on_due
+        self._index: Dict[int, int] = {}  # reminder_id -> tick
+
+        # Coarse level: slot -> reminder IDs
+        self._slots: Dict[int, array] = {}
+        self._slot_heap: List[int] = []
+
+        # Fine level: tick -> reminder IDs, only for cascaded slots
+        self._ticks: Dict[int, array] = {}
+        self._tick_heap: List[int] = []
+        self._cascaded_slot: Optional[int] = None
+
+        self._stale = 0
+        self._task: Optional[asyncio.Task] = None
+        self._inflight: Dict[asyncio.Task, int] = {}  # callback -> number of reminders
+        self._stats = {
+            'ticks': 0,
+            'fired': 0,
+            'compactions': 0,
+        }
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __contains__(self, reminder_id: int) -> bool:
+        return reminder_id in self._index
+
+    @property
+    def running(self) -> bool:
+        """Whether the tick loop is running."""
+        return self._task is not None and not self._task.done()
+
+    def _tick_for(self, fire_at: float) -> int:
+        """Map epoch seconds to a tick, rounding up so nothing fires early."""
+        return math.ceil(fire_at / self.tick_seconds)
+
+    @staticmethod
+    def _push(level: Dict[int, array], heap: List[int], key: int, reminder_id: int) -> None:
+        """Append an ID to a bucket, creating it on first use."""
+        bucket = level.get(key)
+        if bucket is None:
+            bucket = level[key] = array('q')
+            heapq.heappush(heap, key)
+        bucket.append(reminder_id)
+
+    def _file(self, reminder_id: int, tick: int) -> None:
+        """Put an ID into the wheel level that covers its tick."""
+        slot = tick // self.slot_ticks
+        if self._cascaded_slot is not None and slot <= self._cascaded_slot:
+            self._push(self._ticks, self._tick_heap, tick, reminder_id)
+        else:
+            self._push(self._slots, self._slot_heap, slot, reminder_id)
+
+    def schedule(self, reminder_id: int, fire_at: float) -> None:
+        """Schedule (or move) a reminder to fire at ``fire_at`` epoch seconds."""
+        tick = self._tick_for(fire_at)
+
+        previous = self._index.get(reminder_id)
+        if previous == tick:
+            return
+
+        self._index[reminder_id] = tick
+        self._file(reminder_id, tick)
+
+        if previous is not None:
+            self._mark_stale()
+
+    def cancel(self, reminder_id: int) -> bool:
+        """Cancel a scheduled reminder."""
+        if self._index.pop(reminder_id, None) is None:
+            return False
+
+        self._mark_stale()
+        return True
+
+    def next_fire_time(self, reminder_id: int) -> Optional[float]:
+        """Get the epoch time a reminder will fire at."""
+        tick = self._index.get(reminder_id)
+        if tick is None:
+            return None
+        return tick * self.tick_seconds
+
+    def export(self) -> Tuple[array, array]:
+        """Get pending IDs and their fire times as parallel arrays."""
+        ids = array('q', self._index.keys())
+        fire_times = array('d', (tick * self.tick_seconds for tick in self._index.values()))
+        return ids, fire_times
+
+    def pop_due(self, now: Optional[float] = None) -> List[int]:
+        """Remove and return every reminder due at or before ``now`` (plus lead)."""
+        now = (self.clock.time() if now is None else now) + self.lead_seconds
+        now_tick = math.floor(now / self.tick_seconds)
+        self._cascade(now_tick // self.slot_ticks)
+
+        due: List[int] = []
+        while self._tick_heap and self._tick_heap[0] <= now_tick:
+            tick = heapq.heappop(self._tick_heap)
+            for reminder_id in self._ticks.pop(tick):
+                if self._index.get(reminder_id) == tick:
+                    del self._index[reminder_id]
+                    due.append(reminder_id)
+                else:
+                    self._stale -= 1
+
+        return due
+
+    def _cascade(self, now_slot: int) -> None:
+        """Move every slot up to ``now_slot`` down to per-tick buckets."""
+        while self._slot_heap and self._slot_heap[0] <= now_slot:
+            slot = heapq.heappop(self._slot_heap)
+            for reminder_id in self._slots.pop(slot):
+                tick = self._index.get(reminder_id)
+                if tick is not None and tick // self.slot_ticks == slot:
+                    self._push(self._ticks, self._tick_heap, tick, reminder_id)
+                else:
+                    self._stale -= 1
+
+        if self._cascaded_slot is None or now_slot > self._cascaded_slot:
+            self._cascaded_slot = now_slot
+
+    def _mark_stale(self) -> None:
+        """Account for an orphaned bucket entry, compacting when they pile up."""
+        self._stale += 1
+        if self._stale > self.COMPACT_MIN_STALE and self._stale > len(self._index):
+            self._compact()
+
+    def _compact(self) -> None:
+        """Rebuild both wheel levels from the live index."""
+        self._slots, self._slot_heap = {}, []
+        self._ticks, self._tick_heap = {}, []
+        for reminder_id, tick in self._index.items():
+            self._file(reminder_id, tick)
+
+        self._stale = 0
+        self._stats['compactions'] += 1
+
+    async def start(self) -> None:
+        """Start the tick loop."""
+        if not self.running:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self, timeout: Optional[float] = None) -> int:
+        """
+        Stop the tick loop and wait for in-flight callbacks.
+
+        Callbacks still running after ``timeout`` seconds are cancelled.
+
+        Returns:
+            Number of reminders whose callbacks were cancelled
+        """
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+        cancelled = 0
+        if self._inflight:
+            _, pending = await asyncio.wait(list(self._inflight), timeout=timeout)
+            for task in pending:
+                cancelled += self._inflight.get(task, 0)
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+        return cancelled
+
+    async def _run(self) -> None:
+        """Wake once per tick and hand due reminders to the callback."""
+        while True:
+            now = self.clock.time()
+            due = self.pop_due(now)
+            self._stats['ticks'] += 1
+
+            if due:
+                self._stats['fired'] += len(due)
+                task = asyncio.create_task(self._fire(due))
+                self._inflight[task] = len(due)
+                task.add_done_callback(self._discard_inflight)
+
+            next_tick = (math.floor(now / self.tick_seconds) + 1) * self.tick_seconds
+            await self.clock.sleep(max(next_tick - self.clock.time(), 0))
+
+    def _discard_inflight(self, task: asyncio.Task) -> None:
+        """Forget a finished callback."""
+        self._inflight.pop(task, None)
+
+    async def _fire(self, due: List[int]) -> None:
+        """Run the due callback, keeping the loop alive on errors."""
+        try:
+            await self._on_due(due)
+        except Exception as e:
+            logger.error(f"❌ Dispatch of {len(due)} reminders failed: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get dispatcher statistics."""
+        return {
+            'pending': len(self._index),
+            'slots': len(self._slots),
+            'tick_buckets': len(self._ticks),
+            'stale_entries': self._stale,
+            'inflight': len(self._inflight),
+            'tick_seconds': self.tick_seconds,
+            'lead_seconds': self.lead_seconds,
+            **self._stats,
+        }
@@ -0,0 +1,227 @@
+"""
+Shard Leases
+
+Splits reminders into shards by user and lets each scheduler replica
+own a fair share of them through renewable lease rows in the database.
+"""
+
+import asyncio
+import logging
+import math
+from datetime import timedelta
+from typing import Any, Awaitable, Callable, Dict, FrozenSet, Optional, Set, Tuple
+
+from src.database.operations import run_write, LeaseOperations, ShardFilter
+from src.utils.clock import Clock, get_clock
+
+logger = logging.getLogger(__name__)
+
+ShardCallback = Callable[[Set[int]], Awaitable[Any]]
+
+
+class LeaseManager:
+    """
+    Keeps this replica's shard leases renewed and balanced.
+
+    Every ``renew_interval`` seconds the replica heartbeats, extends its
+    leases, and then sizes its share as ``ceil(shards / live replicas)``:
+    surplus shards are released for newcomers, and free or expired ones
+    are taken with a compare-and-set UPDATE. A replica that dies stops
+    renewing, so its shards are picked up within ``ttl`` seconds.
+
+    Ownership is only trusted locally until the last successful renewal
+    plus ``ttl`` minus one renew interval, so a replica that loses the
+    database stops sending before anyone else may take over.
+
+    A newly acquired shard settles for ``ttl`` seconds before it counts
+    as owned and ``on_acquired`` is called: a previous owner that gave
+    it up (or whose lease lapsed) mid-batch has that long to finish
+    sending and record the outcome, so the new owner does not deliver
+    the same reminders again.
+    """
+
+    def __init__(
+        self,
+        replica_id: str,
+        shard_count: int,
+        ttl: float = 10.0,
+        renew_interval: float = 3.0,
+        on_acquired: Optional[ShardCallback] = None,
+        on_lost: Optional[ShardCallback] = None,
+        on_cycle: Optional[Callable[[], Awaitable[Any]]] = None,
+        clock: Optional[Clock] = None,
+    ):
+        """Initialize lease manager."""
+        if shard_count <= 0:
+            raise ValueError("shard_count must be positive")
+        if not 0 < renew_interval < ttl:
+            raise ValueError("renew_interval must be positive and shorter than ttl")
+
+        self.replica_id = replica_id
+        self.shard_count = shard_count
+        self.ttl = ttl
+        self.renew_interval = renew_interval
+        self._on_acquired = on_acquired
+        self._on_lost = on_lost
+        self._on_cycle = on_cycle
+        self.clock = clock or get_clock()
+
+        self._owned: Set[int] = set()
+        self._settling: Dict[int, float] = {}  # shard -> monotonic time it may be used
+        self._valid_until = 0.0  # Monotonic
+        self._live_replicas = 0
+        self._task: Optional[asyncio.Task] = None
+        self._stats = {
+            'cycles': 0,
+            'errors': 0,
+            'acquired': 0,
+            'released': 0,
+            'lost': 0,
+        }
+
+    @property
+    def owned(self) -> FrozenSet[int]:
+        """Shards currently held and settled (even if the lease may have lapsed)."""
+        return frozenset(self._owned.difference(self._settling))
+
+    def shard_of(self, user_id: int) -> int:
+        """Get the shard a user's reminders belong to."""
+        return user_id % self.shard_count
+
+    def owns(self, user_id: int) -> bool:
+        """Check whether this replica may deliver a user's reminders right now."""
+        shard = self.shard_of(user_id)
+        return (
+            shard in self._owned
+            and shard not in self._settling
+            and self.clock.monotonic() < self._valid_until
+        )
+
+    def shard_filter(self, shards: Optional[Set[int]] = None) -> ShardFilter:
+        """Get a database filter for the owned (or given) shards."""
+        return self.shard_count, self.owned if shards is None else frozenset(shards)
+
+    async def start(self) -> None:
+        """Register the replica, take an initial share and start renewing."""
+        await run_write(LeaseOperations.ensure_shards, self.shard_count)
+        await self._cycle()
+
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop renewing and hand every shard back."""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+        async def leave(session) -> None:
+            await LeaseOperations.release(session, self.replica_id, self._owned)
+            await LeaseOperations.remove_replica(session, self.replica_id)
+
+        try:
+            await run_write(leave)
+            logger.info(f"🔓 Released {len(self._owned)} shards")
+        except Exception as e:
+            logger.error(f"❌ Failed to release shards: {e}")
+
+        self._owned = set()
+        self._settling = {}
+        self._valid_until = 0.0
+
+    async def _run(self) -> None:
+        """Renew and rebalance until cancelled."""
+        while True:
+            await self.clock.sleep(self.renew_interval)
+            try:
+                await self._cycle()
+            except Exception as e:
+                self._stats['errors'] += 1
+                logger.error(f"❌ Lease renewal failed: {e}")
+
+    async def _cycle(self) -> None:
+        """Heartbeat, renew, then release or acquire shards toward a fair share."""
+        started = self.clock.monotonic()
+        now = self.clock.utcnow()
+        expires_at = now + timedelta(seconds=self.ttl)
+
+        async def rebalance(session) -> Tuple[Set[int], Set[int], Set[int], Set[int]]:
+            await LeaseOperations.heartbeat(session, self.replica_id, now)
+            await LeaseOperations.renew(session, self.replica_id, expires_at)
+
+            live = await LeaseOperations.get_live_replicas(session, now - timedelta(seconds=self.ttl))
+            leases = await LeaseOperations.get_leases(session)
+
+            self._live_replicas = max(len(set(live) | {self.replica_id}), 1)
+            target = math.ceil(self.shard_count / self._live_replicas)
+
+            owned = {lease.shard for lease in leases if lease.owner == self.replica_id}
+            lost = self._owned - owned
+
+            released: Set[int] = set()
+            if len(owned) > target:
+                released = set(sorted(owned)[target:])
+                await LeaseOperations.release(session, self.replica_id, released)
+                owned -= released
+
+            acquired: Set[int] = set()
+            for lease in leases:
+                if len(owned) >= target:
+                    break
+                if lease.shard in owned:
+                    continue
+                if lease.owner is None or lease.expires_at is None or lease.expires_at < now:
+                    if await LeaseOperations.try_acquire(
+                        session, lease.shard, self.replica_id, now, expires_at
+                    ):
+                        owned.add(lease.shard)
+                        acquired.add(lease.shard)
+            return owned, lost, released, acquired
+
+        owned, lost, released, acquired = await run_write(rebalance)
+
+        # Trust the leases for one renew interval less than they last
+        self._valid_until = started + self.ttl - self.renew_interval
+        newly_owned = owned - self._owned
+        self._owned = owned
+        for shard in lost | released:
+            self._settling.pop(shard, None)
+        for shard in newly_owned:
+            self._settling[shard] = started + self.ttl
+        settled = {shard for shard, usable_at in self._settling.items() if usable_at <= self.clock.monotonic()}
+        for shard in settled:
+            del self._settling[shard]
+        self._stats['cycles'] += 1
+        self._stats['acquired'] += len(acquired)
+        self._stats['released'] += len(released)
+        self._stats['lost'] += len(lost)
+
+        if lost or released:
+            logger.warning(f"🔒 Gave up shards {sorted(lost | released)}")
+            if self._on_lost:
+                await self._on_lost(lost | released)
+
+        if newly_owned:
+            logger.info(f"🔑 Acquired shards {sorted(newly_owned)}, usable in {self.ttl:g}s")
+
+        if settled and self._on_acquired:
+            await self._on_acquired(settled)
+
+        if self._on_cycle:
+            await self._on_cycle()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get lease statistics."""
+        return {
+            'replica_id': self.replica_id,
+            'shard_count': self.shard_count,
+            'owned': sorted(self._owned),
+            'settling': sorted(self._settling),
+            'live_replicas': self._live_replicas,
+            'valid_for': max(self._valid_until - self.clock.monotonic(), 0.0),
+            **self._stats,
+        }
@@ -0,0 +1,170 @@
+"""
+System Log Sink
+
+Buffers SystemLog rows in memory and writes them in batches from a
+background task, so the audit log never holds up a delivery.
+"""
+
+import asyncio
+import logging
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+from src.database.operations import run_write, SystemLogOperations
+from src.utils.clock import Clock, get_clock
+
+logger = logging.getLogger(__name__)
+
+OVERFLOW_POLICIES = ('drop_oldest', 'drop_newest')
+
+
+class LogSink:
+    """
+    Bounded in-memory queue of SystemLog rows with batched writes.
+
+    ``log`` never waits: it appends to the buffer and returns. A write
+    starts once ``batch_size`` rows are waiting or ``flush_interval``
+    seconds after the first unwritten row, whichever comes first, and
+    inserts everything buffered with one executemany per batch.
+
+    When ``capacity`` rows are already waiting, ``overflow`` decides
+    what is lost: ``drop_oldest`` makes room by discarding the oldest
+    row, ``drop_newest`` discards the incoming one. Rows in a batch
+    whose write fails are dropped as well, and counted.
+    """
+
+    def __init__(
+        self,
+        capacity: int = 10000,
+        batch_size: int = 500,
+        flush_interval: float = 2.0,
+        overflow: str = 'drop_oldest',
+        clock: Optional[Clock] = None,
+    ):
+        """Initialize log sink."""
+        if capacity <= 0 or batch_size <= 0 or flush_interval <= 0:
+            raise ValueError("capacity, batch_size and flush_interval must be positive")
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy {overflow!r}")
+
+        self.capacity = capacity
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.overflow = overflow
+        self.clock = clock or get_clock()
+
+        self._buffer: deque = deque()
+        self._wake = asyncio.Event()
+        self._timer: Optional[Any] = None  # Handle of the pending time trigger
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+        self._stats = {
+            'logged': 0,
+            'written': 0,
+            'dropped': 0,
+            'failed': 0,
+            'flushes': 0,
+        }
+
+    def __len__(self) -> int:
+        return len(self._buffer)
+
+    def log(
+        self,
+        level: str,
+        message: str,
+        module: Optional[str] = None,
+        user_id: Optional[int] = None,
+        reminder_id: Optional[int] = None,
+        extra_data: Optional[str] = None,
+    ) -> bool:
+        """
+        Queue a SystemLog row.
+
+        Returns:
+            False if the row was dropped under ``drop_newest``
+        """
+        if len(self._buffer) >= self.capacity:
+            self._stats['dropped'] += 1
+            if self.overflow == 'drop_newest':
+                return False
+            self._buffer.popleft()
+
+        self._buffer.append({
+            'level': level,
+            'message': message,
+            'module': module,
+            'user_id': user_id,
+            'reminder_id': reminder_id,
+            'extra_data': extra_data,
+            'created_at': self.clock.utcnow(),
+        })
+        self._stats['logged'] += 1
+
+        if len(self._buffer) >= self.batch_size:
+            self._wake.set()
+        elif self._timer is None:
+            self._timer = self.clock.call_later(self.flush_interval, self._wake.set)
+        return True
+
+    async def start(self) -> None:
+        """Start the background writer."""
+        self._stopping = False
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Write everything still buffered and stop the writer."""
+        if self._task:
+            self._stopping = True
+            self._wake.set()
+            await self._task
+            self._task = None
+        else:
+            await self.flush()
+
+    async def _run(self) -> None:
+        """Flush whenever a trigger fires, until stopped."""
+        while True:
+            await self._wake.wait()
+            self._wake.clear()
+            await self.flush()
+            if self._stopping:
+                return
+
+    async def flush(self) -> int:
+        """
+        Write every buffered row, one executemany per batch.
+
+        Returns:
+            Number of rows written
+        """
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        written = 0
+        while self._buffer:
+            rows: List[Dict[str, Any]] = [
+                self._buffer.popleft() for _ in range(min(self.batch_size, len(self._buffer)))
+            ]
+            try:
+                await run_write(SystemLogOperations.create_logs, rows)
+            except Exception as e:
+                self._stats['failed'] += len(rows)
+                logger.error(f"❌ Failed to write {len(rows)} system log rows: {e}")
+            else:
+                written += len(rows)
+                self._stats['written'] += len(rows)
+                self._stats['flushes'] += 1
+
+        return written
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get sink statistics."""
+        return {
+            'buffered': len(self._buffer),
+            'capacity': self.capacity,
+            'overflow': self.overflow,
+            **self._stats,
+        }
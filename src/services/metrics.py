@@ -0,0 +1,181 @@
+"""
+Delivery Metrics
+
+Fixed-bucket histograms for delivery lateness, database time and
+send time, with per-hour deltas kept aside for persistence.
+"""
+
+import json
+from bisect import bisect_left
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Sequence
+
+from src.database.models import DeliveryStatsHourly
+from src.database.operations import run_write, MetricsOperations
+from src.utils.clock import Clock, get_clock
+
+# Upper bucket bounds in seconds; one overflow bucket follows the last bound
+DEFAULT_BOUNDS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0,
+    10.0, 20.0, 30.0, 60.0, 120.0, 300.0, 600.0, 1800.0, 3600.0,
+)
+
+METRICS = ('lateness', 'db', 'send')
+
+
+class Histogram:
+    """
+    Fixed-bucket histogram.
+
+    Recording is a bisect and an increment; percentiles are reported as
+    the upper bound of the bucket they fall in (capped by the true max).
+    """
+
+    __slots__ = ('bounds', 'counts', 'count', 'total', 'max')
+
+    def __init__(self, bounds: Sequence[float] = DEFAULT_BOUNDS, counts: Optional[Iterable[int]] = None):
+        """Initialize histogram."""
+        self.bounds = tuple(bounds)
+        self.counts: List[int] = list(counts) if counts is not None else [0] * (len(self.bounds) + 1)
+        if len(self.counts) != len(self.bounds) + 1:
+            raise ValueError("counts must have one entry per bucket plus overflow")
+        self.count = sum(self.counts)
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, value: float) -> None:
+        """Add one sample."""
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def merge(self, other: "Histogram") -> None:
+        """Add another histogram with the same bounds into this one."""
+        if other.bounds != self.bounds:
+            raise ValueError("Cannot merge histograms with different bounds")
+        for i, count in enumerate(other.counts):
+            self.counts[i] += count
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+    def percentile(self, q: float) -> float:
+        """Get the value below which ``q`` (0..1) of the samples fall."""
+        if not self.count:
+            return 0.0
+
+        rank = q * self.count
+        seen = 0
+        for i, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank and count:
+                if i < len(self.bounds):
+                    return min(self.bounds[i], self.max)
+                return self.max
+        return self.max
+
+    def summary(self) -> Dict[str, float]:
+        """Get count, average, p50/p95/p99 and max."""
+        return {
+            'count': self.count,
+            'avg': round(self.total / self.count, 4) if self.count else 0.0,
+            'p50': round(self.percentile(0.50), 4),
+            'p95': round(self.percentile(0.95), 4),
+            'p99': round(self.percentile(0.99), 4),
+            'max': round(self.max, 4),
+        }
+
+
+class DeliveryMetrics:
+    """Lateness, DB and send-time histograms for the scheduler."""
+
+    def __init__(self, bounds: Sequence[float] = DEFAULT_BOUNDS, clock: Optional[Clock] = None):
+        """Initialize metrics."""
+        self.bounds = tuple(bounds)
+        self.clock = clock or get_clock()
+        self.totals: Dict[str, Histogram] = {name: Histogram(self.bounds) for name in METRICS}
+        self._hourly: Dict[int, Dict[str, Histogram]] = {}
+
+    def record(self, metric: str, seconds: float) -> None:
+        """Record a sample in the running totals and the current hour."""
+        self.totals[metric].record(seconds)
+
+        hour = int(self.clock.time() // 3600)
+        pending = self._hourly.get(hour)
+        if pending is None:
+            pending = self._hourly[hour] = {name: Histogram(self.bounds) for name in METRICS}
+        pending[metric].record(seconds)
+
+    def take_hourly(self) -> Dict[int, Dict[str, Histogram]]:
+        """Hand over the per-hour deltas recorded since the last call."""
+        hourly, self._hourly = self._hourly, {}
+        return hourly
+
+    def restore_hourly(self, hourly: Dict[int, Dict[str, Histogram]]) -> None:
+        """Put back deltas that could not be persisted."""
+        for hour, histograms in hourly.items():
+            pending = self._hourly.setdefault(
+                hour, {name: Histogram(self.bounds) for name in METRICS}
+            )
+            for name, histogram in histograms.items():
+                pending[name].merge(histogram)
+
+    def get_stats(self) -> Dict[str, Dict[str, float]]:
+        """Get summaries of the running totals."""
+        return {name: histogram.summary() for name, histogram in self.totals.items()}
+
+    async def flush(self) -> int:
+        """
+        Merge the per-hour deltas into ``delivery_stats_hourly``.
+
+        Returns:
+            Number of hourly rows written
+        """
+        hourly = self.take_hourly()
+        if not hourly:
+            return 0
+
+        hours = {datetime.utcfromtimestamp(hour * 3600): hour for hour in hourly}
+
+        async def merge(session) -> int:
+            """Read the stored rows, merge the deltas in and commit."""
+            written = 0
+            rows = await MetricsOperations.get_hourly_stats(session, list(hours))
+            existing = {(row.hour, row.metric): row for row in rows}
+
+            for hour_start, hour in hours.items():
+                for name, histogram in hourly[hour].items():
+                    if not histogram.count:
+                        continue
+
+                    row = existing.get((hour_start, name))
+                    merged = Histogram(self.bounds)
+                    if row is None:
+                        row = DeliveryStatsHourly(hour=hour_start, metric=name)
+                        session.add(row)
+                    elif len(json.loads(row.buckets)) == len(self.bounds) + 1:
+                        merged = Histogram(self.bounds, json.loads(row.buckets))
+                        merged.total = row.total_seconds
+                        merged.max = row.max_seconds
+                    merged.merge(histogram)
+
+                    summary = merged.summary()
+                    row.count = merged.count
+                    row.total_seconds = merged.total
+                    row.max_seconds = merged.max
+                    row.p50_seconds = summary['p50']
+                    row.p95_seconds = summary['p95']
+                    row.p99_seconds = summary['p99']
+                    row.buckets = json.dumps(merged.counts)
+                    written += 1
+
+            await session.commit()
+            return written
+
+        try:
+            return await run_write(merge)
+        except Exception:
+            self.restore_hourly(hourly)
+            raise
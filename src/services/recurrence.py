@@ -0,0 +1,193 @@
+"""
+Recurrence Engine
+
+Compiles recurrence patterns into objects that compute the next
+occurrence in constant time, on the user's wall clock (DST-aware).
+"""
+
+import logging
+from calendar import monthrange
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Any, Dict, Optional
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from src.config import config
+from src.database.models import Reminder
+from src.utils.clock import get_clock
+from src.utils.formatters import render_reminder_payload
+
+logger = logging.getLogger(__name__)
+
+FREQUENCIES = ('daily', 'weekly', 'monthly', 'yearly', 'custom')
+
+
+class RecurrenceError(ValueError):
+    """Raised for recurrence patterns that cannot be compiled."""
+    pass
+
+
+def _add_months(dt: datetime, months: int) -> datetime:
+    """Add calendar months, clamping the day to the length of the target month."""
+    year, month = divmod(dt.month - 1 + months, 12)
+    year += dt.year
+    month += 1
+    return dt.replace(year=year, month=month, day=min(dt.day, monthrange(year, month)[1]))
+
+
+class Recurrence:
+    """
+    Compiled recurrence rule.
+
+    Occurrence ``k`` is computed directly from the anchor (the first
+    occurrence) rather than from the previous one, so month-end days
+    do not drift and DST changes keep the local time of day. Finding
+    the next occurrence is an estimate plus at most a couple of
+    corrections, independent of how many occurrences have passed.
+
+    Pattern format: ``<frequency>[:<interval>]`` where frequency is
+    daily, weekly, monthly or yearly (interval in those units) or
+    custom (interval in minutes, fixed duration).
+    """
+
+    __slots__ = ('frequency', 'interval', 'anchor', 'tz', 'until', '_local_anchor')
+
+    def __init__(
+        self,
+        frequency: str,
+        interval: int,
+        anchor: datetime,
+        tz: ZoneInfo,
+        until: Optional[datetime] = None,
+    ):
+        """Initialize rule; ``anchor`` and ``until`` are naive UTC."""
+        if frequency not in FREQUENCIES:
+            raise RecurrenceError(f"Unknown recurrence frequency: {frequency}")
+        if interval <= 0:
+            raise RecurrenceError("Recurrence interval must be positive")
+
+        self.frequency = frequency
+        self.interval = interval
+        self.anchor = anchor
+        self.tz = tz
+        self.until = until
+        self._local_anchor = self._to_local(anchor)
+
+    def _to_local(self, dt: datetime) -> datetime:
+        """Naive UTC -> naive wall-clock time in the rule's zone."""
+        return dt.replace(tzinfo=timezone.utc).astimezone(self.tz).replace(tzinfo=None)
+
+    def _to_utc(self, local: datetime) -> datetime:
+        """Naive wall-clock time -> naive UTC (skipped times move forward)."""
+        return local.replace(tzinfo=self.tz).astimezone(timezone.utc).replace(tzinfo=None)
+
+    def occurrence(self, k: int) -> datetime:
+        """Get occurrence ``k`` (0 is the anchor) as naive UTC."""
+        if self.frequency == 'custom':
+            return self.anchor + timedelta(minutes=k * self.interval)
+        if self.frequency == 'daily':
+            local = self._local_anchor + timedelta(days=k * self.interval)
+        elif self.frequency == 'weekly':
+            local = self._local_anchor + timedelta(weeks=k * self.interval)
+        elif self.frequency == 'monthly':
+            local = _add_months(self._local_anchor, k * self.interval)
+        else:
+            local = _add_months(self._local_anchor, 12 * k * self.interval)
+        return self._to_utc(local)
+
+    def _estimate(self, after: datetime) -> int:
+        """Estimate the index of the first occurrence after ``after``."""
+        if self.frequency == 'custom':
+            step = timedelta(minutes=self.interval)
+            return (after - self.anchor) // step + 1
+
+        local = self._to_local(after)
+        if self.frequency in ('daily', 'weekly'):
+            step = timedelta(days=self.interval * (7 if self.frequency == 'weekly' else 1))
+            return (local - self._local_anchor) // step + 1
+
+        months = (local.year - self._local_anchor.year) * 12 + local.month - self._local_anchor.month
+        step = self.interval * (12 if self.frequency == 'yearly' else 1)
+        return months // step
+
+    def next_after(self, after: datetime) -> Optional[datetime]:
+        """Get the first occurrence strictly after ``after``, or None past the end date."""
+        k = max(self._estimate(after), 0)
+
+        # The estimate is off by at most one step around DST and month ends
+        while self.occurrence(k) <= after:
+            k += 1
+        while k > 0 and self.occurrence(k - 1) > after:
+            k -= 1
+
+        next_time = self.occurrence(k)
+        if self.until is not None and next_time > self.until:
+            return None
+        return next_time
+
+
+@lru_cache(maxsize=4096)
+def compile_recurrence(
+    pattern: str,
+    anchor: datetime,
+    timezone_name: str = "UTC",
+    until: Optional[datetime] = None,
+) -> Recurrence:
+    """Compile a pattern such as ``daily``, ``weekly:2`` or ``custom:90``."""
+    frequency, _, interval = pattern.strip().lower().partition(':')
+    try:
+        interval_value = int(interval) if interval else 1
+    except ValueError:
+        raise RecurrenceError(f"Invalid recurrence interval: {interval}")
+
+    if frequency == 'custom' and not interval:
+        raise RecurrenceError("Custom recurrence needs an interval in minutes")
+
+    try:
+        tz = ZoneInfo(timezone_name)
+    except (ZoneInfoNotFoundError, ValueError):
+        tz = ZoneInfo("UTC")
+
+    return Recurrence(frequency, interval_value, anchor, tz, until)
+
+
+def advance_values(reminder: Reminder, now: Optional[datetime] = None) -> Optional[Dict[str, Any]]:
+    """
+    Get the in-place update that moves a recurring reminder to its next occurrence.
+
+    Returns:
+        Column values keyed for a bulk update by primary key, or None if the
+        reminder does not recur (any more) and should be marked sent
+    """
+    if not reminder.is_recurring or not reminder.recurrence_pattern:
+        return None
+
+    anchor = reminder.recurrence_start or reminder.scheduled_time
+    try:
+        rule = compile_recurrence(
+            reminder.recurrence_pattern,
+            anchor,
+            reminder.user.timezone,
+            reminder.recurrence_end_date
+        )
+    except RecurrenceError as e:
+        logger.warning(f"⚠️ Reminder {reminder.id} has a bad recurrence pattern: {e}")
+        return None
+
+    now = now or get_clock().utcnow()
+    next_time = rule.next_after(max(reminder.scheduled_time, now))
+    if next_time is None:
+        return None
+
+    values = {
+        'id': reminder.id,
+        'scheduled_time': next_time,
+        'recurrence_start': anchor,
+        'next_attempt_at': None,
+        'retry_count': 0,
+        'failure_reason': None,
+        'rendered_payload': None,
+    }
+    if config.DELIVERY_PRERENDER:
+        values['rendered_payload'] = render_reminder_payload(reminder, next_time)
+    return values
@@ -0,0 +1,81 @@
+"""
+Retry Policy
+
+Classifies delivery errors and computes exponential backoff
+with jitter for reminders that should be retried.
+"""
+
+import random
+from datetime import datetime, timedelta
+from typing import Optional
+
+from aiogram.exceptions import (
+    TelegramBadRequest,
+    TelegramForbiddenError,
+    TelegramNotFound,
+    TelegramRetryAfter,
+    TelegramUnauthorizedError,
+)
+
+from src.utils.clock import get_clock
+
+# Errors that will not go away by retrying
+PERMANENT_ERRORS = (
+    TelegramForbiddenError,  # Bot blocked or kicked
+    TelegramUnauthorizedError,
+    TelegramNotFound,
+    TelegramBadRequest,
+)
+
+
+class RetryPolicy:
+    """Exponential backoff with jitter and error classification."""
+
+    def __init__(
+        self,
+        max_retries: int = 5,
+        base_delay: float = 30.0,
+        max_delay: float = 3600.0,
+        jitter: float = 0.5,
+    ):
+        """Initialize retry policy."""
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.jitter = jitter
+
+    def is_retryable(self, error: BaseException) -> bool:
+        """
+        Check whether a delivery error is worth retrying.
+        
+        Network, server and flood-control errors are transient; unknown
+        errors get the benefit of the doubt, bounded by ``max_retries``.
+        """
+        return not isinstance(error, PERMANENT_ERRORS)
+
+    def delay(self, retry_count: int, error: Optional[BaseException] = None) -> float:
+        """Get backoff delay in seconds before attempt ``retry_count + 1``."""
+        delay = min(self.max_delay, self.base_delay * (2 ** retry_count))
+        delay *= 1 - self.jitter * random.random()
+
+        if isinstance(error, TelegramRetryAfter):
+            delay = max(delay, float(error.retry_after))
+        return delay
+
+    def next_attempt(
+        self,
+        retry_count: int,
+        error: BaseException,
+        now: Optional[datetime] = None,
+    ) -> Optional[datetime]:
+        """
+        Get when to retry a failed delivery.
+
+        Returns:
+            Retry time, or None if the reminder should be dead-lettered
+        """
+        if not self.is_retryable(error) or retry_count >= self.max_retries:
+            return None
+
+        now = now or get_clock().utcnow()
+        return now + timedelta(seconds=self.delay(retry_count, error))
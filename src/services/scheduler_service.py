@@ -7,8 +7,10 @@ job management, and comprehensive monitoring.
 
 import logging
 import asyncio
-from datetime import datetime, timedelta
-from typing import Optional, Dict, Any, List
+import time
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Dict, Any, List, Set, Tuple
 from contextlib import asynccontextmanager
 
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
@@ -17,8 +19,24 @@ from apscheduler.executors.asyncio import AsyncIOExecutor
 from apscheduler.events import EVENT_JOB_EXECUTED, EVENT_JOB_ERROR, EVENT_JOB_MISSED
 from apscheduler import events
 
+from app.utils.logger import scheduler_perf_logger
+from src.bot import send_governor
 from src.config import config
-from src.database.operations import get_session, ReminderOperations, SystemLogOperations
+from src.database.operations import (
+    engine, db_writer, get_session, run_write, ReminderOperations, StatisticsOperations, SystemLogOperations,
+    MetricsOperations, ShardFilter
+)
+from src.database.sqlite_tuning import WalCheckpointer
+from src.services.delivery import DeliveryPipeline
+from src.services.dispatcher import ReminderDispatcher, to_epoch
+from src.services.leases import LeaseManager
+from src.services.log_sink import LogSink
+from src.services.metrics import DeliveryMetrics
+from src.services.recurrence import advance_values
+from src.services.snapshot import SnapshotError, read_snapshot, write_snapshot
+from src.utils.clock import Clock, get_clock
+from src.utils.formatters import format_reminder_notification, format_reminder_digest
+from src.services.retry_policy import RetryPolicy
 
 logger = logging.getLogger(__name__)
 
@@ -26,15 +44,23 @@ logger = logging.getLogger(__name__)
 class SchedulerService:
     """Enhanced scheduler service for reminder management."""
     
-    def __init__(self, bot):
-        """Initialize scheduler service."""
+    def __init__(self, bot, clock: Optional[Clock] = None):
+        """
+        Initialize scheduler service.
+        
+        ``clock`` (the process-wide one by default) drives the dispatcher,
+        delivery and catch-up; a virtual clock lets simulations run faster
+        than real time. Housekeeping jobs stay on APScheduler's real clock.
+        """
         self.bot = bot
+        self.clock = clock or get_clock()
         self.scheduler: Optional[AsyncIOScheduler] = None
         self._job_stats = {
             'executed': 0,
             'errors': 0,
             'missed': 0,
-            'scheduled': 0
+            'scheduled': 0,
+            'caught_up': 0
         }
         
         # Configure scheduler
@@ -64,11 +90,106 @@ class SchedulerService:
             self._job_executed_listener, 
             EVENT_JOB_EXECUTED | EVENT_JOB_ERROR | EVENT_JOB_MISSED
         )
+        
+        # Reminders are held by the timing wheel, not as APScheduler jobs
+        self.dispatcher = ReminderDispatcher(
+            self._dispatch_due,
+            tick_seconds=config.SCHEDULER_TICK_SECONDS,
+            lead_seconds=config.SCHEDULER_PREFETCH_SECONDS if config.SCHEDULER_SMOOTHING else 0.0,
+            clock=self.clock
+        )
+        
+        # Upper bound of the window currently held in the dispatcher
+        self._horizon_end: Optional[datetime] = None
+        
+        self.retry_policy = RetryPolicy(
+            max_retries=config.DELIVERY_MAX_RETRIES,
+            base_delay=config.DELIVERY_RETRY_BASE_SECONDS,
+            max_delay=config.DELIVERY_RETRY_MAX_SECONDS
+        )
+        # Shard ownership when several replicas share the database
+        self.leases: Optional[LeaseManager] = None
+        if config.SCHEDULER_SHARDS:
+            self.leases = LeaseManager(
+                config.SCHEDULER_REPLICA_ID,
+                config.SCHEDULER_SHARDS,
+                ttl=config.SCHEDULER_LEASE_TTL_SECONDS,
+                renew_interval=config.SCHEDULER_LEASE_RENEW_SECONDS,
+                on_acquired=self._on_shards_acquired,
+                on_lost=self._on_shards_lost,
+                on_cycle=self._poll_new_reminders,
+                clock=self.clock
+            )
+        self._last_seen_id = 0
+        self._changes_since: Optional[datetime] = None  # Poll watermark on updated_at
+        self._delivering: Set[int] = set()  # Handed to delivery, outcome not written yet
+        self._drain_stats: Dict[str, int] = {}
+        self._snapshot_stats = {
+            'written': 0,
+            'restored': 0,
+            'reconciled': 0,
+            'last_write_ms': 0.0
+        }
+        
+        self.metrics = DeliveryMetrics(clock=self.clock)
+        
+        # Keeps the write-ahead log short between SQLite's own checkpoints
+        self.checkpointer: Optional[WalCheckpointer] = None
+        if config.SQLITE_CHECKPOINT_SECONDS:
+            self.checkpointer = WalCheckpointer(
+                engine,
+                config.DATABASE_PATH,
+                interval=config.SQLITE_CHECKPOINT_SECONDS,
+                truncate_bytes=config.SQLITE_WAL_TRUNCATE_MB * 1024 * 1024,
+                clock=self.clock
+            )
+        
+        # SystemLog rows are written in batches off the delivery path
+        self.log_sink = LogSink(
+            capacity=config.LOG_SINK_CAPACITY,
+            batch_size=config.LOG_SINK_BATCH_SIZE,
+            flush_interval=config.LOG_SINK_FLUSH_SECONDS,
+            overflow=config.LOG_SINK_OVERFLOW,
+            clock=self.clock
+        )
+        self.delivery = DeliveryPipeline(
+            bot,
+            self._format_reminder_message,
+            on_reschedule=self.schedule_reminder,
+            retry_policy=self.retry_policy,
+            concurrency=config.DELIVERY_CONCURRENCY,
+            batch_size=config.DELIVERY_BATCH_SIZE,
+            smoothing=config.SCHEDULER_SMOOTHING,
+            lateness_budget=config.SCHEDULER_LATENESS_BUDGET_SECONDS,
+            lane_weights=config.get_lane_weights(),
+            metrics=self.metrics,
+            coalesce_window=config.DELIVERY_COALESCE_WINDOW_SECONDS if config.DELIVERY_COALESCE else None,
+            digest_formatter=format_reminder_digest,
+            owns=self.leases.owns if self.leases else None,
+            lead_seconds=self.dispatcher.lead_seconds,
+            clock=self.clock,
+            log_sink=self.log_sink
+        )
+        self._tick_stats = {
+            'mode': config.DELIVERY_MODE,
+            'ticks': 0,
+            'reminders': 0,
+            'seconds': 0.0,
+            'last_tick_ms': 0.0
+        }
     
     async def start(self) -> None:
         """Start the scheduler."""
         try:
             self.scheduler.start()
+            await self.log_sink.start()
+            if self.checkpointer:
+                await self.checkpointer.start()
+            await self.delivery.start()
+            await self.dispatcher.start()
+            
+            if self.leases:
+                await self.leases.start()
             
             # Schedule cleanup job
             self.scheduler.add_job(
@@ -79,6 +200,35 @@ class SchedulerService:
                 replace_existing=True
             )
             
+            # Persist hourly delivery histograms
+            self.scheduler.add_job(
+                self._flush_metrics,
+                'interval',
+                minutes=config.SCHEDULER_METRICS_FLUSH_MINUTES,
+                id='flush_metrics',
+                replace_existing=True
+            )
+            
+            # Let restarts resume from a recent snapshot
+            if self._snapshot_enabled() and config.SCHEDULER_SNAPSHOT_INTERVAL_MINUTES:
+                self.scheduler.add_job(
+                    self._write_snapshot,
+                    'interval',
+                    minutes=config.SCHEDULER_SNAPSHOT_INTERVAL_MINUTES,
+                    id='snapshot_schedule',
+                    replace_existing=True
+                )
+            
+            # Keep the rolling window topped up
+            if config.SCHEDULER_HORIZON_MINUTES:
+                self.scheduler.add_job(
+                    self._refill_horizon,
+                    'interval',
+                    minutes=config.SCHEDULER_REFILL_INTERVAL_MINUTES,
+                    id='refill_horizon',
+                    replace_existing=True
+                )
+            
             logger.info("✅ Scheduler started successfully")
             
         except Exception as e:
@@ -86,60 +236,98 @@ class SchedulerService:
             raise
     
     async def stop(self) -> None:
-        """Stop the scheduler."""
+        """Stop the scheduler, draining in-flight deliveries first."""
         try:
+            await self._drain()
+            await self._write_snapshot()
+            if self.leases:
+                await self.leases.stop()
+            await self._flush_metrics()
+            await self.log_sink.stop()
+            if self.checkpointer:
+                await self.checkpointer.stop()
+            
             if self.scheduler and self.scheduler.running:
                 self.scheduler.shutdown(wait=True)
                 logger.info("✅ Scheduler stopped successfully")
         except Exception as e:
             logger.error(f"❌ Error stopping scheduler: {e}")
     
+    async def _drain(self) -> Dict[str, int]:
+        """
+        Stop taking ticks and settle what is already in flight.
+        
+        Deliveries get ``SCHEDULER_DRAIN_SECONDS`` to finish and have their
+        results written; anything still unsent by then stays due in the
+        database and is delivered by catch-up on the next start.
+        """
+        executed_before = self._job_stats['executed']
+        
+        if config.DELIVERY_MODE == 'batch':
+            # The tick loop stops at once; its callbacks end as the pipeline drains
+            _, report = await asyncio.gather(
+                self.dispatcher.stop(),
+                self.delivery.drain(config.SCHEDULER_DRAIN_SECONDS)
+            )
+        else:
+            deferred = await self.dispatcher.stop(config.SCHEDULER_DRAIN_SECONDS)
+            await self.delivery.stop()
+            report = {
+                'drained': self._job_stats['executed'] - executed_before,
+                'deferred': deferred
+            }
+        
+        self._drain_stats = report
+        logger.info(
+            f"🚰 Drained {report['drained']} deliveries, "
+            f"deferred {report['deferred']} to the next start"
+        )
+        
+        if report['deferred']:
+            self.log_sink.log(
+                level="WARNING",
+                message=f"Shutdown deferred {report['deferred']} deliveries to the next start",
+                module="scheduler"
+            )
+        
+        return report
+    
     async def schedule_reminder(self, reminder_id: int, scheduled_time: datetime) -> bool:
         """Schedule a reminder for delivery."""
         try:
-            job_id = f"reminder_{reminder_id}"
+            # A copy held back for smoothing is now out of date
+            self.delivery.discard(reminder_id)
             
-            # Remove existing job if present
-            if self.scheduler.get_job(job_id):
-                self.scheduler.remove_job(job_id)
+            if not self._in_horizon(scheduled_time):
+                # Stays in the database until the refill job reaches it
+                self.dispatcher.cancel(reminder_id)
+                logger.debug(f"📅 Reminder {reminder_id} is beyond the horizon, deferring to refill")
+                return True
             
-            # Add new job
-            self.scheduler.add_job(
-                self._send_reminder,
-                'date',
-                run_date=scheduled_time,
-                args=[reminder_id],
-                id=job_id,
-                replace_existing=True,
-                misfire_grace_time=300  # 5 minutes
-            )
+            # Replaces any existing entry for this reminder
+            self.dispatcher.schedule(reminder_id, to_epoch(scheduled_time))
             
             self._job_stats['scheduled'] += 1
-            logger.info(f"📅 Scheduled reminder {reminder_id} for {scheduled_time}")
+            logger.debug(f"📅 Scheduled reminder {reminder_id} for {scheduled_time}")
             return True
             
         except Exception as e:
             logger.error(f"❌ Failed to schedule reminder {reminder_id}: {e}")
             
-            async with get_session() as session:
-                await SystemLogOperations.create_log(
-                    session=session,
-                    level="ERROR",
-                    message=f"Failed to schedule reminder: {str(e)}",
-                    module="scheduler",
-                    reminder_id=reminder_id
-                )
+            self.log_sink.log(
+                level="ERROR",
+                message=f"Failed to schedule reminder: {str(e)}",
+                module="scheduler",
+                reminder_id=reminder_id
+            )
             
             return False
     
     async def reschedule_reminder(self, reminder_id: int, new_time: datetime) -> bool:
         """Reschedule an existing reminder."""
         try:
-            job_id = f"reminder_{reminder_id}"
-            
-            job = self.scheduler.get_job(job_id)
-            if job:
-                job.reschedule('date', run_date=new_time)
+            if reminder_id in self.dispatcher and self._in_horizon(new_time):
+                self.dispatcher.schedule(reminder_id, to_epoch(new_time))
                 logger.info(f"📅 Rescheduled reminder {reminder_id} to {new_time}")
                 return True
             else:
@@ -153,10 +341,8 @@ class SchedulerService:
     async def cancel_reminder(self, reminder_id: int) -> bool:
         """Cancel a scheduled reminder."""
         try:
-            job_id = f"reminder_{reminder_id}"
-            
-            if self.scheduler.get_job(job_id):
-                self.scheduler.remove_job(job_id)
+            held = self.delivery.discard(reminder_id)
+            if self.dispatcher.cancel(reminder_id) or held:
                 logger.info(f"❌ Cancelled reminder {reminder_id}")
                 return True
             
@@ -166,143 +352,412 @@ class SchedulerService:
             logger.error(f"❌ Failed to cancel reminder {reminder_id}: {e}")
             return False
     
+    def _horizon_delta(self) -> timedelta:
+        """Get how far ahead reminders are held in memory."""
+        if config.SCHEDULER_HORIZON_MINUTES:
+            return timedelta(minutes=config.SCHEDULER_HORIZON_MINUTES)
+        return timedelta(days=365)  # Load reminders up to 1 year ahead
+    
+    def _in_horizon(self, scheduled_time: datetime) -> bool:
+        """Check whether a reminder belongs in the in-memory window."""
+        if self._horizon_end is None or not config.SCHEDULER_HORIZON_MINUTES:
+            return True
+        return to_epoch(scheduled_time) <= to_epoch(self._horizon_end)
+    
+    def _shard_filter(self, shards: Optional[Set[int]] = None) -> Optional[ShardFilter]:
+        """Get the database filter for owned (or the given) shards, None when unsharded."""
+        if self.leases is None:
+            return None
+        return self.leases.shard_filter(shards)
+    
+    async def _load_window(
+        self,
+        after: Optional[datetime],
+        until: datetime,
+        shards: Optional[Set[int]] = None
+    ) -> int:
+        """Stream unsent reminders in ``(after, until]`` into the dispatcher."""
+        count = 0
+        
+        async with get_session() as session:
+            async for rows in ReminderOperations.iter_pending_schedule(
+                session, after, until,
+                batch_size=config.SCHEDULER_LOAD_BATCH_SIZE,
+                shards=self._shard_filter(shards)
+            ):
+                for reminder_id, scheduled_time in rows:
+                    self.dispatcher.schedule(reminder_id, to_epoch(scheduled_time))
+                count += len(rows)
+        
+        self._job_stats['scheduled'] += count
+        return count
+    
     async def load_pending_reminders(self) -> int:
         """Load pending reminders from database and schedule them."""
         try:
-            count = 0
-            now = datetime.utcnow()
+            now = self.clock.utcnow()
             
-            async with get_session() as session:
-                # Get reminders scheduled for the future that haven't been sent
-                future_time = now + timedelta(days=365)  # Load reminders up to 1 year ahead
-                pending_reminders = await ReminderOperations.get_pending_reminders(
-                    session, future_time
-                )
-                
-                for reminder in pending_reminders:
-                    # Only schedule if time is in the future
-                    if reminder.scheduled_time > now:
-                        success = await self.schedule_reminder(
-                            reminder.id, 
-                            reminder.scheduled_time
-                        )
-                        if success:
-                            count += 1
-                    else:
-                        # Mark overdue reminders as missed
-                        logger.warning(f"Reminder {reminder.id} is overdue, marking as missed")
-                        await self._mark_reminder_missed(reminder.id)
-            
-            logger.info(f"📥 Loaded {count} pending reminders")
+            if self.leases:
+                # Rows created or changed after this are picked up by polling
+                self._changes_since = now
+                async with get_session() as session:
+                    self._last_seen_id = await ReminderOperations.get_max_id(session)
+            
+            # Publish the new horizon before reading so concurrent
+            # creations inside it are inserted directly
+            self._horizon_end = now + self._horizon_delta()
+            count = await self._restore_snapshot(now)
+            
+            await self._catch_up(now)
+            
+            if count is None:
+                count = await self._load_window(now, self._horizon_end)
+            
+            logger.info(f"📥 Loaded {count} pending reminders up to {self._horizon_end}")
             return count
             
         except Exception as e:
             logger.error(f"❌ Failed to load pending reminders: {e}")
             return 0
     
-    async def _send_reminder(self, reminder_id: int) -> None:
-        """Send reminder to user."""
+    def _snapshot_enabled(self) -> bool:
+        """Check whether the schedule is snapshotted (not with shards, whose owners move)."""
+        return bool(config.SCHEDULER_SNAPSHOT_PATH) and self.leases is None
+    
+    async def _write_snapshot(self) -> None:
+        """Dump the in-memory schedule for the next start."""
+        if not self._snapshot_enabled() or self._horizon_end is None:
+            return
+        
         try:
+            started = time.perf_counter()
+            taken_at = self.clock.time()
             async with get_session() as session:
-                reminder = await ReminderOperations.get_reminder_by_id(session, reminder_id)
-                
-                if not reminder:
-                    logger.warning(f"Reminder {reminder_id} not found")
-                    return
-                
-                if reminder.is_sent:
-                    logger.warning(f"Reminder {reminder_id} already sent")
-                    return
-                
-                # Format reminder message
-                message_text = self._format_reminder_message(reminder)
-                
-                # Send message to user
-                try:
-                    await self.bot.send_message(
-                        chat_id=reminder.user.telegram_id,
-                        text=message_text,
-                        parse_mode="Markdown"
-                    )
-                    
-                    # Mark as sent
-                    await ReminderOperations.mark_reminder_sent(session, reminder_id)
-                    
-                    logger.info(f"✅ Sent reminder {reminder_id} to user {reminder.user.telegram_id}")
-                    
-                    # Log success
-                    await SystemLogOperations.create_log(
-                        session=session,
-                        level="INFO",
-                        message=f"Reminder sent successfully",
-                        module="scheduler",
-                        user_id=reminder.user_id,
-                        reminder_id=reminder_id
-                    )
-                    
-                except Exception as send_error:
-                    logger.error(f"❌ Failed to send reminder {reminder_id}: {send_error}")
-                    
-                    # Log delivery failure
-                    await SystemLogOperations.create_log(
-                        session=session,
-                        level="ERROR",
-                        message=f"Failed to deliver reminder: {str(send_error)}",
-                        module="scheduler",
-                        user_id=reminder.user_id,
-                        reminder_id=reminder_id
-                    )
-                    
-                    # Retry logic could be implemented here
-                    
+                max_id = await ReminderOperations.get_max_id(session)
+            ids, fire_times = self.dispatcher.export()
+            
+            size = await asyncio.to_thread(
+                write_snapshot,
+                config.SCHEDULER_SNAPSHOT_PATH,
+                ids,
+                fire_times,
+                taken_at,
+                to_epoch(self._horizon_end),
+                max_id
+            )
+            
+            elapsed = time.perf_counter() - started
+            self._snapshot_stats['written'] += 1
+            self._snapshot_stats['last_write_ms'] = round(elapsed * 1000, 2)
+            logger.debug(f"💾 Snapshot of {len(ids)} reminders written ({size} bytes)")
         except Exception as e:
-            logger.error(f"❌ Error in _send_reminder for {reminder_id}: {e}")
+            logger.error(f"❌ Failed to write schedule snapshot: {e}")
     
-    def _format_reminder_message(self, reminder) -> str:
-        """Format reminder message for delivery."""
-        now = datetime.now()
-        time_str = now.strftime('%H:%M')
-        
-        message = f"🔔 **НАПОМИНАНИЕ!**\n\n"
-        message += f"📝 {reminder.title}\n\n"
-        
-        if reminder.description:
-            message += f"📄 {reminder.description}\n\n"
-        
-        message += f"⏰ {time_str}\n"
-        message += f"🆔 #{reminder.id}"
-        
-        # Add category if present
-        if reminder.category:
-            category_icons = {
-                'work': '💼',
-                'health': '🏥', 
-                'shopping': '🛒',
-                'family': '👨‍👩‍👧‍👦',
-                'personal': '🎯'
-            }
-            icon = category_icons.get(reminder.category.lower(), '📁')
-            message += f"\n{icon} {reminder.category.title()}"
+    async def _restore_snapshot(self, now: datetime) -> Optional[int]:
+        """
+        Rebuild the schedule from the last snapshot plus the database delta.
+        
+        Snapshot entries still in the future are loaded as they are; rows
+        created or modified since the snapshot are then rescheduled or
+        dropped, and the window past the snapshot's horizon is read from
+        SQL. Overdue reminders are left to catch-up.
+        
+        Returns:
+            Number of reminders loaded, or None if there is no usable snapshot
+        """
+        if not self._snapshot_enabled():
+            return None
+        
+        try:
+            snapshot = await asyncio.to_thread(read_snapshot, config.SCHEDULER_SNAPSHOT_PATH)
+        except (SnapshotError, OSError) as e:
+            logger.warning(f"⚠️ Ignoring schedule snapshot: {e}")
+            return None
+        if snapshot is None:
+            return None
+        
+        now_epoch = to_epoch(now)
+        horizon_epoch = to_epoch(self._horizon_end)
+        
+        with snapshot:
+            async with get_session() as session:
+                if await ReminderOperations.get_max_id(session) < snapshot.max_id:
+                    logger.warning("⚠️ Ignoring schedule snapshot newer than the database")
+                    return None
+            
+            taken_at, snapshot_horizon, max_id = snapshot.taken_at, snapshot.horizon_end, snapshot.max_id
+            count = 0
+            for reminder_id, fire_at in snapshot:
+                if now_epoch < fire_at <= horizon_epoch:
+                    self.dispatcher.schedule(reminder_id, fire_at)
+                    count += 1
+        
+        # Margin for writes that were in flight while the snapshot was taken
+        since = datetime.utcfromtimestamp(taken_at) - timedelta(minutes=1)
+        reconciled = 0
+        async with get_session() as session:
+            async for rows in ReminderOperations.iter_schedule_changes(
+                session, since, max_id, batch_size=config.SCHEDULER_LOAD_BATCH_SIZE
+            ):
+                for reminder_id, due_time, pending in rows:
+                    due_epoch = to_epoch(due_time)
+                    if not pending or due_epoch > horizon_epoch:
+                        self.dispatcher.cancel(reminder_id)
+                    elif due_epoch > now_epoch:
+                        self.dispatcher.schedule(reminder_id, due_epoch)
+                reconciled += len(rows)
+        
+        if snapshot_horizon < horizon_epoch:
+            count += await self._load_window(
+                datetime.utcfromtimestamp(max(snapshot_horizon, now_epoch)), self._horizon_end
+            )
+        
+        self._snapshot_stats['restored'] += count
+        self._snapshot_stats['reconciled'] += reconciled
+        logger.info(f"💾 Restored {count} reminders from snapshot, reconciled {reconciled} changed rows")
+        return count
+    
+    async def _catch_up(self, now: datetime, shards: Optional[Set[int]] = None) -> None:
+        """
+        Handle reminders that came due while the bot was down.
+        
+        Reminders inside the grace window are delivered through the
+        normal rate-governed path, spread out at ``CATCHUP_RAMP_PER_SECOND``;
+        older ones are marked missed in bulk.
+        """
+        grace_start = now - timedelta(minutes=config.CATCHUP_GRACE_MINUTES)
+        shard_filter = self._shard_filter(shards)
+        
+        late_ids = []
+        if config.CATCHUP_GRACE_MINUTES:
+            async with get_session() as session:
+                async for rows in ReminderOperations.iter_pending_schedule(
+                    session, grace_start, now,
+                    batch_size=config.SCHEDULER_LOAD_BATCH_SIZE,
+                    shards=shard_filter
+                ):
+                    late_ids.extend(row.id for row in rows)
+        
+        start = to_epoch(now)
+        for i, reminder_id in enumerate(late_ids):
+            self.dispatcher.schedule(reminder_id, start + i / config.CATCHUP_RAMP_PER_SECOND)
+        self._job_stats['caught_up'] += len(late_ids)
+        
+        async def mark_missed(session) -> Tuple[int, list, list]:
+            missed = await ReminderOperations.mark_overdue_missed(session, grace_start, shard_filter)
+            
+            # Recurring reminders skip the missed occurrences instead
+            overdue = await ReminderOperations.get_overdue_recurring(session, grace_start, shard_filter)
+            advances = [advance for advance in (advance_values(r, now) for r in overdue) if advance]
+            advanced_ids = {advance['id'] for advance in advances}
+            await ReminderOperations.record_delivery_failures(session, [
+                {
+                    'id': r.id,
+                    'retry_count': r.retry_count,
+                    'next_attempt_at': None,
+                    'failure_reason': "missed",
+                    'is_failed': True
+                }
+                for r in overdue if r.id not in advanced_ids
+            ], commit=False)
+            
+            # Each skipped occurrence counts as missed, like the one-off reminders above
+            await StatisticsOperations.add_reminders_missed(session, Counter(r.user_id for r in overdue), now)
+            await ReminderOperations.advance_recurring(session, advances)
+            return missed, overdue, advances
+        
+        missed, overdue, advances = await run_write(mark_missed)
+        self._job_stats['missed'] += missed + len(overdue)
+        
+        for advance in advances:
+            await self.schedule_reminder(advance['id'], advance['scheduled_time'])
+        
+        if late_ids or missed or overdue:
+            logger.warning(
+                f"⏪ Catch-up: delivering {len(late_ids)} late reminders, "
+                f"marked {missed + len(overdue)} older ones as missed"
+            )
+    
+    async def _on_shards_acquired(self, shards: Set[int]) -> None:
+        """Load reminders of shards this replica just took over."""
+        if self._horizon_end is None:
+            return  # The initial load will read every owned shard
+        
+        now = self.clock.utcnow()
+        await self._catch_up(now, shards)
+        count = await self._load_window(now, self._horizon_end, shards)
+        logger.info(f"📥 Loaded {count} reminders of shards {sorted(shards)}")
+    
+    async def _on_shards_lost(self, shards: Set[int]) -> None:
+        """Note shards now owned elsewhere; their queued entries are dropped at send time."""
+        logger.info(f"📤 Shards {sorted(shards)} are handled by another replica now")
+    
+    async def _poll_new_reminders(self) -> None:
+        """
+        Pick up reminders other replicas created, edited or deleted in
+        shards this replica owns.
+        
+        Rows created after the last poll or modified since then are
+        reconciled the way a snapshot restore does; the ``updated_at``
+        watermark is read back one lease TTL to allow for clock skew
+        between replicas and writes still in flight. Reminders being
+        delivered right now are left to the delivery outcome.
+        """
+        if self._horizon_end is None or self._changes_since is None:
+            return
+        
+        polled_at = self.clock.utcnow()
+        since = self._changes_since - timedelta(seconds=self.leases.ttl)
+        now_epoch = to_epoch(polled_at)
+        horizon_epoch = to_epoch(self._horizon_end)
+        
+        async with get_session() as session:
+            newest_id = await ReminderOperations.get_max_id(session)
+            async for rows in ReminderOperations.iter_schedule_changes(
+                session, since, self._last_seen_id,
+                batch_size=config.SCHEDULER_LOAD_BATCH_SIZE,
+                shards=self._shard_filter()
+            ):
+                for reminder_id, due_time, pending in rows:
+                    if reminder_id in self._delivering:
+                        continue
+                    due_epoch = to_epoch(due_time)
+                    if not pending or due_epoch > horizon_epoch:
+                        self.dispatcher.cancel(reminder_id)
+                    elif reminder_id not in self.dispatcher:
+                        self.dispatcher.schedule(reminder_id, due_epoch)
+                        self._job_stats['scheduled'] += 1
+                    elif due_epoch > now_epoch:
+                        self.dispatcher.schedule(reminder_id, due_epoch)
         
-        return message
+        self._last_seen_id = max(self._last_seen_id, newest_id)
+        self._changes_since = polled_at
     
-    async def _mark_reminder_missed(self, reminder_id: int) -> None:
-        """Mark reminder as missed (overdue)."""
+    async def _refill_horizon(self) -> None:
+        """Advance the in-memory window and load reminders that entered it."""
+        try:
+            previous_end = self._horizon_end
+            if previous_end is None:
+                return  # Initial load hasn't run yet
+            
+            self._horizon_end = self.clock.utcnow() + self._horizon_delta()
+            count = await self._load_window(previous_end, self._horizon_end)
+            
+            if count:
+                logger.info(f"📥 Refilled {count} reminders up to {self._horizon_end}")
+            
+        except Exception as e:
+            logger.error(f"❌ Failed to refill scheduler horizon: {e}")
+    
+    async def _dispatch_due(self, reminder_ids: List[int]) -> None:
+        """Deliver all reminders that came due in one tick."""
+        started = time.perf_counter()
+        
+        self._delivering.update(reminder_ids)
+        try:
+            if config.DELIVERY_MODE == 'batch':
+                await self.delivery.deliver(reminder_ids)
+            else:
+                await asyncio.gather(*(self._send_reminder(reminder_id) for reminder_id in reminder_ids))
+        finally:
+            self._delivering.difference_update(reminder_ids)
+        
+        elapsed = time.perf_counter() - started
+        self._job_stats['executed'] += len(reminder_ids)
+        self._tick_stats['ticks'] += 1
+        self._tick_stats['reminders'] += len(reminder_ids)
+        self._tick_stats['seconds'] += elapsed
+        self._tick_stats['last_tick_ms'] = round(elapsed * 1000, 2)
+    
+    async def _send_reminder(self, reminder_id: int) -> None:
+        """Send reminder to user."""
         try:
             async with get_session() as session:
-                # Log as missed
-                await SystemLogOperations.create_log(
-                    session=session,
-                    level="WARNING",
-                    message=f"Reminder missed (overdue)",
+                records = await ReminderOperations.get_delivery_records(session, [reminder_id])
+            
+            if not records:
+                logger.warning(f"Reminder {reminder_id} not found, already sent or dead-lettered")
+                return
+            reminder = records[0]
+            
+            if self.leases and not self.leases.owns(reminder.user_id):
+                return  # Another replica owns this user's shard
+            
+            due = reminder.next_attempt_at or reminder.scheduled_time
+            if due > self.clock.utcnow() + timedelta(seconds=self.dispatcher.lead_seconds):
+                # Moved to a later time since it was scheduled
+                await self.schedule_reminder(reminder_id, due)
+                return
+            
+            # Use the pre-rendered message when there is one
+            payload = self.delivery.message_payload(reminder)
+            
+            # Send message to user
+            self.metrics.record('lateness', max(self.clock.time() - to_epoch(due), 0.0))
+            started = self.clock.monotonic()
+            try:
+                await self.bot.send_message(
+                    chat_id=reminder.chat_id,
+                    **payload
+                )
+            except Exception as send_error:
+                self.metrics.record('send', self.clock.monotonic() - started)
+                logger.error(f"❌ Failed to send reminder {reminder_id}: {send_error}")
+                
+                next_attempt = self.retry_policy.next_attempt(reminder.retry_count, send_error)
+                await run_write(ReminderOperations.record_delivery_failures, [{
+                    'id': reminder_id,
+                    'retry_count': reminder.retry_count + 1,
+                    'next_attempt_at': next_attempt,
+                    'failure_reason': str(send_error)[:1000],
+                    'is_failed': next_attempt is None
+                }])
+                
+                # Log delivery failure
+                self.log_sink.log(
+                    level="ERROR",
+                    message=f"Failed to deliver reminder: {str(send_error)}",
                     module="scheduler",
+                    user_id=reminder.user_id,
                     reminder_id=reminder_id
                 )
                 
-                # Update statistics could be added here
+                # Retries come back through the dispatcher
+                if next_attempt:
+                    await self.schedule_reminder(reminder_id, next_attempt)
+                return
+            
+            self.metrics.record('send', self.clock.monotonic() - started)
+            
+            # Move recurring reminders to their next occurrence, mark the rest sent
+            advance = advance_values(reminder, self.clock.utcnow())
+            if advance:
+                async def record_advance(session) -> None:
+                    await ReminderOperations.advance_recurring(session, [advance], commit=False)
+                    await ReminderOperations.mark_reminders_sent(session, [], [reminder.user_id])
                 
+                await run_write(record_advance)
+                await self.schedule_reminder(reminder_id, advance['scheduled_time'])
+            else:
+                await run_write(ReminderOperations.mark_reminder_sent, reminder_id)
+            
+            logger.info(f"✅ Sent reminder {reminder_id} to user {reminder.chat_id}")
+            
+            # Log success
+            self.log_sink.log(
+                level="INFO",
+                message="Reminder sent successfully",
+                module="scheduler",
+                user_id=reminder.user_id,
+                reminder_id=reminder_id
+            )
+                    
         except Exception as e:
-            logger.error(f"❌ Error marking reminder {reminder_id} as missed: {e}")
+            logger.error(f"❌ Error in _send_reminder for {reminder_id}: {e}")
+    
+    def _format_reminder_message(self, reminder) -> str:
+        """Format reminder message for delivery."""
+        return format_reminder_notification(reminder)
     
     def _job_executed_listener(self, event) -> None:
         """Handle scheduler events."""
@@ -321,10 +776,11 @@ class SchedulerService:
         """Clean up old completed jobs and data."""
         try:
             # Remove old system logs
-            async with get_session() as session:
-                deleted_logs = await SystemLogOperations.cleanup_old_logs(session, days_to_keep=30)
-                if deleted_logs > 0:
-                    logger.info(f"🧹 Cleaned up {deleted_logs} old log entries")
+            deleted_logs = await run_write(SystemLogOperations.cleanup_old_logs, days_to_keep=30)
+            if deleted_logs > 0:
+                logger.info(f"🧹 Cleaned up {deleted_logs} old log entries")
+            
+            await run_write(MetricsOperations.cleanup_old_hourly_stats, days_to_keep=30)
             
             # Job cleanup is automatic with MemoryJobStore
             logger.debug("🧹 Cleanup job completed")
@@ -332,31 +788,64 @@ class SchedulerService:
         except Exception as e:
             logger.error(f"❌ Error in cleanup job: {e}")
     
+    async def _flush_metrics(self) -> None:
+        """Persist hourly delivery histograms and log current percentiles."""
+        try:
+            await self.metrics.flush()
+        except Exception as e:
+            logger.error(f"❌ Failed to persist delivery metrics: {e}")
+        
+        for name, summary in self.metrics.get_stats().items():
+            if summary['count']:
+                scheduler_perf_logger.log_histogram(f"delivery_{name}_seconds", summary)
+    
     def get_stats(self) -> Dict[str, Any]:
         """Get scheduler statistics."""
-        active_jobs = len(self.scheduler.get_jobs())
-        
         return {
-            'running': self.scheduler.running,
-            'active_jobs': active_jobs,
+            'running': self.scheduler.running and self.dispatcher.running,
+            'active_jobs': len(self.dispatcher),
             'stats': self._job_stats.copy(),
+            'dispatcher': self.dispatcher.get_stats(),
+            'horizon_end': self._horizon_end,
+            'metrics': self.metrics.get_stats(),
+            'shards': self.leases.get_stats() if self.leases else None,
+            'snapshot': self._snapshot_stats,
+            'drain': self._drain_stats,
+            'log_sink': self.log_sink.get_stats(),
+            'database': {
+                'profile': config.SQLITE_PROFILE,
+                'mode': config.SQLITE_ENGINE_MODE,
+                **(self.checkpointer.get_stats() if self.checkpointer else {}),
+                **({'writer': db_writer.get_stats()} if db_writer else {})
+            },
+            'delivery': {
+                **self._tick_stats,
+                'per_second': (
+                    self._tick_stats['reminders'] / self._tick_stats['seconds']
+                    if self._tick_stats['seconds'] else 0.0
+                ),
+                'pipeline': self.delivery.get_stats()
+            },
+            'outbound': (
+                send_governor.send_governor.get_stats()
+                if send_governor.send_governor else None
+            ),
             'timezone': str(self.scheduler.timezone)
         }
     
     def get_job_info(self, reminder_id: int) -> Optional[Dict[str, Any]]:
         """Get information about a specific job."""
-        job_id = f"reminder_{reminder_id}"
-        job = self.scheduler.get_job(job_id)
+        fire_at = self.dispatcher.next_fire_time(reminder_id)
         
-        if not job:
+        if fire_at is None:
             return None
         
         return {
-            'id': job.id,
-            'next_run': job.next_run_time,
-            'trigger': str(job.trigger),
-            'args': job.args,
-            'kwargs': job.kwargs
+            'id': f"reminder_{reminder_id}",
+            'next_run': datetime.fromtimestamp(fire_at, tz=timezone.utc),
+            'trigger': f"wheel[tick={self.dispatcher.tick_seconds}s]",
+            'args': [reminder_id],
+            'kwargs': {}
         }
 
 
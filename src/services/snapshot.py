@@ -0,0 +1,153 @@
+"""
+Schedule Snapshot
+
+Compact binary dump of the in-memory schedule, so a restart only has
+to reconcile what changed in the database since it was written.
+
+Records hold the reminder ID and fire time only. Priority is not part
+of the schedule: the dispatcher orders nothing by it, and delivery
+reads the current priority with the rest of the reminder in its batch
+query, so a stored copy could only go stale after an edit.
+"""
+
+import logging
+import mmap
+import os
+import struct
+import sys
+import zlib
+from array import array
+from typing import Iterator, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"RMDSCHED"
+VERSION = 1
+
+# magic, version, taken_at, horizon_end, max_id, count, crc32 of the body
+HEADER = struct.Struct("<8sIddqII4x")
+
+
+class SnapshotError(Exception):
+    """Raised for snapshot files that cannot be trusted."""
+    pass
+
+
+class ScheduleSnapshot:
+    """
+    Memory-mapped snapshot.
+
+    The body is two little-endian arrays of ``count`` entries each:
+    reminder IDs (int64) followed by their fire times (float64 epoch
+    seconds). Both are read straight from the mapping without copying.
+    """
+
+    __slots__ = ('taken_at', 'horizon_end', 'max_id', 'ids', 'fire_times', '_mmap', '_file')
+
+    def __init__(self, path: str):
+        """Map and validate a snapshot file."""
+        self._file = open(path, 'rb')
+        self._mmap = None
+        self.ids = self.fire_times = None
+        try:
+            size = os.fstat(self._file.fileno()).st_size
+            if size < HEADER.size:
+                raise SnapshotError("file is shorter than the header")
+
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, version, taken_at, horizon_end, max_id, count, crc = HEADER.unpack_from(self._mmap)
+            if magic != MAGIC or version != VERSION:
+                raise SnapshotError("unknown format")
+            if size != HEADER.size + count * 16:
+                raise SnapshotError("size does not match the record count")
+
+            body = memoryview(self._mmap)[HEADER.size:]
+            try:
+                if zlib.crc32(body) != crc:
+                    raise SnapshotError("checksum mismatch")
+            finally:
+                body.release()
+
+            self.taken_at = taken_at
+            self.horizon_end = horizon_end
+            self.max_id = max_id
+
+            ids_end = HEADER.size + count * 8
+            if sys.byteorder == 'little':
+                self.ids = memoryview(self._mmap)[HEADER.size:ids_end].cast('q')
+                self.fire_times = memoryview(self._mmap)[ids_end:].cast('d')
+            else:
+                self.ids = array('q', self._mmap[HEADER.size:ids_end])
+                self.fire_times = array('d', self._mmap[ids_end:])
+                self.ids.byteswap()
+                self.fire_times.byteswap()
+        except Exception:
+            self.close()
+            raise
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __iter__(self) -> Iterator[Tuple[int, float]]:
+        return zip(self.ids, self.fire_times)
+
+    def __enter__(self) -> "ScheduleSnapshot":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Release the views and unmap the file."""
+        for view in (self.ids, self.fire_times):
+            if isinstance(view, memoryview):
+                view.release()
+        self.ids = self.fire_times = None
+
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        self._file.close()
+
+
+def write_snapshot(
+    path: str,
+    ids: array,
+    fire_times: array,
+    taken_at: float,
+    horizon_end: float,
+    max_id: int,
+) -> int:
+    """
+    Atomically replace the snapshot at ``path``.
+
+    Returns:
+        Number of bytes written
+    """
+    if len(ids) != len(fire_times):
+        raise ValueError("ids and fire_times must have the same length")
+
+    ids, fire_times = array('q', ids), array('d', fire_times)
+    if sys.byteorder != 'little':
+        ids.byteswap()
+        fire_times.byteswap()
+
+    body = ids.tobytes() + fire_times.tobytes()
+    header = HEADER.pack(MAGIC, VERSION, taken_at, horizon_end, max_id, len(ids), zlib.crc32(body))
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(header)
+        f.write(body)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+    return len(header) + len(body)
+
+
+def read_snapshot(path: str) -> Optional[ScheduleSnapshot]:
+    """Open the snapshot at ``path``, or return None if there is none."""
+    if not os.path.exists(path):
+        return None
+    return ScheduleSnapshot(path)
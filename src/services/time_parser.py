@@ -11,6 +11,7 @@ from typing import Dict, List, Optional, Tuple
 from zoneinfo import ZoneInfo
 
 from src.config import config
+from src.utils.clock import Clock, get_clock
 
 
 class TimeParseError(Exception):
@@ -21,11 +22,16 @@ class TimeParseError(Exception):
 class EnhancedTimeParser:
     """Advanced time parser with natural language support."""
     
-    def __init__(self):
-        """Initialize the time parser."""
+    def __init__(self, clock: Optional[Clock] = None):
+        """Initialize the time parser (``clock`` defaults to the process-wide one)."""
         self.timezone = ZoneInfo(config.SCHEDULER_TIMEZONE)
+        self.clock = clock
         self._compile_patterns()
     
+    def _now(self) -> datetime:
+        """Get the current time in the scheduler timezone."""
+        return (self.clock or get_clock()).now(self.timezone)
+    
     def _compile_patterns(self) -> None:
         """Compile regex patterns for time parsing."""
         # Relative time patterns
@@ -85,7 +91,7 @@ class EnhancedTimeParser:
             TimeParseError: If parsing fails
         """
         time_str = time_str.lower().strip()
-        now = datetime.now(self.timezone)
+        now = self._now()
         
         # Try relative time patterns
         result = self._parse_relative(time_str, now)
@@ -238,7 +244,7 @@ class EnhancedTimeParser:
         Returns:
             Tuple of (is_valid, error_message)
         """
-        now = datetime.now(self.timezone)
+        now = self._now()
         
         # Check if time is in the future
         if parsed_time <= now:
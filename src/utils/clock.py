@@ -0,0 +1,178 @@
+"""
+Clock Module
+
+Time source for the scheduler, parser and formatters: the system clock
+in production, or a virtual clock that tests and simulations advance.
+"""
+
+import asyncio
+import heapq
+import itertools
+import time
+from datetime import datetime, timezone, tzinfo
+from typing import Any, Callable, List, Optional, Tuple, Union
+
+
+class Clock:
+    """System clock; the interface every clock implements."""
+
+    def time(self) -> float:
+        """Get the current time in epoch seconds."""
+        return time.time()
+
+    def monotonic(self) -> float:
+        """Get a monotonic time in seconds for measuring intervals."""
+        return time.monotonic()
+
+    def utcnow(self) -> datetime:
+        """Get the current time as naive UTC (the database convention)."""
+        return datetime.utcnow()
+
+    def now(self, tz: Optional[tzinfo] = None) -> datetime:
+        """Get the current time in ``tz`` (naive local time without one)."""
+        return datetime.now(tz)
+
+    async def sleep(self, seconds: float) -> None:
+        """Wait for ``seconds``."""
+        await asyncio.sleep(seconds)
+
+    def call_later(self, delay: float, callback: Callable[..., Any], *args: Any) -> Any:
+        """Run ``callback(*args)`` after ``delay`` seconds; the result has ``cancel()``."""
+        return asyncio.get_running_loop().call_later(delay, callback, *args)
+
+
+class SystemClock(Clock):
+    """Operating system time (the default)."""
+    pass
+
+
+class VirtualTimer:
+    """Pending callback or sleeper on a virtual clock."""
+
+    __slots__ = ('when', 'callback', 'args', 'cancelled')
+
+    def __init__(self, when: float, callback: Callable[..., Any], args: Tuple[Any, ...]):
+        """Initialize timer."""
+        self.when = when
+        self.callback = callback
+        self.args = args
+        self.cancelled = False
+
+    def cancel(self) -> None:
+        """Prevent the timer from firing."""
+        self.cancelled = True
+
+
+class VirtualClock(Clock):
+    """
+    Clock that only moves when advanced.
+
+    Sleepers and ``call_later`` callbacks are kept in a heap and run in
+    time order by ``advance``, which yields to the event loop after each
+    one so woken tasks can schedule their next wait. Work that blocks
+    on real I/O still takes real time; a simulation should await it
+    (or advance in small steps) before moving on.
+    """
+
+    def __init__(self, start: Union[float, datetime, None] = None, yields: int = 3):
+        """Initialize clock at ``start`` (epoch seconds or naive UTC, default now)."""
+        if start is None:
+            start = time.time()
+        elif isinstance(start, datetime):
+            if start.tzinfo is None:
+                start = start.replace(tzinfo=timezone.utc)
+            start = start.timestamp()
+
+        self._now = float(start)
+        self.yields = yields
+        self._timers: List[Tuple[float, int, VirtualTimer]] = []
+        self._sequence = itertools.count()
+
+    def time(self) -> float:
+        """Get the virtual time in epoch seconds."""
+        return self._now
+
+    def monotonic(self) -> float:
+        """Get the virtual time; it only moves forward, so it measures intervals too."""
+        return self._now
+
+    def utcnow(self) -> datetime:
+        """Get the virtual time as naive UTC."""
+        return datetime.utcfromtimestamp(self._now)
+
+    def now(self, tz: Optional[tzinfo] = None) -> datetime:
+        """Get the virtual time in ``tz`` (naive local time without one)."""
+        return datetime.fromtimestamp(self._now, tz)
+
+    def call_later(self, delay: float, callback: Callable[..., Any], *args: Any) -> VirtualTimer:
+        """Run ``callback(*args)`` once the clock has been advanced by ``delay`` seconds."""
+        timer = VirtualTimer(self._now + max(delay, 0.0), callback, args)
+        heapq.heappush(self._timers, (timer.when, next(self._sequence), timer))
+        return timer
+
+    async def sleep(self, seconds: float) -> None:
+        """Wait until the clock has been advanced by ``seconds``."""
+        future = asyncio.get_running_loop().create_future()
+        timer = self.call_later(seconds, self._wake, future)
+        try:
+            await future
+        finally:
+            timer.cancel()
+
+    @staticmethod
+    def _wake(future: asyncio.Future) -> None:
+        """Resume a sleeper unless it was cancelled meanwhile."""
+        if not future.done():
+            future.set_result(None)
+
+    @property
+    def pending(self) -> int:
+        """Number of timers and sleepers waiting."""
+        return sum(1 for _, _, timer in self._timers if not timer.cancelled)
+
+    async def advance(self, seconds: float) -> int:
+        """
+        Move time forward, firing everything that comes due on the way.
+
+        Returns:
+            Number of timers fired
+        """
+        target = self._now + seconds
+        fired = 0
+
+        # Let tasks started since the last call register their waits
+        for _ in range(self.yields):
+            await asyncio.sleep(0)
+
+        while self._timers and self._timers[0][0] <= target:
+            when, _, timer = heapq.heappop(self._timers)
+            if timer.cancelled:
+                continue
+
+            self._now = max(self._now, when)
+            timer.callback(*timer.args)
+            fired += 1
+            for _ in range(self.yields):
+                await asyncio.sleep(0)
+
+        self._now = max(self._now, target)
+        return fired
+
+
+_clock: Clock = SystemClock()
+
+
+def get_clock() -> Clock:
+    """Get the process-wide clock."""
+    return _clock
+
+
+def set_clock(clock: Clock) -> None:
+    """Replace the process-wide clock (set it before building services)."""
+    global _clock
+    _clock = clock
+
+
+def utcnow() -> datetime:
+    """Get the process-wide clock's time as naive UTC (usable as a column default)."""
+    return _clock.utcnow()
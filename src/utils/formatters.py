@@ -5,11 +5,21 @@ Text formatting utilities for consistent message display
 with Markdown support and responsive layouts.
 """
 
+import json
 from datetime import datetime, timedelta
 from typing import List, Optional, Dict, Any
 from zoneinfo import ZoneInfo
 
 from src.database.models import Reminder, User, UserStatistics
+from src.utils.clock import get_clock
+
+NOTIFICATION_CATEGORY_ICONS = {
+    'work': '💼',
+    'health': '🏥',
+    'shopping': '🛒',
+    'family': '👨‍👩‍👧‍👦',
+    'personal': '🎯'
+}
 
 
 def format_datetime(dt: datetime, timezone: str = "UTC") -> str:
@@ -25,7 +35,7 @@ def format_datetime(dt: datetime, timezone: str = "UTC") -> str:
         except:
             pass  # Fallback to UTC
     
-    now = datetime.now(dt.tzinfo)
+    now = get_clock().now(dt.tzinfo)
     today = now.date()
     tomorrow = today + timedelta(days=1)
     yesterday = today - timedelta(days=1)
@@ -48,7 +58,7 @@ def format_datetime(dt: datetime, timezone: str = "UTC") -> str:
 def format_time_until(target_time: datetime, now: Optional[datetime] = None) -> str:
     """Format time remaining until target."""
     if now is None:
-        now = datetime.utcnow()
+        now = get_clock().utcnow()
     
     if target_time.tzinfo is None:
         target_time = target_time.replace(tzinfo=ZoneInfo("UTC"))
@@ -191,8 +201,8 @@ def format_reminder_list(
     return message
 
 
-def format_user_statistics(stats: UserStatistics) -> str:
-    """Format user statistics."""
+def format_user_statistics(stats: UserStatistics, reminders: Optional[Dict[str, Any]] = None) -> str:
+    """Format user statistics (and current reminder counts, if given)."""
     message = "📊 **Ваша статистика**\n\n"
     
     # Main metrics
@@ -200,6 +210,12 @@ def format_user_statistics(stats: UserStatistics) -> str:
     message += f"✅ **Отправлено:** {stats.total_reminders_sent}\n"
     message += f"❌ **Пропущено:** {stats.total_reminders_missed}\n"
     
+    if reminders:
+        message += f"⏳ **Ожидают отправки:** {reminders['pending']}"
+        if reminders['overdue']:
+            message += f" (просрочено: {reminders['overdue']})"
+        message += "\n"
+    
     # Completion rate
     completion_rate = stats.completion_rate
     if completion_rate >= 90:
@@ -340,6 +356,62 @@ def format_help_message(section: str = "main") -> str:
         )
 
 
+def format_reminder_notification(reminder: Reminder, at: Optional[datetime] = None) -> str:
+    """Format the message sent when a reminder fires (``at`` defaults to now)."""
+    time_str = (at or get_clock().now()).strftime('%H:%M')
+    
+    message = "🔔 **НАПОМИНАНИЕ!**\n\n"
+    message += f"📝 {reminder.title}\n\n"
+    
+    if reminder.description:
+        message += f"📄 {reminder.description}\n\n"
+    
+    message += f"⏰ {time_str}\n"
+    message += f"🆔 #{reminder.id}"
+    
+    # Add category if present
+    if reminder.category:
+        icon = NOTIFICATION_CATEGORY_ICONS.get(reminder.category.lower(), '📁')
+        message += f"\n{icon} {reminder.category.title()}"
+    
+    return message
+
+
+def format_reminder_digest(reminders: List[Reminder], at: Optional[datetime] = None) -> str:
+    """Format one message for several reminders of the same user."""
+    time_str = (at or get_clock().now()).strftime('%H:%M')
+    
+    message = f"🔔 **НАПОМИНАНИЯ ({len(reminders)})**\n\n"
+    for reminder in reminders:
+        message += f"📝 {reminder.title} (#{reminder.id})\n"
+        if reminder.description:
+            message += f"📄 {reminder.description}\n"
+    
+    message += f"\n⏰ {time_str}"
+    return message
+
+
+def render_reminder_payload(reminder: Reminder, scheduled_time: Optional[datetime] = None) -> str:
+    """
+    Render ``send_message`` arguments for a reminder ahead of time.
+    
+    The time shown is the scheduled time (or ``scheduled_time``) in the
+    server's local zone, which is what rendering at fire time would print.
+    """
+    scheduled = scheduled_time or reminder.scheduled_time
+    if scheduled.tzinfo is None:
+        scheduled = scheduled.replace(tzinfo=ZoneInfo("UTC"))
+    
+    return json.dumps(
+        {
+            'text': format_reminder_notification(reminder, scheduled.astimezone()),
+            'parse_mode': "Markdown",
+        },
+        ensure_ascii=False,
+        separators=(',', ':')
+    )
+
+
 def escape_markdown(text: str) -> str:
     """Escape special Markdown characters."""
     escape_chars = ['_', '*', '[', ']', '(', ')', '~', '`', '>', '#', '+', '-', '=', '|', '{', '}', '.', '!']
@@ -0,0 +1,44 @@
+"""
+Test configuration.
+
+Settings are read from the environment when ``src.config`` is first
+imported, so they are pinned here before any test module imports src:
+a scratch SQLite file, no log file, no snapshot and direct statistics
+writes.
+"""
+
+import os
+import sys
+import tempfile
+
+import pytest_asyncio
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+_scratch = tempfile.mkdtemp(prefix="reminder-tests-")
+os.environ.setdefault('BOT_TOKEN', '123456:test')
+os.environ['DATABASE_PATH'] = os.path.join(_scratch, "test.db")
+os.environ['LOG_FILE'] = ''
+os.environ['SCHEDULER_SNAPSHOT_PATH'] = ''
+os.environ['SQLITE_ENGINE_MODE'] = 'shared'
+os.environ['STATS_WRITE_BEHIND'] = 'false'
+
+
+@pytest_asyncio.fixture
+async def database():
+    """Empty database for one test; engines are disposed with the test's event loop."""
+    from src.database import operations
+    from src.database.models import Base
+
+    await operations.init_database()
+    yield operations
+
+    async with operations.writer_engine.begin() as conn:
+        for table in reversed(Base.metadata.sorted_tables):
+            await conn.execute(table.delete())
+    operations.user_stats_cache.clear()
+    await operations.engine.dispose()
+    if operations.writer_engine is not operations.engine:
+        await operations.writer_engine.dispose()
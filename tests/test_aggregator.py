@@ -0,0 +1,100 @@
+"""Tests for write-behind statistics counters."""
+
+from datetime import datetime
+
+import pytest
+from sqlalchemy import select
+
+from src.config import config
+from src.database.aggregator import CounterAggregator
+from src.database.models import Reminder, UserStatistics
+from src.database.operations import (
+    StatisticsOperations,
+    UserOperations,
+    get_session,
+    stats_aggregator,
+)
+
+
+async def create_user(telegram_id: int = 1000) -> int:
+    async with get_session() as session:
+        user = await UserOperations.create_or_update_user(
+            session, telegram_id, first_name="Test"
+        )
+        return user.id
+
+
+async def get_statistics(user_id: int) -> UserStatistics:
+    async with get_session() as session:
+        return await session.scalar(
+            select(UserStatistics).where(UserStatistics.user_id == user_id)
+        )
+
+
+def make_aggregator() -> CounterAggregator:
+    return CounterAggregator(
+        UserStatistics.__table__,
+        get_session,
+        counters=("total_reminders_created", "total_reminders_sent"),
+        timestamps=("last_updated",),
+        flush_interval=60.0,
+    )
+
+
+@pytest.mark.asyncio
+async def test_additions_are_summed_and_written_together(database):
+    first, second = await create_user(), await create_user(telegram_id=2000)
+    aggregator = make_aggregator()
+    early, late = datetime(2030, 1, 1, 9), datetime(2030, 1, 1, 10)
+
+    aggregator.add(first, total_reminders_sent=2, last_updated=late)
+    aggregator.add(first, total_reminders_sent=3, last_updated=early)
+    aggregator.add(second, total_reminders_created=1)
+    assert aggregator.pending(first) == {"total_reminders_sent": 5, "last_updated": late}
+    assert (await get_statistics(first)).total_reminders_sent == 0
+
+    assert await aggregator.flush() == 2
+    statistics = await get_statistics(first)
+    assert statistics.total_reminders_sent == 5
+    assert statistics.last_updated == late
+    assert (await get_statistics(second)).total_reminders_created == 1
+    assert aggregator.pending(first) == {}
+    await aggregator.stop()
+
+
+@pytest.mark.asyncio
+async def test_overlay_adds_what_is_pending(database):
+    user_id = await create_user()
+    aggregator = make_aggregator()
+    aggregator.add(user_id, total_reminders_sent=4)
+
+    statistics = await get_statistics(user_id)
+    aggregator.overlay(statistics)
+
+    assert statistics.total_reminders_sent == 4
+    await aggregator.stop()
+    assert (await get_statistics(user_id)).total_reminders_sent == 4
+
+
+@pytest.mark.asyncio
+async def test_counts_wait_for_the_commit(database, monkeypatch):
+    monkeypatch.setattr(config, "STATS_WRITE_BEHIND", True)
+    user_id = await create_user()
+
+    async with get_session() as session:
+        session.add(Reminder(user_id=user_id, title="Call mom", scheduled_time=datetime(2030, 1, 1)))
+        await session.flush()
+        await StatisticsOperations.increment_reminders_created(session, user_id, commit=False)
+        assert stats_aggregator.pending(user_id) == {}
+
+        await session.rollback()
+    assert stats_aggregator.pending(user_id) == {}
+
+    async with get_session() as session:
+        session.add(Reminder(user_id=user_id, title="Call mom", scheduled_time=datetime(2030, 1, 1)))
+        await StatisticsOperations.increment_reminders_created(session, user_id, commit=False)
+        await session.commit()
+    assert stats_aggregator.pending(user_id)["total_reminders_created"] == 1
+
+    await stats_aggregator.stop()
+    assert (await get_statistics(user_id)).total_reminders_created == 1
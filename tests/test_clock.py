@@ -0,0 +1,75 @@
+"""Tests for the virtual clock."""
+
+import asyncio
+from datetime import datetime
+
+import pytest
+
+from src.utils.clock import VirtualClock
+
+
+def test_starts_at_the_given_time():
+    clock = VirtualClock(datetime(2024, 1, 1, 12))
+
+    assert clock.utcnow() == datetime(2024, 1, 1, 12)
+    assert clock.time() == clock.monotonic() == 1704110400.0
+
+
+@pytest.mark.asyncio
+async def test_advance_fires_timers_in_time_order():
+    clock = VirtualClock(0.0)
+    fired = []
+    clock.call_later(3, fired.append, "c")
+    clock.call_later(1, fired.append, "a")
+    clock.call_later(2, fired.append, "b")
+    clock.call_later(10, fired.append, "later")
+
+    assert await clock.advance(5) == 3
+    assert fired == ["a", "b", "c"]
+    assert clock.time() == 5.0
+    assert clock.pending == 1
+
+
+@pytest.mark.asyncio
+async def test_cancelled_timers_do_not_fire():
+    clock = VirtualClock(0.0)
+    fired = []
+    clock.call_later(1, fired.append, "a").cancel()
+
+    assert await clock.advance(2) == 0
+    assert fired == []
+
+
+@pytest.mark.asyncio
+async def test_sleepers_wake_at_their_virtual_time():
+    clock = VirtualClock(0.0)
+    woken = []
+
+    async def sleeper(seconds):
+        await clock.sleep(seconds)
+        woken.append(clock.time())
+
+    tasks = [asyncio.create_task(sleeper(seconds)) for seconds in (30, 10, 20)]
+    await clock.advance(25)
+    assert woken == [10.0, 20.0]
+
+    await clock.advance(10)
+    assert woken == [10.0, 20.0, 30.0]
+    await asyncio.gather(*tasks)
+
+
+@pytest.mark.asyncio
+async def test_a_sleeper_can_wait_again_within_one_advance():
+    clock = VirtualClock(0.0)
+    ticks = []
+
+    async def ticker():
+        while True:
+            await clock.sleep(1)
+            ticks.append(clock.time())
+
+    task = asyncio.create_task(ticker())
+    await clock.advance(3)
+    task.cancel()
+
+    assert ticks == [1.0, 2.0, 3.0]
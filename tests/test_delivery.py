@@ -0,0 +1,157 @@
+"""Tests for the delivery pipeline and its priority lanes."""
+
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import insert, select
+
+from src.database.models import Reminder
+from src.database.operations import UserOperations, get_session
+from src.services.delivery import DeliveryPipeline, LaneQueue
+from src.services.retry_policy import RetryPolicy
+
+
+class StubBot:
+    """Records sent texts; sends take ``delay`` seconds."""
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.sent = []
+
+    async def send_message(self, chat_id, text, **kwargs):
+        await asyncio.sleep(self.delay)
+        self.sent.append(text)
+
+
+async def seed(priorities, telegram_id: int = 1000):
+    """Create a user with one reminder per priority, all just due; return their IDs."""
+    due = datetime.utcnow() - timedelta(seconds=1)
+    async with get_session() as session:
+        user = await UserOperations.create_or_update_user(
+            session, telegram_id, first_name="Test"
+        )
+        ids = await session.scalars(
+            insert(Reminder).returning(Reminder.id),
+            [
+                {
+                    "user_id": user.id,
+                    "title": f"Reminder {i}",
+                    "scheduled_time": due,
+                    "priority": priority,
+                }
+                for i, priority in enumerate(priorities)
+            ],
+        )
+        ids = list(ids)
+        await session.commit()
+    return ids
+
+
+async def sent_flags():
+    async with get_session() as session:
+        return list(await session.scalars(select(Reminder.is_sent).order_by(Reminder.id)))
+
+
+async def _reschedule(reminder_id, due_time):
+    pass
+
+
+def make_pipeline(bot, **kwargs) -> DeliveryPipeline:
+    return DeliveryPipeline(
+        bot,
+        formatter=lambda reminder: reminder.title,
+        on_reschedule=_reschedule,
+        retry_policy=RetryPolicy(),
+        concurrency=1,
+        **kwargs,
+    )
+
+
+@pytest.mark.asyncio
+async def test_lanes_are_served_by_weight():
+    queue = LaneQueue({"high": 6, "normal": 3, "low": 1})
+    for lane in ("low", "normal", "high"):
+        for i in range(20):
+            queue.put_nowait(lane, i)
+
+    lanes = [(await queue.get())[0] for _ in range(10)]
+
+    assert lanes.count("high") == 6
+    assert lanes.count("normal") == 3
+    assert lanes.count("low") == 1
+    assert lanes[0] == "high"
+
+
+@pytest.mark.asyncio
+async def test_idle_lanes_do_not_hold_others_back():
+    queue = LaneQueue({"high": 6, "normal": 3, "low": 1})
+    for i in range(3):
+        queue.put_nowait("low", i)
+
+    assert [await queue.get() for _ in range(3)] == [("low", 0), ("low", 1), ("low", 2)]
+    assert queue.qsize() == 0
+
+
+def test_unknown_priorities_use_the_default_lane():
+    queue = LaneQueue({"high": 6, "normal": 3, "low": 1})
+
+    assert queue.lane_for("high") == "high"
+    assert queue.lane_for("urgent") == "normal"
+    assert queue.lane_for(None) == "normal"
+
+
+@pytest.mark.asyncio
+async def test_reminders_due_together_go_out_as_one_digest(database):
+    ids = await seed(["normal", "low", "high"])
+    bot = StubBot()
+    pipeline = make_pipeline(
+        bot,
+        coalesce_window=0.1,
+        digest_formatter=lambda reminders: " + ".join(r.title for r in reminders),
+    )
+    await pipeline.start()
+
+    await pipeline.deliver(ids)
+    await pipeline.stop()
+
+    # High priority is never held for a digest
+    assert sorted(bot.sent) == ["Reminder 0 + Reminder 1", "Reminder 2"]
+    assert await sent_flags() == [True, True, True]
+    stats = pipeline.get_stats()
+    assert stats["digests"] == 1
+    assert stats["coalesced"] == 2
+    assert stats["delivered"] == 3
+
+
+@pytest.mark.asyncio
+async def test_drain_sends_smoothed_reminders_right_away(database):
+    ids = await seed(["normal", "normal"])
+    bot = StubBot()
+    pipeline = make_pipeline(bot, smoothing=True, lateness_budget=3600.0)
+    await pipeline.start()
+
+    delivering = asyncio.create_task(pipeline.deliver(ids))
+    await asyncio.sleep(0.2)
+    assert bot.sent == []  # Held back within the budget
+
+    assert await pipeline.drain(5.0) == {"drained": 2, "deferred": 0}
+    await delivering
+    assert len(bot.sent) == 2
+    assert await sent_flags() == [True, True]
+
+
+@pytest.mark.asyncio
+async def test_drain_defers_what_misses_the_deadline(database):
+    ids = await seed(["normal", "normal"])
+    bot = StubBot(delay=60.0)
+    pipeline = make_pipeline(bot)
+    await pipeline.start()
+
+    delivering = asyncio.create_task(pipeline.deliver(ids))
+    await asyncio.sleep(0.2)
+
+    assert await pipeline.drain(0.1) == {"drained": 0, "deferred": 2}
+    await delivering
+    assert bot.sent == []
+    assert await sent_flags() == [False, False]  # Still due for the next start
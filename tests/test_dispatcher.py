@@ -0,0 +1,118 @@
+"""Tests for the timing-wheel reminder dispatcher."""
+
+from datetime import datetime
+
+from src.services.dispatcher import ReminderDispatcher, to_epoch
+
+START = 1_700_000_000.0  # A whole minute, so slots and ticks line up
+
+
+async def _noop(reminder_ids):
+    pass
+
+
+def make_dispatcher(**kwargs) -> ReminderDispatcher:
+    return ReminderDispatcher(_noop, **kwargs)
+
+
+def test_to_epoch_treats_naive_as_utc():
+    assert to_epoch(datetime(1970, 1, 1, 0, 1)) == 60.0
+
+
+def test_pop_due_returns_only_due_reminders():
+    dispatcher = make_dispatcher()
+    dispatcher.schedule(1, START + 5)
+    dispatcher.schedule(2, START + 90)
+    dispatcher.schedule(3, START + 3600)
+
+    assert dispatcher.pop_due(START + 4) == []
+    assert dispatcher.pop_due(START + 5) == [1]
+    assert dispatcher.pop_due(START + 120) == [2]
+    assert 3 in dispatcher
+    assert 1 not in dispatcher
+
+
+def test_fire_time_rounds_up_to_the_tick():
+    dispatcher = make_dispatcher(tick_seconds=1.0)
+    dispatcher.schedule(1, START + 2.3)
+
+    assert dispatcher.next_fire_time(1) == START + 3
+    assert dispatcher.pop_due(START + 2.9) == []
+    assert dispatcher.pop_due(START + 3) == [1]
+
+
+def test_lead_hands_reminders_over_early():
+    dispatcher = make_dispatcher(lead_seconds=10.0)
+    dispatcher.schedule(1, START + 10)
+
+    assert dispatcher.pop_due(START) == [1]
+
+
+def test_cancel():
+    dispatcher = make_dispatcher()
+    dispatcher.schedule(1, START + 5)
+    dispatcher.schedule(2, START + 5)
+
+    assert dispatcher.cancel(1)
+    assert not dispatcher.cancel(1)
+    assert not dispatcher.cancel(42)
+    assert dispatcher.pop_due(START + 5) == [2]
+    assert dispatcher.get_stats()['stale_entries'] == 0
+
+
+def test_reschedule_moves_the_reminder():
+    dispatcher = make_dispatcher()
+    dispatcher.schedule(1, START + 5)
+    dispatcher.schedule(1, START + 200)
+
+    assert dispatcher.next_fire_time(1) == START + 200
+    assert dispatcher.pop_due(START + 100) == []
+    assert dispatcher.pop_due(START + 200) == [1]
+
+
+def test_reschedule_earlier_within_the_current_minute():
+    dispatcher = make_dispatcher()
+    dispatcher.schedule(1, START + 50)
+    assert dispatcher.pop_due(START + 1) == []  # Cascades the current slot
+
+    dispatcher.schedule(1, START + 10)
+    assert dispatcher.pop_due(START + 10) == [1]
+    assert dispatcher.pop_due(START + 60) == []
+
+
+def test_schedule_in_the_past_fires_on_the_next_pop():
+    dispatcher = make_dispatcher()
+    dispatcher.pop_due(START)
+    dispatcher.schedule(1, START - 300)
+
+    assert dispatcher.pop_due(START) == [1]
+
+
+def test_export_lists_pending_reminders():
+    dispatcher = make_dispatcher()
+    dispatcher.schedule(1, START + 5)
+    dispatcher.schedule(2, START + 60)
+    dispatcher.cancel(1)
+
+    ids, fire_times = dispatcher.export()
+    assert list(ids) == [2]
+    assert list(fire_times) == [START + 60]
+
+
+def test_compaction_drops_stale_entries():
+    dispatcher = make_dispatcher()
+    dispatcher.COMPACT_MIN_STALE = 10
+    for reminder_id in range(5):
+        dispatcher.schedule(reminder_id, START + 600)
+
+    # Each move leaves an orphan behind in the old slot
+    for fire_at in range(1, 4):
+        for reminder_id in range(5):
+            dispatcher.schedule(reminder_id, START + 600 + fire_at * 60)
+
+    stats = dispatcher.get_stats()
+    assert stats['compactions'] == 1
+    assert stats['stale_entries'] < 10
+    assert stats['pending'] == 5
+    assert sorted(dispatcher.pop_due(START + 780)) == [0, 1, 2, 3, 4]
+    assert dispatcher.get_stats()['stale_entries'] == 0
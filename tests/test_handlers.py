@@ -0,0 +1,82 @@
+"""Tests for the reminder creation handler."""
+
+from datetime import datetime
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+import pytest
+from aiogram.fsm.context import FSMContext
+from aiogram.fsm.storage.base import StorageKey
+from aiogram.fsm.storage.memory import MemoryStorage
+from sqlalchemy import select
+
+from src.database.models import Reminder
+from src.database.operations import UserOperations, get_session
+from src.handlers.reminders import confirm_create_reminder
+
+DUE = datetime(2030, 1, 1, 9)
+
+
+class StubScheduler:
+    """Records what the handler schedules."""
+
+    def __init__(self):
+        self.scheduled = []
+
+    async def schedule_reminder(self, reminder_id, scheduled_time):
+        self.scheduled.append((reminder_id, scheduled_time))
+        return True
+
+
+def make_callback(telegram_id: int = 1000):
+    return SimpleNamespace(
+        from_user=SimpleNamespace(id=telegram_id),
+        answer=AsyncMock(),
+        message=SimpleNamespace(edit_text=AsyncMock()),
+    )
+
+
+async def make_state(telegram_id: int = 1000) -> FSMContext:
+    state = FSMContext(
+        MemoryStorage(), StorageKey(bot_id=1, chat_id=telegram_id, user_id=telegram_id)
+    )
+    await state.update_data(reminder_text="Call mom", scheduled_time=DUE)
+    return state
+
+
+@pytest.mark.asyncio
+async def test_confirm_schedules_the_new_reminder(database):
+    async with get_session() as session:
+        await UserOperations.create_or_update_user(session, 1000, first_name="Test")
+    callback, scheduler = make_callback(), StubScheduler()
+
+    await confirm_create_reminder(callback, await make_state(), scheduler=scheduler)
+
+    async with get_session() as session:
+        reminder = await session.scalar(select(Reminder))
+    assert reminder.title == "Call mom"
+    assert scheduler.scheduled == [(reminder.id, DUE)]
+    assert "Напоминание создано" in callback.message.edit_text.call_args.args[0]
+
+
+@pytest.mark.asyncio
+async def test_confirm_without_a_scheduler_still_creates(database):
+    async with get_session() as session:
+        await UserOperations.create_or_update_user(session, 1000, first_name="Test")
+    callback = make_callback()
+
+    await confirm_create_reminder(callback, await make_state())
+
+    async with get_session() as session:
+        assert await session.scalar(select(Reminder.title)) == "Call mom"
+    assert "Напоминание создано" in callback.message.edit_text.call_args.args[0]
+
+
+@pytest.mark.asyncio
+async def test_confirm_for_an_unknown_user(database):
+    callback, scheduler = make_callback(telegram_id=999), StubScheduler()
+
+    await confirm_create_reminder(callback, await make_state(999), scheduler=scheduler)
+
+    assert scheduler.scheduled == []
+    assert "Пользователь не найден" in callback.message.edit_text.call_args.args[0]
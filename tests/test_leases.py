@@ -0,0 +1,81 @@
+"""Tests for scheduler shard leases, on short real-time TTLs."""
+
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+from src.database.operations import LeaseOperations, get_session
+from src.services.leases import LeaseManager
+
+TTL = 0.6
+RENEW = 0.2
+
+
+def make_manager(replica_id: str, **kwargs) -> LeaseManager:
+    return LeaseManager(replica_id, 2, ttl=TTL, renew_interval=RENEW, **kwargs)
+
+
+async def wait_until(condition, timeout: float = 5.0) -> None:
+    """Poll ``condition`` until it holds."""
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        assert asyncio.get_running_loop().time() < deadline, "condition not met in time"
+        await asyncio.sleep(0.05)
+
+
+@pytest.mark.asyncio
+async def test_new_shards_settle_before_they_are_used(database):
+    acquired = []
+
+    async def on_acquired(shards):
+        acquired.append(set(shards))
+
+    manager = make_manager("a", on_acquired=on_acquired)
+    await manager.start()
+    try:
+        assert manager.get_stats()["owned"] == [0, 1]
+        assert manager.owned == frozenset()
+        assert not manager.owns(1000)
+
+        await wait_until(lambda: manager.owned == frozenset({0, 1}))
+        assert manager.owns(1000)
+        assert acquired == [{0, 1}]
+    finally:
+        await manager.stop()
+
+
+@pytest.mark.asyncio
+async def test_shards_of_a_dead_replica_are_taken_over(database):
+    now = datetime.utcnow()
+    async with get_session() as session:
+        await LeaseOperations.ensure_shards(session, 2)
+        for shard in (0, 1):
+            await LeaseOperations.try_acquire(
+                session, shard, "dead", now, now + timedelta(seconds=0.5)
+            )
+
+    manager = make_manager("a")
+    await manager.start()
+    try:
+        assert manager.get_stats()["owned"] == []
+
+        await wait_until(lambda: manager.owned == frozenset({0, 1}))
+        # The lease expired first, then the shards settled
+        assert datetime.utcnow() >= now + timedelta(seconds=0.5 + TTL)
+    finally:
+        await manager.stop()
+
+
+@pytest.mark.asyncio
+async def test_replicas_split_the_shards(database):
+    first, second = make_manager("a"), make_manager("b")
+    await first.start()
+    await second.start()
+    try:
+        await wait_until(lambda: len(first.owned) == 1 and len(second.owned) == 1)
+        assert first.owned | second.owned == frozenset({0, 1})
+        assert first.owns(1000) != second.owns(1000)
+    finally:
+        await first.stop()
+        await second.stop()
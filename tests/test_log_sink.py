@@ -0,0 +1,74 @@
+"""Tests for the batched SystemLog sink."""
+
+import asyncio
+
+import pytest
+from sqlalchemy import select
+
+from src.database.models import SystemLog
+from src.database.operations import get_session
+from src.services.log_sink import LogSink
+
+
+async def logged_messages():
+    async with get_session() as session:
+        return list(await session.scalars(select(SystemLog.message).order_by(SystemLog.id)))
+
+
+@pytest.mark.asyncio
+async def test_rows_are_written_in_batches(database):
+    sink = LogSink(batch_size=2, flush_interval=60.0)
+    await sink.start()
+
+    for i in range(5):
+        sink.log("INFO", f"Message {i}", "test")
+    await asyncio.sleep(0.2)
+    assert len(sink) < 5  # A full batch woke the writer
+
+    await sink.stop()
+    assert await logged_messages() == [f"Message {i}" for i in range(5)]
+    stats = sink.get_stats()
+    assert stats["written"] == 5
+    assert stats["dropped"] == 0
+
+
+@pytest.mark.asyncio
+async def test_a_quiet_sink_flushes_after_the_interval(database):
+    sink = LogSink(batch_size=100, flush_interval=0.1)
+    await sink.start()
+
+    sink.log("INFO", "Lonely message", "test", user_id=None)
+    await asyncio.sleep(0.3)
+    assert await logged_messages() == ["Lonely message"]
+
+    await sink.stop()
+
+
+@pytest.mark.asyncio
+async def test_drop_oldest_keeps_the_latest_rows(database):
+    sink = LogSink(capacity=2, flush_interval=60.0)
+
+    for i in range(3):
+        assert sink.log("INFO", f"Message {i}")
+    await sink.stop()
+
+    assert await logged_messages() == ["Message 1", "Message 2"]
+    assert sink.get_stats()["dropped"] == 1
+
+
+@pytest.mark.asyncio
+async def test_drop_newest_refuses_new_rows(database):
+    sink = LogSink(capacity=2, flush_interval=60.0, overflow="drop_newest")
+
+    assert sink.log("INFO", "Message 0")
+    assert sink.log("INFO", "Message 1")
+    assert not sink.log("INFO", "Message 2")
+    await sink.stop()
+
+    assert await logged_messages() == ["Message 0", "Message 1"]
+    assert sink.get_stats()["dropped"] == 1
+
+
+def test_unknown_overflow_policy_is_refused():
+    with pytest.raises(ValueError):
+        LogSink(overflow="drop_all")
@@ -0,0 +1,190 @@
+"""Tests for reminder database operations against a scratch SQLite file."""
+
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import select
+
+from src.database.models import Reminder, UserStatistics
+from src.database.operations import (
+    ReminderLimitError,
+    ReminderOperations,
+    StatisticsOperations,
+    UserOperations,
+    UserStatsCache,
+    get_session,
+    user_stats_cache,
+)
+
+
+async def create_user(telegram_id: int = 1000) -> int:
+    async with get_session() as session:
+        user = await UserOperations.create_or_update_user(session, telegram_id, first_name="Test")
+        return user.id
+
+
+async def get_statistics(user_id: int) -> UserStatistics:
+    async with get_session() as session:
+        return await session.scalar(select(UserStatistics).where(UserStatistics.user_id == user_id))
+
+
+async def create_reminder(telegram_id: int = 1000, **kwargs):
+    async with get_session() as session:
+        return await ReminderOperations.create_reminder_by_telegram_id(
+            session,
+            telegram_id,
+            kwargs.pop('title', "Call mom"),
+            None,
+            kwargs.pop('scheduled_time', datetime.utcnow() + timedelta(hours=1)),
+            **kwargs
+        )
+
+
+@pytest.mark.asyncio
+async def test_create_reminder_by_telegram_id(database):
+    user_id = await create_user()
+    due = datetime(2030, 1, 1, 9)
+
+    reminder_id = await create_reminder(title="Call mom", scheduled_time=due, priority="high")
+
+    async with get_session() as session:
+        reminder = await session.get(Reminder, reminder_id)
+    assert reminder.user_id == user_id
+    assert reminder.title == "Call mom"
+    assert reminder.scheduled_time == due
+    assert reminder.priority == "high"
+    assert not reminder.is_sent
+    assert (await get_statistics(user_id)).total_reminders_created == 1
+
+
+@pytest.mark.asyncio
+async def test_create_reminder_for_unknown_user(database):
+    assert await create_reminder(telegram_id=999) is None
+
+    async with get_session() as session:
+        assert await session.scalar(select(Reminder.id)) is None
+
+
+@pytest.mark.asyncio
+async def test_create_reminder_enforces_the_limit(database):
+    user_id = await create_user()
+    await create_reminder(limit=2)
+    await create_reminder(limit=2)
+
+    with pytest.raises(ReminderLimitError):
+        await create_reminder(limit=2)
+    assert (await get_statistics(user_id)).total_reminders_created == 2
+
+
+@pytest.mark.asyncio
+async def test_sent_reminders_do_not_count_toward_the_limit(database):
+    await create_user()
+    first = await create_reminder(limit=1)
+
+    async with get_session() as session:
+        await ReminderOperations.mark_reminders_sent(session, [first])
+
+    assert await create_reminder(limit=1) is not None
+
+
+@pytest.mark.asyncio
+async def test_mark_reminders_sent(database):
+    user_id = await create_user()
+    other_user_id = await create_user(telegram_id=2000)
+    first = await create_reminder()
+    second = await create_reminder()
+    other = await create_reminder(telegram_id=2000)
+
+    async with get_session() as session:
+        marked = await ReminderOperations.mark_reminders_sent(session, [first, second, other])
+    assert marked == 3
+
+    async with get_session() as session:
+        rows = (await session.execute(select(Reminder.is_sent, Reminder.sent_at))).all()
+    assert all(is_sent and sent_at is not None for is_sent, sent_at in rows)
+    assert (await get_statistics(user_id)).total_reminders_sent == 2
+    assert (await get_statistics(other_user_id)).total_reminders_sent == 1
+
+
+@pytest.mark.asyncio
+async def test_mark_reminders_sent_counts_each_reminder_once(database):
+    user_id = await create_user()
+    reminder_id = await create_reminder()
+
+    async with get_session() as session:
+        assert await ReminderOperations.mark_reminders_sent(session, [reminder_id]) == 1
+    async with get_session() as session:
+        assert await ReminderOperations.mark_reminders_sent(session, [reminder_id]) == 0
+
+    assert (await get_statistics(user_id)).total_reminders_sent == 1
+
+
+@pytest.mark.asyncio
+async def test_mark_reminders_sent_counts_advanced_recurring_reminders(database):
+    user_id = await create_user()
+
+    async with get_session() as session:
+        assert await ReminderOperations.mark_reminders_sent(session, [], [user_id, user_id]) == 0
+
+    assert (await get_statistics(user_id)).total_reminders_sent == 2
+
+
+@pytest.mark.asyncio
+async def test_user_reminder_stats(database):
+    user_id = await create_user()
+    now = datetime.utcnow()
+    sent = await create_reminder(scheduled_time=now - timedelta(hours=2))
+    await create_reminder(scheduled_time=now - timedelta(hours=1))
+    await create_reminder(scheduled_time=now + timedelta(hours=3))
+    await create_reminder(scheduled_time=now + timedelta(hours=1))
+    async with get_session() as session:
+        await ReminderOperations.mark_reminders_sent(session, [sent])
+
+    async with get_session() as session:
+        stats = await ReminderOperations.get_user_reminder_stats(session, user_id)
+
+    assert stats["total"] == 4
+    assert stats["sent"] == 1
+    assert stats["pending"] == 3
+    assert stats["overdue"] == 1
+    assert stats["completion_rate"] == 25
+    assert abs(stats["next_due"] - (now + timedelta(hours=1))) < timedelta(seconds=1)
+
+
+@pytest.mark.asyncio
+async def test_stats_overview_is_cached_until_a_write(database):
+    user_id = await create_user()
+    await create_reminder()
+
+    async with get_session() as session:
+        first = await StatisticsOperations.get_stats_overview(session, user_id)
+        assert await StatisticsOperations.get_stats_overview(session, user_id) is first
+    assert first["reminders"]["total"] == 1
+    assert first["statistics"].total_reminders_created == 1
+
+    invalidations = user_stats_cache.get_stats()["invalidations"]
+    await create_reminder()
+    async with get_session() as session:
+        second = await StatisticsOperations.get_stats_overview(session, user_id)
+    assert second["reminders"]["total"] == 2
+    assert second["statistics"].total_reminders_created == 2
+    assert user_stats_cache.get_stats()["invalidations"] == invalidations + 1
+
+
+def test_cached_stats_expire_when_the_next_reminder_is_due():
+    cache = UserStatsCache()
+    due = datetime(2030, 1, 1, 9)
+    cache.put(1, {"total": 1}, valid_until=due)
+
+    assert cache.get(1, due - timedelta(seconds=1)) == {"total": 1}
+    assert cache.get(1, due) is None
+
+
+def test_cache_keeps_the_most_recent_users():
+    cache = UserStatsCache(max_users=2)
+    now = datetime(2030, 1, 1)
+    for user_id in (1, 2, 3):
+        cache.put(user_id, {"user": user_id})
+
+    assert cache.get(1, now) is None
+    assert cache.get(3, now) == {"user": 3}
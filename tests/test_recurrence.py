@@ -0,0 +1,85 @@
+"""Tests for recurring reminder advancement."""
+
+from datetime import datetime, timedelta
+
+from src.database.models import Reminder, User
+from src.services.recurrence import advance_values, compile_recurrence
+
+
+def make_reminder(pattern, scheduled_time, timezone="UTC", **kwargs) -> Reminder:
+    reminder = Reminder(
+        id=1,
+        user_id=1,
+        title="Water the plants",
+        scheduled_time=scheduled_time,
+        is_recurring=pattern is not None,
+        recurrence_pattern=pattern,
+        **kwargs
+    )
+    reminder.user = User(id=1, telegram_id=1000, timezone=timezone)
+    return reminder
+
+
+def test_one_off_reminders_do_not_advance():
+    assert advance_values(make_reminder(None, datetime(2024, 1, 1, 9))) is None
+
+
+def test_daily_moves_to_the_next_day():
+    reminder = make_reminder("daily", datetime(2024, 1, 1, 9))
+    values = advance_values(reminder, now=datetime(2024, 1, 1, 9, 0, 5))
+
+    assert values['id'] == 1
+    assert values['scheduled_time'] == datetime(2024, 1, 2, 9)
+    assert values['recurrence_start'] == datetime(2024, 1, 1, 9)
+    assert values['retry_count'] == 0
+    assert values['next_attempt_at'] is None
+
+
+def test_missed_occurrences_are_skipped():
+    reminder = make_reminder("weekly", datetime(2024, 1, 1, 9))
+    values = advance_values(reminder, now=datetime(2024, 1, 20))
+
+    assert values['scheduled_time'] == datetime(2024, 1, 22, 9)
+
+
+def test_monthly_keeps_the_anchor_day():
+    anchor = datetime(2024, 1, 31, 9)
+    reminder = make_reminder("monthly", datetime(2024, 2, 29, 9), recurrence_start=anchor)
+    values = advance_values(reminder, now=datetime(2024, 2, 29, 9))
+
+    assert values['scheduled_time'] == datetime(2024, 3, 31, 9)
+    assert values['recurrence_start'] == anchor
+
+
+def test_daily_keeps_local_time_across_dst():
+    # 09:00 in Berlin is 08:00 UTC in winter and 07:00 UTC in summer
+    reminder = make_reminder("daily", datetime(2024, 3, 30, 8), timezone="Europe/Berlin")
+    values = advance_values(reminder, now=datetime(2024, 3, 30, 8))
+
+    assert values['scheduled_time'] == datetime(2024, 3, 31, 7)
+
+
+def test_custom_interval_in_minutes():
+    reminder = make_reminder("custom:90", datetime(2024, 1, 1, 9))
+    values = advance_values(reminder, now=datetime(2024, 1, 1, 9))
+
+    assert values['scheduled_time'] == datetime(2024, 1, 1, 10, 30)
+
+
+def test_stops_at_the_end_date():
+    reminder = make_reminder(
+        "daily", datetime(2024, 1, 1, 9), recurrence_end_date=datetime(2024, 1, 1, 23)
+    )
+
+    assert advance_values(reminder, now=datetime(2024, 1, 1, 9)) is None
+
+
+def test_bad_pattern_is_treated_as_one_off():
+    assert advance_values(make_reminder("fortnightly", datetime(2024, 1, 1, 9))) is None
+
+
+def test_next_after_is_strictly_later():
+    rule = compile_recurrence("daily:2", datetime(2024, 1, 1, 9))
+
+    assert rule.next_after(datetime(2024, 1, 3, 9)) == datetime(2024, 1, 5, 9)
+    assert rule.next_after(datetime(2024, 1, 3, 9) - timedelta(seconds=1)) == datetime(2024, 1, 3, 9)
@@ -0,0 +1,75 @@
+"""Tests for delivery error classification and backoff."""
+
+from datetime import datetime, timedelta
+
+import pytest
+from aiogram.exceptions import (
+    TelegramBadRequest,
+    TelegramForbiddenError,
+    TelegramNetworkError,
+    TelegramNotFound,
+    TelegramRetryAfter,
+    TelegramServerError,
+    TelegramUnauthorizedError,
+)
+from aiogram.methods import SendMessage
+
+from src.services.retry_policy import RetryPolicy
+
+METHOD = SendMessage(chat_id=1, text="Reminder")
+NOW = datetime(2024, 1, 1, 12)
+
+
+@pytest.mark.parametrize("error", [
+    TelegramForbiddenError(METHOD, "Forbidden: bot was blocked by the user"),
+    TelegramUnauthorizedError(METHOD, "Unauthorized"),
+    TelegramNotFound(METHOD, "Not Found"),
+    TelegramBadRequest(METHOD, "Bad Request: chat not found"),
+])
+def test_permanent_errors_are_dead_lettered(error):
+    policy = RetryPolicy()
+
+    assert not policy.is_retryable(error)
+    assert policy.next_attempt(0, error, NOW) is None
+
+
+@pytest.mark.parametrize("error", [
+    TelegramNetworkError(METHOD, "Connection reset"),
+    TelegramServerError(METHOD, "Bad Gateway"),
+    TelegramRetryAfter(METHOD, "Flood control exceeded", retry_after=5),
+    RuntimeError("Something unexpected"),
+])
+def test_transient_errors_are_retried(error):
+    policy = RetryPolicy()
+
+    assert policy.is_retryable(error)
+    assert policy.next_attempt(0, error, NOW) > NOW
+
+
+def test_retries_stop_after_max_retries():
+    policy = RetryPolicy(max_retries=3)
+    error = TelegramServerError(METHOD, "Bad Gateway")
+
+    assert policy.next_attempt(2, error, NOW) is not None
+    assert policy.next_attempt(3, error, NOW) is None
+
+
+def test_backoff_grows_exponentially_up_to_the_cap():
+    policy = RetryPolicy(base_delay=10.0, max_delay=100.0, jitter=0.0)
+
+    assert [policy.delay(retry) for retry in range(5)] == [10.0, 20.0, 40.0, 80.0, 100.0]
+
+
+def test_jitter_only_shortens_the_delay():
+    policy = RetryPolicy(base_delay=10.0, jitter=0.5)
+
+    for _ in range(100):
+        assert 5.0 <= policy.delay(0) <= 10.0
+
+
+def test_retry_after_is_honoured():
+    policy = RetryPolicy(base_delay=1.0, jitter=0.0)
+    error = TelegramRetryAfter(METHOD, "Flood control exceeded", retry_after=60)
+
+    assert policy.delay(0, error) == 60.0
+    assert policy.next_attempt(0, error, NOW) == NOW + timedelta(seconds=60)
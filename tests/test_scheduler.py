@@ -0,0 +1,152 @@
+"""
+Deterministic scheduler tests.
+
+The real scheduler, dispatcher and delivery pipeline run on a virtual
+clock against a scratch database and a stub bot, so minutes of
+schedule pass in well under a second.
+"""
+
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import insert, select
+
+from src.database import operations
+from src.database.models import Reminder
+from src.database.operations import UserOperations, get_session
+from src.services.dispatcher import to_epoch
+from src.services.scheduler_service import SchedulerService
+from src.utils.clock import VirtualClock
+
+START = datetime(2030, 1, 1, 9)
+
+
+class StubBot:
+    """Records when each message went out; fails chats listed in ``failing`` once."""
+
+    def __init__(self, clock: VirtualClock, failing=()):
+        self.clock = clock
+        self.failing = set(failing)
+        self.sent = []  # (chat_id, epoch seconds)
+
+    async def send_message(self, chat_id, text, **kwargs):
+        await self.clock.sleep(0.05)
+        if chat_id in self.failing:
+            self.failing.discard(chat_id)
+            raise RuntimeError("Simulated network error")
+        self.sent.append((chat_id, self.clock.time()))
+
+
+async def settle() -> None:
+    """Let database work started by the last clock step finish (it takes real time)."""
+    while True:
+        for _ in range(20):
+            await asyncio.sleep(0)
+        if not operations.engine.sync_engine.pool.checkedout():
+            return
+        await asyncio.sleep(0.001)
+
+
+async def run_for(clock: VirtualClock, seconds: float, step: float = 0.25) -> None:
+    """Advance the clock in steps, waiting for the database after each one."""
+    for _ in range(round(seconds / step)):
+        await clock.advance(step)
+        await settle()
+
+
+async def stop(scheduler: SchedulerService, clock: VirtualClock) -> None:
+    """Stop the scheduler, keeping the clock moving for its drain."""
+    stopping = asyncio.create_task(scheduler.stop())
+    while not stopping.done():
+        await run_for(clock, 0.25)
+    await stopping
+
+
+async def seed(offsets, telegram_id: int = 1000) -> int:
+    """Create a user with one reminder per offset (seconds after START)."""
+    async with get_session() as session:
+        user = await UserOperations.create_or_update_user(session, telegram_id, first_name="Test")
+        await session.execute(insert(Reminder), [
+            {'user_id': user.id, 'title': f"Reminder {i}", 'scheduled_time': START + timedelta(seconds=offset)}
+            for i, offset in enumerate(offsets)
+        ])
+        await session.commit()
+    return telegram_id
+
+
+async def sent_flags():
+    async with get_session() as session:
+        return (await session.execute(select(Reminder.is_sent).order_by(Reminder.id))).scalars().all()
+
+
+@pytest.mark.asyncio
+async def test_reminders_go_out_on_time_in_virtual_time(database):
+    chat_id = await seed([5, 30, 90])
+    clock = VirtualClock(START)
+    bot = StubBot(clock)
+    scheduler = SchedulerService(bot, clock=clock)
+    await scheduler.start()
+    await scheduler.load_pending_reminders()
+
+    await run_for(clock, 60)
+    assert [chat for chat, _ in bot.sent] == [chat_id, chat_id]
+    assert await sent_flags() == [True, True, False]
+
+    await run_for(clock, 40)
+    await stop(scheduler, clock)
+
+    due = [to_epoch(START) + offset for offset in (5, 30, 90)]
+    for (_, sent_at), due_at in zip(bot.sent, due):
+        # Within one tick plus the stub's send latency
+        assert due_at <= sent_at <= due_at + scheduler.dispatcher.tick_seconds + 0.1
+    assert await sent_flags() == [True, True, True]
+
+
+@pytest.mark.asyncio
+async def test_failed_send_is_retried_after_backoff(database):
+    chat_id = await seed([5])
+    clock = VirtualClock(START)
+    bot = StubBot(clock, failing=[chat_id])
+    scheduler = SchedulerService(bot, clock=clock)
+    await scheduler.start()
+    await scheduler.load_pending_reminders()
+
+    await run_for(clock, 10)
+    assert bot.sent == []
+    async with get_session() as session:
+        reminder = await session.scalar(select(Reminder))
+    assert reminder.retry_count == 1
+    assert not reminder.is_sent
+    retry_at = to_epoch(reminder.next_attempt_at)
+
+    await run_for(clock, retry_at - clock.time() + 2)
+    await stop(scheduler, clock)
+
+    assert len(bot.sent) == 1
+    assert retry_at <= bot.sent[0][1] <= retry_at + scheduler.dispatcher.tick_seconds + 0.1
+    assert await sent_flags() == [True]
+
+
+@pytest.mark.asyncio
+async def test_rescheduled_reminder_waits_for_its_new_time(database):
+    await seed([5])
+    clock = VirtualClock(START)
+    bot = StubBot(clock)
+    scheduler = SchedulerService(bot, clock=clock)
+    await scheduler.start()
+    await scheduler.load_pending_reminders()
+
+    async with get_session() as session:
+        reminder_id = await session.scalar(select(Reminder.id))
+        await operations.ReminderOperations.update_reminder(
+            session, reminder_id, scheduled_time=START + timedelta(seconds=20)
+        )
+    await scheduler.schedule_reminder(reminder_id, START + timedelta(seconds=20))
+
+    await run_for(clock, 15)
+    assert bot.sent == []
+
+    await run_for(clock, 10)
+    await stop(scheduler, clock)
+    assert len(bot.sent) == 1
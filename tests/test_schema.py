@@ -0,0 +1,51 @@
+"""Tests for schema creation and migration of older databases."""
+
+import pytest
+from sqlalchemy import inspect
+
+from src.database.models import Base
+from src.database.operations import MIGRATIONS, init_database, writer_engine
+
+
+async def user_version() -> int:
+    async with writer_engine.connect() as conn:
+        return (await conn.exec_driver_sql("PRAGMA user_version")).scalar()
+
+
+async def columns(table: str):
+    async with writer_engine.connect() as conn:
+        return await conn.run_sync(
+            lambda sync_conn: {c["name"] for c in inspect(sync_conn).get_columns(table)}
+        )
+
+
+def _undo(statement: str) -> str:
+    """Reverse an ``ALTER TABLE ... ADD COLUMN`` or ``CREATE INDEX`` migration step."""
+    words = statement.split()
+    if words[:2] == ["CREATE", "INDEX"]:
+        return f"DROP INDEX {words[2]}"
+    return f"ALTER TABLE {words[2]} DROP COLUMN {words[5]}"
+
+
+@pytest.mark.asyncio
+async def test_new_database_is_stamped_with_the_latest_version(database):
+    assert await user_version() == len(MIGRATIONS)
+
+    await init_database()  # Nothing left to migrate
+    assert await user_version() == len(MIGRATIONS)
+
+
+@pytest.mark.asyncio
+async def test_older_database_is_migrated(database):
+    async with writer_engine.begin() as conn:
+        for migration in reversed(MIGRATIONS):
+            for statement in reversed(migration):
+                await conn.exec_driver_sql(_undo(statement))
+        await conn.exec_driver_sql("PRAGMA user_version = 0")
+    assert "retry_count" not in await columns("reminders")
+
+    await init_database()
+
+    for table in Base.metadata.sorted_tables:
+        assert await columns(table.name) == set(table.columns.keys())
+    assert await user_version() == len(MIGRATIONS)
@@ -0,0 +1,85 @@
+"""Tests for outbound send pacing."""
+
+import asyncio
+
+import pytest
+from aiogram.exceptions import TelegramRetryAfter
+from aiogram.methods import EditMessageText, SendMessage
+
+from src.bot.send_governor import SendGovernor, TokenBucket
+
+
+class StubApi:
+    """Stands in for the next request middleware; fails ``failures`` times with RetryAfter."""
+
+    def __init__(self, failures: int = 0):
+        self.failures = failures
+        self.calls = 0
+
+    async def __call__(self, bot, method):
+        self.calls += 1
+        if self.failures:
+            self.failures -= 1
+            raise TelegramRetryAfter(method, "Flood control exceeded", retry_after=0)
+        return True
+
+
+def test_bucket_allows_a_burst_then_spaces_requests():
+    bucket = TokenBucket(rate=2.0, capacity=2.0, now=0.0)
+
+    assert bucket.reserve(0.0) == 0.0
+    assert bucket.reserve(0.0) == 0.0
+    assert bucket.reserve(0.0) == 0.5
+    assert bucket.reserve(0.0) == 1.0
+    assert not bucket.is_idle(1.0)
+    assert bucket.is_idle(2.0)
+
+
+def test_group_chats_are_detected():
+    assert SendGovernor._is_group(-100123)
+    assert SendGovernor._is_group("@channel")
+    assert not SendGovernor._is_group(42)
+    assert not SendGovernor._is_group("42")
+
+
+@pytest.mark.asyncio
+async def test_messages_to_one_chat_are_paced():
+    governor = SendGovernor(global_rate=1000.0, chat_rate=20.0)
+
+    assert await governor.acquire(1) < 0.01
+    assert await governor.acquire(1) >= 0.04
+    assert await governor.acquire(2) < 0.01  # Other chats are not held up
+    assert governor.get_stats()["throttled"] == 1
+
+
+@pytest.mark.asyncio
+async def test_edits_pass_straight_through():
+    governor = SendGovernor(chat_rate=0.001)
+    api = StubApi()
+    edit = EditMessageText(chat_id=1, message_id=1, text="Menu")
+
+    await asyncio.wait_for(
+        asyncio.gather(*(governor(api, None, edit) for _ in range(5))), timeout=1.0
+    )
+    assert api.calls == 5
+    assert governor.get_stats()["requests"] == 0
+
+
+@pytest.mark.asyncio
+async def test_retry_after_pauses_and_retries_the_request():
+    governor = SendGovernor()
+    api = StubApi(failures=1)
+
+    assert await governor(api, None, SendMessage(chat_id=1, text="Reminder"))
+    assert api.calls == 2
+    assert governor.get_stats()["retry_after_hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_retry_after_is_raised_after_max_retries():
+    governor = SendGovernor(max_retries=1)
+    api = StubApi(failures=5)
+
+    with pytest.raises(TelegramRetryAfter):
+        await governor(api, None, SendMessage(chat_id=1, text="Reminder"))
+    assert api.calls == 2
@@ -0,0 +1,79 @@
+"""Tests for the binary schedule snapshot."""
+
+from array import array
+
+import pytest
+
+from src.services.snapshot import HEADER, SnapshotError, read_snapshot, write_snapshot
+
+
+def write(path, ids=(3, 1, 2), fire_times=(1000.0, 1000.5, 2000.0)):
+    return write_snapshot(
+        str(path), array("q", ids), array("d", fire_times),
+        taken_at=900.0, horizon_end=4500.0, max_id=7,
+    )
+
+
+def test_round_trip(tmp_path):
+    path = tmp_path / "schedule"
+
+    assert write(path) == HEADER.size + 3 * 16
+    with read_snapshot(str(path)) as snapshot:
+        assert len(snapshot) == 3
+        assert list(snapshot) == [(3, 1000.0), (1, 1000.5), (2, 2000.0)]
+        assert (snapshot.taken_at, snapshot.horizon_end, snapshot.max_id) == (900.0, 4500.0, 7)
+
+
+def test_empty_schedule(tmp_path):
+    path = tmp_path / "schedule"
+    write(path, ids=(), fire_times=())
+
+    with read_snapshot(str(path)) as snapshot:
+        assert list(snapshot) == []
+
+
+def test_missing_file_is_no_snapshot(tmp_path):
+    assert read_snapshot(str(tmp_path / "schedule")) is None
+
+
+def test_rewrite_replaces_the_file(tmp_path):
+    path = tmp_path / "schedule"
+    write(path)
+    write(path, ids=(9,), fire_times=(5.0,))
+
+    with read_snapshot(str(path)) as snapshot:
+        assert list(snapshot) == [(9, 5.0)]
+    assert [p.name for p in tmp_path.iterdir()] == ["schedule"]
+
+
+def test_corrupt_body_is_rejected(tmp_path):
+    path = tmp_path / "schedule"
+    write(path)
+    data = bytearray(path.read_bytes())
+    data[-1] ^= 0xFF
+    path.write_bytes(bytes(data))
+
+    with pytest.raises(SnapshotError, match="checksum"):
+        read_snapshot(str(path))
+
+
+def test_truncated_file_is_rejected(tmp_path):
+    path = tmp_path / "schedule"
+    write(path)
+    path.write_bytes(path.read_bytes()[:-8])
+
+    with pytest.raises(SnapshotError, match="size"):
+        read_snapshot(str(path))
+
+
+def test_foreign_file_is_rejected(tmp_path):
+    path = tmp_path / "schedule"
+    path.write_bytes(b"x" * 100)
+
+    with pytest.raises(SnapshotError, match="format"):
+        read_snapshot(str(path))
+
+
+def test_mismatched_arrays_are_refused(tmp_path):
+    with pytest.raises(ValueError):
+        write(tmp_path / "schedule", ids=(1, 2), fire_times=(1.0,))
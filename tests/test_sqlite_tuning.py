@@ -0,0 +1,113 @@
+"""Tests for SQLite connection profiles and the WAL checkpointer."""
+
+import pytest
+import pytest_asyncio
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from src.database.sqlite_tuning import (
+    MIN_CACHE_KIB,
+    WalCheckpointer,
+    apply_read_only,
+    apply_sqlite_profile,
+)
+
+
+@pytest_asyncio.fixture
+async def scratch(tmp_path):
+    """Path of a scratch database file and a factory for pooled engines on it."""
+    path = str(tmp_path / "tuning.db")
+    engines = []
+
+    def make_engine():
+        engine = create_async_engine(
+            f"sqlite+aiosqlite:///{path}", poolclass=AsyncAdaptedQueuePool
+        )
+        engines.append(engine)
+        return engine
+
+    yield path, make_engine
+    for engine in engines:
+        await engine.dispose()
+
+
+async def pragma(engine, name):
+    async with engine.connect() as conn:
+        return (await conn.exec_driver_sql(f"PRAGMA {name}")).scalar()
+
+
+@pytest.mark.asyncio
+async def test_profile_pragmas_are_applied(scratch):
+    _, make_engine = scratch
+    engine = make_engine()
+    apply_sqlite_profile(engine, "balanced", max_connections=4)
+
+    assert await pragma(engine, "journal_mode") == "wal"
+    assert await pragma(engine, "synchronous") == 1  # NORMAL
+    assert await pragma(engine, "cache_size") == -65536 // 4
+    assert await pragma(engine, "busy_timeout") == 5000
+
+
+@pytest.mark.asyncio
+async def test_cache_budget_has_a_floor_per_connection(scratch):
+    _, make_engine = scratch
+    engine = make_engine()
+    apply_sqlite_profile(engine, "durable", max_connections=100)
+
+    assert await pragma(engine, "cache_size") == -MIN_CACHE_KIB
+
+
+def test_unknown_profile_is_refused(scratch):
+    _, make_engine = scratch
+
+    with pytest.raises(ValueError):
+        apply_sqlite_profile(make_engine(), "reckless")
+
+
+@pytest.mark.asyncio
+async def test_read_only_engine_refuses_writes(scratch):
+    _, make_engine = scratch
+    writer, reader = make_engine(), make_engine()
+    apply_read_only(reader)
+    async with writer.begin() as conn:
+        await conn.exec_driver_sql("CREATE TABLE t (x INTEGER)")
+
+    with pytest.raises(OperationalError):
+        async with reader.begin() as conn:
+            await conn.exec_driver_sql("INSERT INTO t VALUES (1)")
+    assert await pragma(reader, "query_only") == 1
+
+
+@pytest.mark.asyncio
+async def test_truncate_checkpoint_empties_the_wal(scratch):
+    path, make_engine = scratch
+    engine = make_engine()
+    apply_sqlite_profile(engine, "balanced")
+    checkpointer = WalCheckpointer(engine, path)
+
+    async with engine.begin() as conn:
+        await conn.exec_driver_sql("CREATE TABLE t (x INTEGER)")
+        for i in range(100):
+            await conn.exec_driver_sql(f"INSERT INTO t VALUES ({i})")
+    assert checkpointer.wal_size() > 0
+
+    busy, frames, checkpointed = await checkpointer.checkpoint("TRUNCATE")
+    assert busy == 0
+    assert checkpointer.wal_size() == 0
+    assert checkpointer.get_stats()["truncations"] == 1
+
+
+@pytest.mark.asyncio
+async def test_stop_truncates_the_wal(scratch):
+    path, make_engine = scratch
+    engine = make_engine()
+    apply_sqlite_profile(engine, "balanced")
+    checkpointer = WalCheckpointer(engine, path, interval=60.0)
+    await checkpointer.start()
+
+    async with engine.begin() as conn:
+        await conn.exec_driver_sql("CREATE TABLE t (x INTEGER)")
+    await checkpointer.stop()
+
+    assert checkpointer.wal_size() == 0
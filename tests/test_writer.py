@@ -0,0 +1,132 @@
+"""Tests for the single SQLite writer and its group commits."""
+
+import asyncio
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from src.database.sqlite_tuning import apply_immediate_transactions, apply_sqlite_profile
+from src.database.writer import GroupCommitSession, SQLiteWriter, after_commit
+
+
+@pytest_asyncio.fixture
+async def engine(tmp_path):
+    """Writer-style engine on a scratch database with one table, ``t(x)``."""
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{tmp_path / 'writer.db'}",
+        poolclass=AsyncAdaptedQueuePool,
+        pool_size=1,
+        max_overflow=0,
+    )
+    apply_sqlite_profile(engine, "balanced")
+    apply_immediate_transactions(engine)
+    async with engine.begin() as conn:
+        await conn.exec_driver_sql("CREATE TABLE t (x INTEGER)")
+    yield engine
+    await engine.dispose()
+
+
+@pytest_asyncio.fixture
+async def writer(engine):
+    writer = SQLiteWriter(
+        async_sessionmaker(engine, class_=GroupCommitSession, expire_on_commit=False)
+    )
+    yield writer
+    await writer.stop()
+
+
+async def stored(engine):
+    async with engine.connect() as conn:
+        return sorted((await conn.exec_driver_sql("SELECT x FROM t")).scalars())
+
+
+def insert(x, committed=None, fail=False):
+    """Operation inserting ``x``; records it in ``committed`` after the commit."""
+
+    async def operation(session):
+        await session.execute(text("INSERT INTO t VALUES (:x)"), {"x": x})
+        if committed is not None:
+            after_commit(session, committed.append, x)
+        await session.commit()
+        if fail:
+            raise RuntimeError(f"Operation {x} failed")
+        return x
+
+    return operation
+
+
+@pytest.mark.asyncio
+async def test_queued_writes_share_one_commit(engine, writer):
+    committed = []
+
+    results = await asyncio.gather(*(writer.submit(insert(x, committed)) for x in range(5)))
+
+    assert results == [0, 1, 2, 3, 4]
+    assert await stored(engine) == [0, 1, 2, 3, 4]
+    assert sorted(committed) == [0, 1, 2, 3, 4]
+    stats = writer.get_stats()
+    assert stats["groups"] == 1
+    assert stats["operations"] == 5
+
+
+@pytest.mark.asyncio
+async def test_a_failing_write_does_not_take_the_group_down(engine, writer):
+    committed = []
+    submitted = [
+        writer.submit(insert(x, committed, fail=x == 2)) for x in range(4)
+    ]
+
+    results = await asyncio.gather(*submitted, return_exceptions=True)
+
+    assert results[:2] == [0, 1] and results[3] == 3
+    assert isinstance(results[2], RuntimeError)
+    # The failed operation's row and after-commit callback are both gone
+    assert await stored(engine) == [0, 1, 3]
+    assert sorted(committed) == [0, 1, 3]
+    stats = writer.get_stats()
+    assert stats["isolated_groups"] == 1
+    assert stats["failed_operations"] == 1
+
+
+@pytest.mark.asyncio
+async def test_rollback_undoes_only_the_calling_operation(engine, writer):
+    async def undecided(session):
+        await session.execute(text("INSERT INTO t VALUES (10)"))
+        after_commit(session, pytest.fail, "Rolled back work must not report a commit")
+        await session.rollback()
+        await session.execute(text("INSERT INTO t VALUES (11)"))
+        await session.commit()
+
+    await asyncio.gather(writer.submit(insert(1)), writer.submit(undecided))
+
+    assert await stored(engine) == [1, 11]
+
+
+@pytest.mark.asyncio
+async def test_after_commit_follows_a_plain_session(engine):
+    committed = []
+    async with AsyncSession(engine) as session:
+        after_commit(session, committed.append, "no transaction")
+        assert committed == ["no transaction"]
+
+        await session.execute(text("INSERT INTO t VALUES (1)"))
+        after_commit(session, committed.append, "rolled back")
+        await session.rollback()
+
+        await session.execute(text("INSERT INTO t VALUES (2)"))
+        after_commit(session, committed.append, "committed")
+        assert committed == ["no transaction"]
+        await session.commit()
+
+    assert committed == ["no transaction", "committed"]
+
+
+@pytest.mark.asyncio
+async def test_submit_after_stop_is_refused(writer):
+    await writer.stop()
+
+    with pytest.raises(RuntimeError):
+        await writer.submit(insert(1))